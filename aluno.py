@@ -7,7 +7,12 @@ cadastrar novos alunos e associá-los a uma turma existente.
 
 import customtkinter as ctk
 from database import conectar
+from cache_turmas import cache_turmas
+from executor_banco import executar
+from importacao import importar_arquivo
+from repositorio.alunos import inserir_aluno
 import sqlite3
+from tkinter.filedialog import askopenfilename
 
 class Aluno(ctk.CTkFrame):
     """
@@ -89,7 +94,14 @@ class Aluno(ctk.CTkFrame):
                                         width=200, height=40, corner_radius=10)
         self.btn_salvar.pack(pady=10)
 
-        self.status = ctk.CTkLabel(self.content_frame, text="", text_color="red")
+        # Importação de uma lista de alunos (CSV com 'nome' e 'turma')
+        self.btn_importar = ctk.CTkButton(self.content_frame,
+                                          text="Importar CSV...", command=self.importar_csv,
+                                          fg_color="#3A3A46", hover_color="#4A4A56",
+                                          width=200, height=35, corner_radius=10)
+        self.btn_importar.pack(pady=(0, 10))
+
+        self.status = ctk.CTkLabel(self.content_frame, text="", text_color="red", wraplength=380)
         self.status.pack(pady=10)
 
         # Botão Voltar
@@ -100,9 +112,12 @@ class Aluno(ctk.CTkFrame):
         self.btn_voltar.pack(pady=10)
         # --- Fim do Painel Direito ---
         
-        # O evento <Visibility> é disparado quando o frame fica visível
-        # Usamos isso para recarregar as turmas caso uma nova tenha sido criada
-        self.bind("<Visibility>", self.atualizar_turmas)
+        # Atualiza o dropdown quando uma turma for criada/alterada
+        cache_turmas.assinar(self.atualizar_turmas)
+
+    def ao_mostrar(self):
+        """Chamado pelo Aplicativo ao abrir a tela (se os dados mudaram): recarrega as turmas."""
+        self.atualizar_turmas()
 
     def atualizar_turmas(self, event=None):
         """
@@ -124,18 +139,14 @@ class Aluno(ctk.CTkFrame):
 
     def carregar_turmas(self):
         """
-        Busca a lista de turmas no banco de dados.
+        Retorna a lista de turmas (do cache compartilhado em memória).
         
         Returns:
             list: Lista de strings formatadas como "ID - Nome" ou lista vazia.
         """
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM turmas ORDER BY nome")
-                turmas = cursor.fetchall()
-                # Formata a lista para exibição (ex: "1 - 3º Ano A")
-                return [f"{id} - {nome}" for id, nome in turmas]
+            # Lista compartilhada em memória: só consulta o banco se as turmas mudaram
+            return cache_turmas.rotulos()
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro ao carregar turmas: {e}", text_color="red")
             return []
@@ -145,27 +156,57 @@ class Aluno(ctk.CTkFrame):
         Valida os campos e salva o novo aluno no banco de dados.
         """
         nome = self.nome.get().strip()
-        turma_str = self.turma_selecionada.get()
+        # O id vem do mapa rótulo -> turma do cache (None = nenhuma turma válida)
+        turma_id = cache_turmas.id_de(self.turma_selecionada.get())
 
-        if not nome or not turma_str or turma_str == "Nenhuma turma cadastrada":
+        if not nome or turma_id is None:
             self.status.configure(text="Preencha nome e selecione turma.", text_color="red")
             return
 
         try:
-            # Extrai o ID da string "ID - Nome"
-            turma_id = turma_str.split(" - ")[0]
-            
             with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO alunos (nome, turma_id) VALUES (?, ?)", (nome, turma_id))
+                inserir_aluno(conn, nome, turma_id)
             
             self.status.configure(text="Aluno cadastrado com sucesso!", text_color="green")
             self.nome.delete(0, 'end') # Limpa o campo
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro no banco: {str(e)}", text_color="red")
-        except Exception as e:
-            # Captura outros erros (ex: split falha se a string estiver mal formatada)
-            self.status.configure(text=f"Erro: {str(e)}", text_color="red")
+
+    def importar_csv(self):
+        """
+        Pede um arquivo CSV (colunas 'nome' e 'turma') e importa os alunos
+        no executor do banco, sem travar a janela (ver importacao.py).
+        """
+        caminho = askopenfilename(filetypes=[("Arquivos CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+                                  title="Importar Alunos")
+        if not caminho:
+            return
+        self.btn_importar.configure(state="disabled")
+        self.status.configure(text="Importando alunos...", text_color="#555555")
+        executar(lambda conn: importar_arquivo(caminho, conn),
+                 ao_concluir=self._importacao_concluida,
+                 ao_falhar=self._erro_na_importacao, dono=self)
+
+    def _importacao_concluida(self, resultado):
+        """Mostra o resumo da importação (os erros de cada linha vão para o console)."""
+        self.btn_importar.configure(state="normal")
+        if resultado.turmas_criadas:
+            cache_turmas.invalidar() # Novas turmas nos dropdowns
+        print(f"Importação: {resultado.resumo()}")
+        for numero, mensagem in resultado.erros:
+            print(f"  Linha {numero}: {mensagem}")
+
+        texto = resultado.resumo()
+        if resultado.erros:
+            texto += "\n" + "; ".join(f"linha {n}: {m}" for n, m in resultado.erros[:3])
+            if resultado.total_erros > 3:
+                texto += " (demais erros no console)"
+        self.status.configure(text=texto, text_color="green" if not resultado.total_erros else "#B8860B")
+
+    def _erro_na_importacao(self, erro):
+        """A importação falhou: nada foi gravado."""
+        self.btn_importar.configure(state="normal")
+        self.status.configure(text=f"Erro na importação (nada foi gravado): {erro}", text_color="red")
 
     def voltar(self):
         """
@@ -7,8 +7,11 @@ Permite:
 """
 
 import customtkinter as ctk
-from database import conectar
-from tkcalendar import Calendar
+from executor_banco import executar, executor
+from cache_turmas import cache_turmas
+from datas import para_iso, para_exibicao, PADRAO_CALENDARIO
+from repositorio.atividades import (listar_atividades, inserir_atividade,
+                                    deletar_atividade as deletar_atividade_no_banco)
 import datetime
 import sqlite3
 # Importa os pop-ups de diálogo
@@ -65,7 +68,7 @@ class Atividades(ctk.CTkFrame):
         self.dropdown_turma = ctk.CTkOptionMenu(self.form_frame,
                                                 values=self.turmas, 
                                                 variable=self.turma_selecionada,
-                                                command=self.carregar_atividades, # Comando para recarregar a lista
+                                                command=cache_turmas.com_id(self.carregar_atividades), # Recarrega a lista com o id da turma
                                                 height=40,
                                                 fg_color="white", button_color="#E0E0E0",
                                                 text_color="#24232F", dropdown_fg_color="white",
@@ -114,9 +117,9 @@ class Atividades(ctk.CTkFrame):
         self.frame_atividades = ctk.CTkScrollableFrame(self.painel_direito, fg_color="#EAEAEA", corner_radius=10)
         self.frame_atividades.pack(pady=10, fill="both", expand=True, padx=20)
 
-        # --- Carga Inicial ---
-        self.bind("<Visibility>", self.atualizar_tela)
-        self.carregar_atividades(self.turma_selecionada.get())
+        # Atualiza o dropdown quando uma turma for criada/alterada
+        cache_turmas.assinar(self.atualizar_dropdown)
+        # A carga inicial é feita em 'ao_mostrar', quando a tela é aberta
 
     # --- Funções de Placeholder ---
     def limpar_placeholder(self, event):
@@ -130,20 +133,17 @@ class Atividades(ctk.CTkFrame):
             self.descricao.configure(text_color="#888888")
 
     def carregar_turmas(self):
-        """Busca e retorna a lista de turmas do banco."""
+        """Retorna a lista de turmas (do cache compartilhado em memória)."""
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM turmas ORDER BY nome")
-                turmas = cursor.fetchall()
-                return [f"{id} - {nome}" for id, nome in turmas]
+            # Lista compartilhada em memória: só consulta o banco se as turmas mudaram
+            return cache_turmas.rotulos()
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro ao carregar turmas: {e}", text_color="red")
             return []
 
     def salvar_atividade(self):
         """Salva a nova atividade no banco de dados."""
-        turma_str = self.turma_selecionada.get()
+        turma_id = cache_turmas.id_de(self.turma_selecionada.get())
         data = self.data_entrega.get().strip()
         nome = self.nome_atividade.get().strip()
         descricao = self.descricao.get("0.0", "end").strip()
@@ -151,78 +151,89 @@ class Atividades(ctk.CTkFrame):
         if descricao == "Descrição da atividade...":
             descricao = "" 
 
-        if not data or not nome or not turma_str or turma_str == "Nenhuma turma cadastrada":
+        if not data or not nome or turma_id is None:
             self.status.configure(text="Preencha turma, data e nome da atividade.", text_color="red")
             return
-            
+
+        # A data é exibida como DD/MM/AAAA, mas gravada em ISO (AAAA-MM-DD)
         try:
-            turma_id = turma_str.split(" - ")[0]
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO atividades (turma_id, nome, data_entrega, descricao) 
-                    VALUES (?, ?, ?, ?)
-                """, (turma_id, nome, data, descricao))
-            
-            self.status.configure(text="Atividade salva com sucesso!", text_color="green")
-            # Limpa os campos
-            self.data_entrega.delete(0, 'end')
-            self.nome_atividade.delete(0, 'end')
-            self.descricao.delete("0.0", 'end')
-            self.restaurar_placeholder(None)
-            # Recarrega a lista
-            self.carregar_atividades(turma_str)
+            data = para_iso(data)
+        except ValueError:
+            self.status.configure(text="Data inválida. Use DD/MM/AAAA.", text_color="red")
+            return
             
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao salvar atividade: {str(e)}", text_color="red")
+        self.status.configure(text="Salvando...", text_color="#555555")
+        executar(lambda conn: inserir_atividade(conn, turma_id, nome, data, descricao),
+                 ao_concluir=lambda _: self._atividade_salva(turma_id),
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao salvar atividade: {str(e)}", text_color="red"),
+                 dono=self)
+
+    def _atividade_salva(self, turma_id):
+        """Chamado (na thread do Tk) quando a nova atividade foi gravada."""
+        self.status.configure(text="Atividade salva com sucesso!", text_color="green")
+        # Limpa os campos
+        self.data_entrega.delete(0, 'end')
+        self.nome_atividade.delete(0, 'end')
+        self.descricao.delete("0.0", 'end')
+        self.restaurar_placeholder(None)
+        # Recarrega a lista
+        self.carregar_atividades(turma_id)
+
+    def carregar_atividades(self, turma_id):
+        """
+        Carrega e exibe as atividades da turma (pelo id; None = nenhuma turma).
 
-    def carregar_atividades(self, turma_str):
-        """Carrega e exibe as atividades da turma selecionada."""
+        A consulta roda no executor do banco com a chave "Atividades.lista":
+        trocar de turma antes do fim substitui a carga anterior.
+        """
+        self._limpar_atividades()
+        
+        if turma_id is None:
+            executor.cancelar("Atividades.lista")
+            ctk.CTkLabel(self.frame_atividades, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+            return
+
+        ctk.CTkLabel(self.frame_atividades, text="Carregando atividades...", text_color="#555555").pack(pady=10)
+        executar(lambda conn: listar_atividades(conn, turma_id),
+                 ao_concluir=self._atividades_carregadas,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar atividades: {e}", text_color="red"),
+                 chave="Atividades.lista", dono=self)
+
+    def _limpar_atividades(self):
+        """Remove os cards (ou a mensagem) da lista de atividades."""
         for widget in self.frame_atividades.winfo_children():
             widget.destroy()
-        
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
-            if turma_str == "Nenhuma turma cadastrada":
-                ctk.CTkLabel(self.frame_atividades, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+
+    def _atividades_carregadas(self, atividades):
+        """Chamado (na thread do Tk) com as atividades da turma: monta um card para cada."""
+        self._limpar_atividades()
+        if not atividades:
+            ctk.CTkLabel(self.frame_atividades, text="Nenhuma atividade registrada para esta turma.", text_color="#555555").pack(pady=10)
             return
 
-        try:
-            turma_id = turma_str.split(" - ")[0]
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome, data_entrega, descricao FROM atividades WHERE turma_id = ? ORDER BY data_entrega DESC", (turma_id,))
-                atividades = cursor.fetchall()
-                
-            if not atividades:
-                ctk.CTkLabel(self.frame_atividades, text="Nenhuma atividade registrada para esta turma.", text_color="#555555").pack(pady=10)
-                return
-
-            # Cria um card para cada atividade
-            for ativ_id, nome, data, desc in atividades:
-                card = ctk.CTkFrame(self.frame_atividades, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
-                card.pack(fill="x", padx=10, pady=5)
-                
-                frame_info = ctk.CTkFrame(card, fg_color="transparent")
-                frame_info.pack(fill="x", padx=10, pady=5)
-                
-                text_frame = ctk.CTkFrame(frame_info, fg_color="transparent")
-                text_frame.pack(side="left", fill="x", expand=True)
-                
-                btn_frame = ctk.CTkFrame(frame_info, fg_color="transparent")
-                btn_frame.pack(side="right")
-                
-                ctk.CTkLabel(text_frame, text=f"📅 {data} | 📝 {nome}", font=("Segoe UI", 16, "bold"), text_color="#24232F").pack(anchor="w")
-                ctk.CTkLabel(text_frame, text=f"{desc or 'Sem descrição'}", font=("Segoe UI", 14), text_color="#444444", wraplength=350, justify="left").pack(anchor="w")
-
-                ctk.CTkButton(btn_frame, text="Editar", width=60, height=30, corner_radius=8,
-                              command=lambda id=ativ_id, n=nome, d=data, desc=desc: self.abrir_janela_edicao(id, n, d, desc),
-                              fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9").pack(pady=2)
-                ctk.CTkButton(btn_frame, text="Deletar", width=60, height=30, corner_radius=8,
-                              command=lambda id=ativ_id: self.deletar_atividade(id),
-                              fg_color="#FF6B6B", text_color="white", hover_color="#FF5252").pack(pady=2)
-                    
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao carregar atividades: {e}", text_color="red")
+        # Cria um card para cada atividade
+        for ativ_id, nome, data, desc in atividades:
+            card = ctk.CTkFrame(self.frame_atividades, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
+            card.pack(fill="x", padx=10, pady=5)
+            
+            frame_info = ctk.CTkFrame(card, fg_color="transparent")
+            frame_info.pack(fill="x", padx=10, pady=5)
+            
+            text_frame = ctk.CTkFrame(frame_info, fg_color="transparent")
+            text_frame.pack(side="left", fill="x", expand=True)
+            
+            btn_frame = ctk.CTkFrame(frame_info, fg_color="transparent")
+            btn_frame.pack(side="right")
+            
+            ctk.CTkLabel(text_frame, text=f"📅 {para_exibicao(data)} | 📝 {nome}", font=("Segoe UI", 16, "bold"), text_color="#24232F").pack(anchor="w")
+            ctk.CTkLabel(text_frame, text=f"{desc or 'Sem descrição'}", font=("Segoe UI", 14), text_color="#444444", wraplength=350, justify="left").pack(anchor="w")
+
+            ctk.CTkButton(btn_frame, text="Editar", width=60, height=30, corner_radius=8,
+                          command=lambda id=ativ_id, n=nome, d=data, desc=desc: self.abrir_janela_edicao(id, n, d, desc),
+                          fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9").pack(pady=2)
+            ctk.CTkButton(btn_frame, text="Deletar", width=60, height=30, corner_radius=8,
+                          command=lambda id=ativ_id: self.deletar_atividade(id),
+                          fg_color="#FF6B6B", text_color="white", hover_color="#FF5252").pack(pady=2)
 
     def deletar_atividade(self, atividade_id):
         """Deleta uma atividade do banco."""
@@ -231,18 +242,18 @@ class Atividades(ctk.CTkFrame):
         self.wait_window(dialog) 
         
         if dialog.obter_resposta():
-            try:
-                with conectar() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("DELETE FROM atividades WHERE id = ?", (atividade_id,))
-                
-                self.status.configure(text="Atividade deletada com sucesso!", text_color="green")
-                self.carregar_atividades(self.turma_selecionada.get()) # Recarrega
-            except sqlite3.Error as e:
-                self.status.configure(text=f"Erro ao deletar: {str(e)}", text_color="red")
+            executar(lambda conn: deletar_atividade_no_banco(conn, atividade_id),
+                     ao_concluir=lambda _: self._atividade_deletada(),
+                     ao_falhar=lambda e: self.status.configure(text=f"Erro ao deletar: {str(e)}", text_color="red"),
+                     dono=self)
         else:
             self.status.configure(text="Deleção cancelada.", text_color="#A9A9A9")
 
+    def _atividade_deletada(self):
+        """Chamado (na thread do Tk) quando a atividade foi deletada."""
+        self.status.configure(text="Atividade deletada com sucesso!", text_color="green")
+        self.carregar_atividades(self.turma_id_selecionada()) # Recarrega
+
     def abrir_janela_edicao(self, ativ_id, nome, data, descricao):
         """Abre o pop-up de edição de atividade."""
         self.status.configure(text="")
@@ -251,6 +262,7 @@ class Atividades(ctk.CTkFrame):
 
     def abrir_calendario(self, event=None):
         """Abre o pop-up de calendário."""
+        from tkcalendar import Calendar # Só é carregado ao abrir o calendário
         top = ctk.CTkToplevel(self)
         top.title("Selecionar Data")
         top.geometry("300x320")
@@ -258,7 +270,8 @@ class Atividades(ctk.CTkFrame):
         cal = Calendar(top, selectmode='day', 
                        year=datetime.datetime.now().year,
                        month=datetime.datetime.now().month, 
-                       day=datetime.datetime.now().day)
+                       day=datetime.datetime.now().day,
+                       date_pattern=PADRAO_CALENDARIO)
         cal.pack(pady=10, fill="both", expand=True)
 
         def pegar_data():
@@ -270,27 +283,35 @@ class Atividades(ctk.CTkFrame):
                       fg_color="#24232F", hover_color="#3A3A46").pack(pady=10)
         self.wait_window(top)
 
+    def ao_mostrar(self):
+        """Ao abrir a tela com dados novos no banco, recarrega turmas e atividades."""
+        self.atualizar_tela()
+
     def atualizar_tela(self, event=None):
         """Recarrega turmas e atividades quando a tela fica visível."""
         print("Atualizando tela de atividades...")
         if self.status.cget("text_color") != "green":
             self.status.configure(text="")
-            
-        turma_anterior = self.turma_selecionada.get()
+        self.carregar_atividades(self.atualizar_dropdown())
+
+    def atualizar_dropdown(self):
+        """
+        Assinante do cache_turmas (igual ao aula.py): atualiza só o dropdown e
+        devolve o id da turma selecionada; as atividades ficam para 'ao_mostrar'.
+        """
         self.turmas = self.carregar_turmas()
-        default_value = self.turmas[0] if self.turmas else "Nenhuma turma cadastrada"
-        
-        if self.turmas:
-            self.dropdown_turma.configure(values=self.turmas)
-            if turma_anterior in self.turmas:
-                self.dropdown_turma.set(turma_anterior)
-            else:
-                self.dropdown_turma.set(default_value)
-            self.carregar_atividades(self.dropdown_turma.get())
-        else:
+        if not self.turmas:
             self.dropdown_turma.configure(values=["Nenhuma turma cadastrada"])
             self.dropdown_turma.set("Nenhuma turma cadastrada")
-            self.carregar_atividades("Nenhuma turma cadastrada")
+            return None
+        self.dropdown_turma.configure(values=self.turmas)
+        turma = cache_turmas.turma(self.turma_selecionada.get()) or cache_turmas.turma(self.turmas[0])
+        self.dropdown_turma.set(turma.rotulo)
+        return turma.id
+
+    def turma_id_selecionada(self):
+        """Retorna o id da turma escolhida no dropdown (ou None)."""
+        return cache_turmas.id_de(self.turma_selecionada.get())
 
     def voltar(self):
         """Navega de volta para o Menu Principal."""
@@ -11,8 +11,11 @@ Ela permite:
 """
 
 import customtkinter as ctk
-from database import conectar
-from tkcalendar import Calendar # Importa o widget de calendário
+from cache_turmas import cache_turmas
+from executor_banco import executar, executor
+from datas import para_iso, PADRAO_CALENDARIO
+from repositorio.alunos import listar_alunos_turma
+from repositorio.aulas import registrar_aula
 import datetime
 import sqlite3
 
@@ -65,7 +68,7 @@ class Aula(ctk.CTkFrame):
         self.dropdown_turma = ctk.CTkOptionMenu(self.painel_direito,
                                                 values=self.turmas, 
                                                 variable=self.turma_selecionada, 
-                                                command=self.carregar_alunos,
+                                                command=cache_turmas.com_id(self.carregar_alunos),
                                                 height=40,
                                                 fg_color="white", button_color="#E0E0E0",
                                                 text_color="#24232F", dropdown_fg_color="white",
@@ -122,12 +125,9 @@ class Aula(ctk.CTkFrame):
 
         self.alunos_checkboxes = [] # Lista para guardar (aluno_id, checkbox_var)
         
-        # Gatilho para carregar alunos quando a tela se torna visível
-        self.bind("<Visibility>", self.atualizar_turmas)
-        
-        # Carga inicial dos alunos da turma padrão
-        print(f"Carregando alunos da turma padrão na inicialização: {default_value}")
-        self.carregar_alunos(default_value)
+        # Atualiza o dropdown quando uma turma for criada/alterada
+        cache_turmas.assinar(self.atualizar_dropdown)
+        # A carga inicial dos alunos é feita em 'ao_mostrar', quando a tela é aberta
 
     # --- Funções de Placeholder para CTkTextbox ---
     
@@ -149,6 +149,8 @@ class Aula(ctk.CTkFrame):
         """
         Abre uma janela pop-up (Toplevel) com um widget de calendário.
         """
+        # Importado só aqui: o tkcalendar só é carregado quando o calendário é aberto
+        from tkcalendar import Calendar
         top = ctk.CTkToplevel(self) # Cria uma nova janela
         top.title("Selecionar Data")
         top.geometry("300x320")
@@ -157,7 +159,8 @@ class Aula(ctk.CTkFrame):
         cal = Calendar(top, selectmode='day', 
                        year=datetime.datetime.now().year,
                        month=datetime.datetime.now().month, 
-                       day=datetime.datetime.now().day)
+                       day=datetime.datetime.now().day,
+                       date_pattern=PADRAO_CALENDARIO)
         cal.pack(pady=10, fill="both", expand=True)
 
         def pegar_data():
@@ -171,101 +174,104 @@ class Aula(ctk.CTkFrame):
         
         self.wait_window(top) # Espera a janela do calendário ser fechada
 
+    def ao_mostrar(self):
+        """Gancho de ativação (ver Aplicativo.mostrar_tela): recarrega turmas e alunos."""
+        self.atualizar_turmas()
+
     def atualizar_turmas(self, event=None):
         """
         Recarrega a lista de turmas e os alunos da turma selecionada.
         Chamado quando a tela se torna visível.
         """
-        print("Atualizando lista de turmas (evento Visibility)...")
-        turma_anterior = self.turma_selecionada.get()
+        print("Atualizando lista de turmas e alunos...")
+        self.carregar_alunos(self.atualizar_dropdown())
+
+    def atualizar_dropdown(self):
+        """
+        Atualiza as opções do dropdown de turmas, mantendo a seleção se a turma
+        ainda existir. É o assinante do cache_turmas: só mexe no dropdown, sem
+        consultar os dados da tela (eles são recarregados em 'ao_mostrar').
+
+        Returns:
+            int: Id da turma selecionada (None se não houver turmas).
+        """
         self.turmas = self.carregar_turmas()
-        default_value = self.turmas[0] if self.turmas else "Nenhuma turma cadastrada"
-        
-        if self.turmas:
-            self.dropdown_turma.configure(values=self.turmas)
-            # Tenta manter a seleção anterior, se ela ainda existir
-            if turma_anterior in self.turmas:
-                self.dropdown_turma.set(turma_anterior)
-                self.carregar_alunos(turma_anterior)
-            else:
-                self.dropdown_turma.set(default_value)
-                self.carregar_alunos(default_value)
-        else:
-             # Caso não haja turmas
-             self.dropdown_turma.configure(values=["Nenhuma turma cadastrada"])
-             self.dropdown_turma.set("Nenhuma turma cadastrada")
-             self.carregar_alunos("Nenhuma turma cadastrada")
+        if not self.turmas:
+            self.dropdown_turma.configure(values=["Nenhuma turma cadastrada"])
+            self.dropdown_turma.set("Nenhuma turma cadastrada")
+            return None
+        self.dropdown_turma.configure(values=self.turmas)
+        turma = cache_turmas.turma(self.turma_selecionada.get()) or cache_turmas.turma(self.turmas[0])
+        self.dropdown_turma.set(turma.rotulo)
+        return turma.id
 
     def carregar_turmas(self):
         """
-        Busca a lista de turmas no banco de dados.
+        Retorna a lista de turmas (do cache compartilhado em memória).
         
         Returns:
             list: Lista de strings formatadas "ID - Nome" ou lista vazia.
         """
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM turmas ORDER BY nome")
-                turmas = cursor.fetchall()
-                return [f"{id} - {nome}" for id, nome in turmas]
+            # Lista compartilhada em memória: só consulta o banco se as turmas mudaram
+            return cache_turmas.rotulos()
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro ao carregar turmas: {e}", text_color="red")
             return []
 
-    def carregar_alunos(self, turma_str):
+    def carregar_alunos(self, turma_id):
         """
         Carrega os alunos da turma selecionada no frame de checkboxes.
-        Esta função é chamada automaticamente pelo dropdown.
+        Esta função é chamada automaticamente pelo dropdown (ver 'cache_turmas.com_id').
+        A query roda no executor do banco; ao trocar de turma rapidamente,
+        o pedido da turma anterior é cancelado.
 
         Args:
-            turma_str (str): A string da turma selecionada (ex: "1 - 3º Ano A").
+            turma_id (int): ID da turma selecionada, ou None se não houver turmas.
         """
-        print(f"Carregando alunos para: {turma_str}")
-        
-        # Limpa widgets (checkboxes) anteriores
+        print(f"Carregando alunos para a turma: {turma_id}")
+        self._limpar_alunos()
+
+        if turma_id is None:
+            executor.cancelar("Aula.alunos")
+            ctk.CTkLabel(self.frame_alunos, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+            return
+
+        ctk.CTkLabel(self.frame_alunos, text="Carregando alunos...", text_color="#555555").pack(pady=10)
+        executar(lambda conn: listar_alunos_turma(conn, turma_id),
+                 ao_concluir=self._alunos_carregados,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar alunos: {e}", text_color="red"),
+                 chave="Aula.alunos", dono=self)
+
+    def _limpar_alunos(self):
+        """Remove os checkboxes (ou a mensagem) da lista de alunos."""
         for widget in self.frame_alunos.winfo_children():
             widget.destroy()
         self.alunos_checkboxes.clear()
-        
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
-            if turma_str == "Nenhuma turma cadastrada":
-                ctk.CTkLabel(self.frame_alunos, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+
+    def _alunos_carregados(self, alunos):
+        """Chamado (na thread do Tk) com os alunos da turma: cria um checkbox por aluno."""
+        self._limpar_alunos()
+        if not alunos:
+            ctk.CTkLabel(self.frame_alunos, text="Nenhum aluno cadastrado nesta turma.", text_color="#555555").pack(pady=10)
             return
-            
-        try:
-            turma_id = turma_str.split(" - ")[0]
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM alunos WHERE turma_id = ? ORDER BY nome", (turma_id,))
-                alunos = cursor.fetchall()
-                
-            if not alunos:
-                ctk.CTkLabel(self.frame_alunos, text="Nenhum aluno cadastrado nesta turma.", text_color="#555555").pack(pady=10)
-                return
-
-            # Cria um checkbox para cada aluno
-            for aluno_id, nome in alunos:
-                var = ctk.BooleanVar(value=True) # Começa marcado como presente
-                checkbox = ctk.CTkCheckBox(self.frame_alunos, text=nome, variable=var, 
-                                           text_color="#24232F",
-                                           border_color="#24232F",
-                                           hover_color="#3A3A46",
-                                           fg_color="#24232F")
-                checkbox.pack(anchor="w", padx=20, pady=5)
-                self.alunos_checkboxes.append((aluno_id, var))
-                
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao carregar alunos: {e}", text_color="red")
-        except IndexError:
-             # Erro se a string da turma for mal formatada
-             self.status.configure(text=f"Erro ao processar o nome da turma.", text_color="red")
+
+        # Cria um checkbox para cada aluno
+        for aluno_id, nome in alunos:
+            var = ctk.BooleanVar(value=True) # Começa marcado como presente
+            checkbox = ctk.CTkCheckBox(self.frame_alunos, text=nome, variable=var, 
+                                       text_color="#24232F",
+                                       border_color="#24232F",
+                                       hover_color="#3A3A46",
+                                       fg_color="#24232F")
+            checkbox.pack(anchor="w", padx=20, pady=5)
+            self.alunos_checkboxes.append((aluno_id, var))
 
     def salvar_aula(self):
         """
         Salva a aula e os registros de presença no banco de dados.
         """
-        turma_str = self.turma_selecionada.get()
+        turma_id = cache_turmas.id_de(self.turma_selecionada.get())
         data = self.data.get().strip()
         tema = self.tema.get().strip()
         descricao = self.descricao.get("0.0", "end").strip()
@@ -278,55 +284,60 @@ class Aula(ctk.CTkFrame):
         if not data or not tema:
             self.status.configure(text="Preencha data e tema.", text_color="red")
             return
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
+        if turma_id is None:
             self.status.configure(text="Selecione uma turma válida.", text_color="red")
             return
         if not self.alunos_checkboxes:
             self.status.configure(text="Não há alunos nesta turma para salvar.", text_color="red")
             return
-            
+
+        # A data é exibida como DD/MM/AAAA, mas gravada em ISO (AAAA-MM-DD)
         try:
-            turma_id = turma_str.split(" - ")[0]
-            with conectar() as conn:
-                cursor = conn.cursor()
-                
-                # 1. Insere a aula
-                cursor.execute("INSERT INTO aulas (turma_id, data, tema, descricao) VALUES (?, ?, ?, ?)", (turma_id, data, tema, descricao))
-                aula_id = cursor.lastrowid # Pega o ID da aula recém-criada
-
-                # 2. Prepara os dados de presença em lote
-                presencas_data = []
-                for aluno_id, var in self.alunos_checkboxes:
-                    presente = 1 if var.get() else 0 # Converte booleano para 1 ou 0
-                    presencas_data.append((aula_id, aluno_id, presente))
-                
-                # 3. Insere todas as presenças de uma vez (muito mais eficiente)
-                cursor.executemany("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (?, ?, ?)", presencas_data)
-
-            self.status.configure(text="Aula e presença registradas com sucesso!", text_color="green")
-            # Limpa os campos
-            self.data.delete(0, 'end')
-            self.tema.delete(0, 'end')
-            self.descricao.delete("0.0", 'end')
-            self.restaurar_placeholder(None)
+            data = para_iso(data)
+        except ValueError:
+            self.status.configure(text="Data inválida. Use DD/MM/AAAA.", text_color="red")
+            return
             
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao salvar: {str(e)}", text_color="red")
-        except Exception as e:
-            self.status.configure(text=f"Erro inesperado: {str(e)}", text_color="red")
+        # As presenças são lidas dos checkboxes aqui, na thread do Tk
+        presencas = [(aluno_id, 1 if var.get() else 0) for aluno_id, var in self.alunos_checkboxes]
+
+        # A gravação roda no executor do banco; o botão fica desabilitado até terminar
+        self.btn_salvar.configure(state="disabled")
+        self.status.configure(text="Salvando...", text_color="#555555")
+        executar(lambda conn: registrar_aula(conn, turma_id, data, tema, descricao, presencas),
+                 ao_concluir=self._aula_salva, ao_falhar=self._erro_ao_salvar, dono=self)
+
+    def _aula_salva(self, _):
+        """Chamado (na thread do Tk) quando a aula foi gravada."""
+        self.btn_salvar.configure(state="normal")
+        self.status.configure(text="Aula e presença registradas com sucesso!", text_color="green")
+        # Limpa os campos
+        self.data.delete(0, 'end')
+        self.tema.delete(0, 'end')
+        self.descricao.delete("0.0", 'end')
+        self.restaurar_placeholder(None)
+
+    def _erro_ao_salvar(self, erro):
+        """Chamado (na thread do Tk) quando a gravação falhou."""
+        self.btn_salvar.configure(state="normal")
+        if isinstance(erro, sqlite3.Error):
+            self.status.configure(text=f"Erro ao salvar: {str(erro)}", text_color="red")
+        else:
+            self.status.configure(text=f"Erro inesperado: {str(erro)}", text_color="red")
 
     def voltar(self):
         """
         Navega de volta para o Menu Principal, limpando a tela.
+
+        A lista de alunos é mantida (ao voltar sem mudanças no banco, 'ao_mostrar'
+        não é chamado e nada a recarregaria): só as presenças voltam a "presente".
         """
         self.status.configure(text="")
         self.data.delete(0, 'end')
         self.tema.delete(0, 'end')
         self.descricao.delete("0.0", 'end')
         self.restaurar_placeholder(None)
-        # Limpa a lista de alunos
-        for widget in self.frame_alunos.winfo_children():
-            widget.destroy()
-        self.alunos_checkboxes.clear()
-        
+        for _, var in self.alunos_checkboxes:
+            var.set(True)
+
         self.controlador.mostrar_tela("MenuPrincipal")
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""
+Arquivo da Base de Conhecimento do Chatbot (base_conhecimento.py)
+
+Este módulo carrega as perguntas frequentes (FAQ) do arquivo 'faq.json'
+UMA vez e responde perguntas em texto livre, escolhendo a entrada mais
+parecida com a pergunta.
+
+Como funciona:
+1. Normalização: minúsculas, sem acentos ("Frequência" == "frequencia"),
+   sem palavras vazias ("como", "de", "o"...) e sem plural simples.
+2. Índice invertido: termo -> [(entrada, peso)]. Uma pergunta só visita
+   as entradas que contêm algum dos seus termos, então o tempo de resposta
+   depende dos termos da pergunta, não do tamanho da base.
+3. Ranqueamento BM25: termos raros na base valem mais que termos comuns,
+   e respostas longas não ganham só por terem mais palavras. O peso BM25
+   de cada (termo, entrada) é calculado na carga: a busca só soma pesos.
+
+Formato do 'faq.json' (lista de objetos):
+    {"pergunta": "...", "resposta": "...",
+     "chaves": "sinônimos e palavras extras (opcional)",
+     "destaque": true  (opcional: vira um botão de pergunta pronta)}
+
+Teste pelo terminal: python base_conhecimento.py "como exportar a frequência?"
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+
+# Arquivo da base (fica na pasta do programa, junto deste módulo)
+CAMINHO_FAQ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "faq.json")
+
+# Parâmetros do BM25: saturação da frequência do termo e peso do tamanho do texto
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Os termos da pergunta/chaves de uma entrada contam mais que os da resposta
+PESO_PERGUNTA = 3
+
+PALAVRAS_VAZIAS = frozenset("""
+    a ao aos as o os e de da das do dos em no na nos nas num numa um uma uns umas
+    para pra por pelo pela com sem como que qual quais onde quando eu me meu minha
+    se ser esta estou tem ter faco fazer posso pode vou isso isto la ja mais muito
+""".split())
+
+EntradaFAQ = namedtuple("EntradaFAQ", ("pergunta", "resposta", "destaque"))
+
+def normalizar(texto):
+    """
+    Deixa o texto em minúsculas e sem acentos.
+
+    Exemplo:
+        normalizar("Frequência") -> "frequencia"
+    """
+    decomposto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+def _radical(termo):
+    """Remove o plural simples (alunos -> aluno, importacoes -> importacao)."""
+    if termo.endswith("oes") and len(termo) > 4:
+        return termo[:-3] + "ao"
+    if termo.endswith("s") and len(termo) > 3 and not termo.endswith("ss"):
+        return termo[:-1]
+    return termo
+
+def tokenizar(texto):
+    """
+    Divide o texto em termos normalizados (sem acentos, palavras vazias e plural).
+
+    Returns:
+        list: Os termos, na ordem do texto (com repetições).
+    """
+    return [_radical(palavra) for palavra in re.findall(r"[a-z0-9]+", normalizar(texto))
+            if palavra not in PALAVRAS_VAZIAS]
+
+class BaseConhecimento:
+    """
+    FAQ indexada para busca em texto livre (índice invertido + BM25).
+
+    A base é carregada do arquivo na primeira consulta (ver 'carregar').
+    """
+
+    def __init__(self, caminho=CAMINHO_FAQ):
+        """
+        Args:
+            caminho (str): Caminho do arquivo JSON da FAQ.
+        """
+        self.caminho = caminho
+        self.entradas = []
+        self._indice = {} # termo -> lista de (posição da entrada, peso BM25)
+        self.carregada = False
+        self.erro = None # Mensagem do último erro de carregamento
+
+    def carregar(self, caminho=None):
+        """
+        Lê o arquivo da FAQ e (re)constrói o índice.
+
+        Args:
+            caminho (str): Outro arquivo a usar (padrão: o do construtor).
+
+        Returns:
+            bool: True se carregou; False se o arquivo não pôde ser lido
+            (a base fica vazia e 'erro' guarda o motivo).
+        """
+        if caminho is not None:
+            self.caminho = caminho
+        try:
+            with open(self.caminho, encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+            entradas = [EntradaFAQ(item["pergunta"], item["resposta"], bool(item.get("destaque")))
+                        for item in dados]
+            documentos = [tokenizar(f"{item['pergunta']} {item.get('chaves', '')}") * PESO_PERGUNTA
+                          + tokenizar(item["resposta"]) for item in dados]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Erro ao carregar a base de conhecimento '{self.caminho}': {e}")
+            entradas, documentos = [], []
+            self.erro = str(e)
+        else:
+            self.erro = None
+
+        self.entradas = entradas
+        self._indexar(documentos)
+        self.carregada = True
+        return self.erro is None
+
+    def _indexar(self, documentos):
+        """Monta o índice invertido com o peso BM25 de cada termo em cada entrada."""
+        ocorrencias = {} # termo -> [(posição, ocorrências)]
+        for posicao, termos in enumerate(documentos):
+            contagem = {}
+            for termo in termos:
+                contagem[termo] = contagem.get(termo, 0) + 1
+            for termo, vezes in contagem.items():
+                ocorrencias.setdefault(termo, []).append((posicao, vezes))
+
+        total = len(documentos)
+        tamanho_medio = sum(len(termos) for termos in documentos) / total if total else 0.0
+        indice = {}
+        for termo, lista in ocorrencias.items():
+            idf = math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5))
+            pesos = []
+            for posicao, vezes in lista:
+                tamanho = len(documentos[posicao]) / tamanho_medio
+                saturacao = vezes * (BM25_K1 + 1) / (vezes + BM25_K1 * (1 - BM25_B + BM25_B * tamanho))
+                pesos.append((posicao, idf * saturacao))
+            indice[termo] = pesos
+        self._indice = indice
+
+    def buscar(self, pergunta, limite=3):
+        """
+        Ranqueia as entradas da FAQ para uma pergunta em texto livre.
+
+        Args:
+            pergunta (str): O texto digitado.
+            limite (int): Quantas entradas retornar, no máximo.
+
+        Returns:
+            list: Tuplas (pontuacao, EntradaFAQ), da mais para a menos
+            parecida. Vazia se nenhum termo da pergunta estiver na base.
+        """
+        if not self.carregada:
+            self.carregar()
+
+        pontuacoes = {}
+        for termo in set(tokenizar(pergunta)):
+            for posicao, peso in self._indice.get(termo, ()):
+                pontuacoes[posicao] = pontuacoes.get(posicao, 0.0) + peso
+
+        melhores = heapq.nlargest(limite, pontuacoes.items(), key=lambda item: item[1])
+        return [(pontuacao, self.entradas[posicao]) for posicao, pontuacao in melhores]
+
+    def destaques(self):
+        """
+        Returns:
+            list: As perguntas marcadas com "destaque" (os botões do Chatbot).
+        """
+        if not self.carregada:
+            self.carregar()
+        return [entrada.pergunta for entrada in self.entradas if entrada.destaque]
+
+# Instância única usada pelo Chatbot
+base_conhecimento = BaseConhecimento()
+
+if __name__ == "__main__":
+    pergunta = " ".join(sys.argv[1:]) or "como exportar a frequência?"
+    base_conhecimento.carregar()
+    inicio = time.perf_counter()
+    resultados = base_conhecimento.buscar(pergunta)
+    decorrido = (time.perf_counter() - inicio) * 1000
+    print(f"{len(base_conhecimento.entradas)} entradas, {len(base_conhecimento._indice)} termos no índice.")
+    print(f"Pergunta: {pergunta!r} ({decorrido:.3f} ms)")
+    for pontuacao, entrada in resultados:
+        print(f"  {pontuacao:6.2f}  {entrada.pergunta}")
@@ -0,0 +1,121 @@
+"""
+Arquivo do Cache de Turmas (cache_turmas.py)
+
+Este módulo mantém a lista de turmas em memória, compartilhada por todas as
+telas que têm um dropdown de turma (Aluno, Aula, Relatorio, Visualizacao,
+Atividades). Antes, cada tela repetia 'SELECT id, nome FROM turmas' toda vez
+que ficava visível.
+
+- A lista é lida do banco UMA vez e reaproveitada.
+- Quem altera a tabela 'turmas' (ex: Turma.salvar_turma) chama 'invalidar()'.
+- As telas se inscrevem com 'assinar(callback)' e são avisadas da mudança
+  para atualizar os seus dropdowns. O callback só mexe no dropdown: os
+  dados da tela são recarregados em 'ao_mostrar', quando ela é aberta com o
+  banco alterado (ver main.Aplicativo._ativar), e não em cada tela escondida.
+- Cada turma é um 'TurmaRef' (id, nome). O rótulo mostrado no dropdown
+  ("ID - Nome") é só para exibição: o id é obtido pelo mapa rótulo -> turma
+  ('id_de'), nunca recortando a string (um nome com " - " quebrava o split).
+"""
+
+from database import conectar
+from repositorio.turmas import listar_turmas
+
+class CacheTurmas:
+    """
+    Lista de turmas em memória com avisos de mudança (usada na thread do Tk).
+    """
+
+    def __init__(self):
+        self._turmas = None # Lista de TurmaRef ou None se precisar recarregar
+        self._rotulos = [] # Rótulos na ordem do dropdown
+        self._por_rotulo = {} # rótulo -> TurmaRef
+        self._assinantes = []
+        self.consultas = 0 # Quantas vezes a lista foi lida do banco
+
+    def obter(self):
+        """
+        Retorna as turmas (lendo do banco só se o cache estiver vazio/invalidado).
+
+        Returns:
+            list: TurmaRef ordenadas por nome.
+
+        Raises:
+            sqlite3.Error: Se a leitura do banco falhar.
+        """
+        if self._turmas is None:
+            with conectar() as conn:
+                self._turmas = listar_turmas(conn)
+            self._rotulos = [turma.rotulo for turma in self._turmas]
+            self._por_rotulo = dict(zip(self._rotulos, self._turmas))
+            self.consultas += 1
+        return self._turmas
+
+    def rotulos(self):
+        """
+        Retorna os rótulos das turmas para os dropdowns (a mesma lista é
+        reaproveitada até a próxima invalidação; não altere).
+
+        Returns:
+            list: Strings "ID - Nome" (ex: "1 - 3º Ano A").
+        """
+        self.obter()
+        return self._rotulos
+
+    def turma(self, rotulo):
+        """
+        Retorna a turma de um rótulo do dropdown.
+
+        Args:
+            rotulo (str): Valor selecionado no dropdown.
+
+        Returns:
+            TurmaRef: A turma, ou None se o rótulo não for de uma turma
+            (ex: "Nenhuma turma cadastrada").
+        """
+        if self._turmas is None:
+            self.obter()
+        return self._por_rotulo.get(rotulo)
+
+    def id_de(self, rotulo):
+        """Retorna o id da turma de um rótulo do dropdown (ou None)."""
+        turma = self.turma(rotulo)
+        return turma.id if turma is not None else None
+
+    def com_id(self, callback):
+        """
+        Adapta 'callback(turma_id)' para o 'command' de um dropdown, que
+        recebe o rótulo escolhido.
+
+        Returns:
+            callable: Função que recebe o rótulo e chama 'callback' com o id (ou None).
+        """
+        return lambda rotulo: callback(self.id_de(rotulo))
+
+    def invalidar(self):
+        """
+        Descarta a lista em memória e avisa os assinantes.
+        Deve ser chamado depois de qualquer alteração na tabela 'turmas'.
+        """
+        self._turmas = None
+        self._rotulos = []
+        self._por_rotulo = {}
+        for callback in list(self._assinantes):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Erro ao avisar mudança nas turmas: {e}")
+
+    def assinar(self, callback):
+        """
+        Registra 'callback()' para ser chamado quando as turmas mudarem.
+        """
+        if callback not in self._assinantes:
+            self._assinantes.append(callback)
+
+    def cancelar_assinatura(self, callback):
+        """Remove um callback registrado com 'assinar'."""
+        if callback in self._assinantes:
+            self._assinantes.remove(callback)
+
+# Instância única usada por todo o sistema
+cache_turmas = CacheTurmas()
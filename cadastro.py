@@ -6,7 +6,9 @@ novos usuários criem uma conta no sistema.
 """
 
 import customtkinter as ctk
-from database import conectar, hash_senha
+from database import hash_senha
+from repositorio.usuarios import cadastrar_usuario
+from executor_banco import executar, executar_senha
 import re
 import sqlite3
 
@@ -135,27 +137,39 @@ class Cadastro(ctk.CTkFrame):
             self.status.configure(text="As senhas não coincidem.", text_color="red")
             return
             
-        try:
-            # Tenta inserir o novo usuário no banco
-            with conectar() as conn:
-                cursor = conn.cursor()
-                # Usa a função hash_senha para criptografar
-                cursor.execute("INSERT INTO usuarios (nome, email, senha) VALUES (?, ?, ?)", (nome, email, hash_senha(senha)))
-            
-            self.status.configure(text="Usuário cadastrado com sucesso!", text_color="green")
-            # Limpa todos os campos
-            self.nome.delete(0, 'end')
-            self.email.delete(0, 'end')
-            self.senha.delete(0, 'end')
-            self.confirmar_senha.delete(0, 'end')
-            
-        except sqlite3.IntegrityError:
+        # O hash da senha é lento de propósito: é calculado no executor de
+        # senhas e só o INSERT vai ao executor do banco (ver '_gravar_usuario')
+        self.btn_cadastrar.configure(state="disabled")
+        self.status.configure(text="Cadastrando...", text_color="#555555")
+        executar_senha(lambda: hash_senha(senha),
+                       ao_concluir=lambda senha_hash: self._gravar_usuario(nome, email, senha_hash),
+                       ao_falhar=self._erro_no_cadastro, dono=self)
+
+    def _gravar_usuario(self, nome, email, senha_hash):
+        """Chamado (na thread do Tk) com o hash pronto: grava o usuário no executor do banco."""
+        executar(lambda conn: cadastrar_usuario(conn, nome, email, senha_hash),
+                 ao_concluir=self._usuario_cadastrado, ao_falhar=self._erro_no_cadastro, dono=self)
+
+    def _usuario_cadastrado(self, _):
+        """Chamado (na thread do Tk) quando o usuário foi gravado."""
+        self.btn_cadastrar.configure(state="normal")
+        self.status.configure(text="Usuário cadastrado com sucesso!", text_color="green")
+        # Limpa todos os campos
+        self.nome.delete(0, 'end')
+        self.email.delete(0, 'end')
+        self.senha.delete(0, 'end')
+        self.confirmar_senha.delete(0, 'end')
+
+    def _erro_no_cadastro(self, erro):
+        """Chamado (na thread do Tk) se o cadastro falhar."""
+        self.btn_cadastrar.configure(state="normal")
+        if isinstance(erro, sqlite3.IntegrityError):
             # Erro específico para quando o e-mail já existe (violando a restrição UNIQUE)
             self.status.configure(text="Erro: e-mail já cadastrado.", text_color="red")
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro no banco: {str(e)}", text_color="red")
-        except Exception as e:
-            self.status.configure(text=f"Erro inesperado: {str(e)}", text_color="red")
+        elif isinstance(erro, sqlite3.Error):
+            self.status.configure(text=f"Erro no banco: {str(erro)}", text_color="red")
+        else:
+            self.status.configure(text=f"Erro inesperado: {str(erro)}", text_color="red")
 
     def voltar(self):
         """
@@ -3,9 +3,18 @@ Arquivo da Tela do Chatbot (chatbot.py)
 
 Este módulo define a classe 'Chatbot', que cumpre o requisito de IA, 
 fornecendo um "chatbot básico para dúvidas frequentes".
+As respostas vêm da base de conhecimento (ver base_conhecimento.py), que
+também aceita perguntas digitadas em texto livre. Perguntas sobre os dados
+(faltas, aulas no mês, atividades...) são respondidas com consultas ao
+banco (ver consultas_chatbot.py).
 """
 
 import customtkinter as ctk
+import datetime
+import sqlite3
+from base_conhecimento import base_conhecimento
+from consultas_chatbot import consultas_chatbot
+from executor_banco import executar, executor
 
 class Chatbot(ctk.CTkFrame):
     """
@@ -47,24 +56,33 @@ class Chatbot(ctk.CTkFrame):
         
         ctk.CTkLabel(self.painel_direito, text="Assistente Acadêmico", font=("Segoe UI", 36, "bold"), text_color="#24232F").pack(pady=20)
 
-        # Perguntas pré-definidas
-        perguntas = [
-            "Como cadastrar aluno?",
-            "Como registrar aula?",
-            "Como ver frequência?",
-            "Como visualizar turmas?",
-            "Como usar o chatbot?",
-            "Estou com erro no sistema"
-        ]
+        # Perguntas prontas: as entradas marcadas com "destaque" no faq.json
+        perguntas = base_conhecimento.destaques()
 
         frame_perguntas = ctk.CTkFrame(self.painel_direito, fg_color="transparent")
-        frame_perguntas.pack(pady=10)
+        frame_perguntas.pack(pady=5)
 
-        # Cria os botões de pergunta
-        for texto in perguntas:
+        # Cria os botões de pergunta (em duas colunas)
+        for i, texto in enumerate(perguntas):
             ctk.CTkButton(frame_perguntas, text=texto, command=lambda t=texto: self.responder(t),
                           fg_color="#24232F", hover_color="#3A3A46", 
-                          text_color="white", width=300, height=35, corner_radius=10).pack(pady=5)
+                          text_color="white", width=230, height=35, corner_radius=10).grid(row=i // 2, column=i % 2, padx=5, pady=4)
+
+        # Campo para perguntas em texto livre (Enter ou botão "Perguntar")
+        frame_pergunta_livre = ctk.CTkFrame(self.painel_direito, fg_color="transparent")
+        frame_pergunta_livre.pack(fill="x", padx=10, pady=(10, 0))
+        self.pergunta_livre = ctk.CTkEntry(frame_pergunta_livre,
+                                           placeholder_text="Ou digite a sua dúvida...",
+                                           height=35,
+                                           fg_color="white",
+                                           border_color="#E0E0E0", border_width=1,
+                                           text_color="#24232F",
+                                           placeholder_text_color="#888888")
+        self.pergunta_livre.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.pergunta_livre.bind("<Return>", lambda event: self.perguntar())
+        ctk.CTkButton(frame_pergunta_livre, text="Perguntar", command=self.perguntar,
+                      fg_color="#24232F", hover_color="#3A3A46",
+                      width=100, height=35, corner_radius=10).pack(side="right")
 
         # Botão Voltar (empacotado no final)
         self.btn_voltar = ctk.CTkButton(self.painel_direito, text="Voltar", command=self.voltar, 
@@ -74,7 +92,7 @@ class Chatbot(ctk.CTkFrame):
 
         # Frame da Resposta (com rolagem)
         self.resposta_frame = ctk.CTkScrollableFrame(self.painel_direito, fg_color="#EAEAEA", corner_radius=10)
-        self.resposta_frame.pack(pady=20, padx=10, fill="both", expand=True) 
+        self.resposta_frame.pack(pady=10, padx=10, fill="both", expand=True) 
 
         # Configura o grid interno do frame de rolagem para o padding funcionar
         self.resposta_frame.grid_columnconfigure(0, weight=1)
@@ -88,40 +106,64 @@ class Chatbot(ctk.CTkFrame):
         self.resposta.grid(row=0, column=0, pady=20, padx=10, sticky="w")
         # --- Fim do Painel Direito ---
 
+    def perguntar(self):
+        """Responde a pergunta digitada no campo de texto livre."""
+        pergunta = self.pergunta_livre.get().strip()
+        if pergunta:
+            self.responder(pergunta)
+
     def responder(self, pergunta):
         """
-        Exibe a resposta correspondente à pergunta clicada.
+        Exibe a resposta da FAQ mais parecida com a pergunta (clicada ou digitada).
         Esta é a funcionalidade de "IA" (chatbot básico).
         
         Args:
-            pergunta (str): O texto do botão que foi clicado.
+            pergunta (str): O texto do botão clicado ou a pergunta digitada.
         """
         try:
-            texto = pergunta.lower()
-            
-            # Base de conhecimento simples (FAQ)
-            faq = {
-                "cadastrar aluno": "Vá ao menu principal e clique em 'Cadastrar Aluno'. Preencha nome e selecione turma. Lembre-se de cadastrar uma turma primeiro!",
-                "registrar aula": "Use a opção 'Registrar Aula'. Selecione a turma, a data e o tema. Os alunos carregarão automaticamente. Marque os presentes e clique em 'Salvar'.",
-                "ver frequência": "Acesse 'Relatório de Aulas'. Selecione a turma para ver o histórico de aulas e presenças. Você pode editar, deletar ou exportar para CSV.",
-                "visualizar turmas": "Clique em 'Visualizar Alunos'. Selecione uma turma para ver todos os alunos, seu histórico de presença, e editar ou deletar alunos.",
-                "usar o chatbot": "Este é o chatbot! Você clica em uma das perguntas pré-definidas e eu mostro a resposta aqui. Simples assim.",
-                "erro no sistema": "1. Verifique se o arquivo 'sistema_escolar.db' está na mesma pasta. \n2. Verifique se todas as dependências do 'requirements.txt' estão instaladas. \n3. Se um erro persistir, tente apagar o arquivo .db e reiniciar o app para criar um banco de dados limpo."
-            }
-            
-            resposta_encontrada = "Desculpe, não entendi. Tente reformular."
-            for chave in faq:
-                if chave in texto:
-                    resposta_encontrada = faq[chave]
-                    break
+            # 1. Pergunta sobre os dados da escola? A consulta roda no executor do banco
+            pedido = consultas_chatbot.interpretar(pergunta, datetime.date.today())
+            if pedido is not None:
+                self.resposta.configure(text="Consultando...", text_color="#555555")
+                executar(lambda conn: consultas_chatbot.responder_pedido(conn, pedido),
+                         ao_concluir=lambda texto: self.resposta.configure(text=texto, text_color="#24232F"),
+                         ao_falhar=self._erro_na_consulta, chave="Chatbot.consulta", dono=self)
+                return
+
+            # 2. Dúvida de uso do sistema: procura na FAQ
+            resultados = base_conhecimento.buscar(pergunta)
+            if base_conhecimento.erro:
+                self.resposta.configure(text=f"Base de conhecimento indisponível: {base_conhecimento.erro}", text_color="red")
+                return
+            if not resultados:
+                self.resposta.configure(text="Desculpe, não entendi. Tente reformular.", text_color="#24232F")
+                return
+
+            _, melhor = resultados[0]
+            resposta_encontrada = melhor.resposta
+            # As outras entradas encontradas viram sugestões
+            relacionadas = [entrada.pergunta for _, entrada in resultados[1:]]
+            if relacionadas:
+                resposta_encontrada += "\n\nVeja também: " + " | ".join(relacionadas)
             
             self.resposta.configure(text=resposta_encontrada, text_color="#24232F") 
+        except sqlite3.Error as e:
+            self.resposta.configure(text=f"Erro ao consultar o banco: {e}", text_color="red")
         except Exception as e:
             self.resposta.configure(text=f"Erro inesperado: {str(e)}. Tente novamente.", text_color="red")
 
+    def _erro_na_consulta(self, erro):
+        """Chamado (na thread do Tk) se a consulta de uma pergunta sobre os dados falhar."""
+        if isinstance(erro, sqlite3.Error):
+            self.resposta.configure(text=f"Erro ao consultar o banco: {erro}", text_color="red")
+        else:
+            self.resposta.configure(text=f"Erro inesperado: {str(erro)}. Tente novamente.", text_color="red")
+
     def voltar(self):
         """
         Navega de volta para o Menu Principal e reseta o texto da resposta.
         """
+        executor.cancelar("Chatbot.consulta") # Uma resposta atrasada não deve aparecer na volta
         self.resposta.configure(text="Clique em uma pergunta para ver a resposta.", text_color="#444444")
+        self.pergunta_livre.delete(0, "end")
         self.controlador.mostrar_tela("MenuPrincipal")
\ No newline at end of file
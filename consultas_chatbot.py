@@ -0,0 +1,322 @@
+"""
+Arquivo das Consultas de Dados do Chatbot (consultas_chatbot.py)
+
+Este módulo responde, no Chatbot, perguntas sobre os DADOS da escola
+(ex: "quem faltou mais de 25% no 3º Ano A?", "quantas aulas em outubro?"),
+que a base de conhecimento (perguntas de uso do sistema) não cobre.
+
+Fluxo:
+1. A pergunta é normalizada (minúsculas, sem acentos) e comparada com uma
+   pequena lista de INTENÇÕES (cada uma com as palavras que a identificam).
+2. Os parâmetros são extraídos do texto: a turma (pelo nome cadastrado),
+   a porcentagem, o mês/ano (procurados fora do nome da turma: "Turma 2025"
+   não vira um filtro de data).
+3. A intenção roda uma consulta SQL fixa e parametrizada (o texto nunca é
+   montado a partir da pergunta), que usa os índices e a tabela
+   'resumo_alunos' (ver database.py). Como o SQL é sempre o mesmo texto, o
+   sqlite3 reaproveita a instrução já compilada da conexão.
+4. A resposta fica em cache por (intenção, parâmetros) até os dados do
+   banco mudarem (ver 'versao_dados'): perguntar de novo não consulta nada.
+
+Os passos 1 e 2 rodam na thread do Tk ('interpretar', sem SQL); os passos
+3 e 4 rodam no executor do banco ('responder_pedido'), como as outras telas.
+
+Perguntas que começam com "como" são de uso do sistema e ficam com a FAQ.
+"""
+
+import datetime
+import re
+from database import versao_dados
+from datas import para_exibicao
+from cache_turmas import cache_turmas
+from base_conhecimento import normalizar
+
+# Porcentagem de faltas usada quando a pergunta não informa uma
+LIMITE_FALTAS_PADRAO = 25
+
+# Máximo de alunos/atividades listados em uma resposta
+MAX_LINHAS_RESPOSTA = 15
+
+MESES = ("janeiro", "fevereiro", "março", "abril", "maio", "junho", "julho",
+         "agosto", "setembro", "outubro", "novembro", "dezembro")
+
+# Consultas de cada intenção: "turma" (com turma_id) e "geral" (todas as turmas).
+# As versões "geral" das somas por aluno leem todos os alunos por definição.
+SQL_INTENCOES = {
+    ("faltosos", "turma"): """
+        SELECT a.nome, r.faltas, r.total_aulas
+        FROM alunos a
+        JOIN resumo_alunos r ON r.aluno_id = a.id
+        WHERE a.turma_id = ? AND r.total_aulas > 0 AND r.faltas * 100.0 > ? * r.total_aulas
+        ORDER BY r.faltas * 1.0 / r.total_aulas DESC, a.nome""",
+    ("faltosos", "geral"): """
+        SELECT a.nome || ' (' || t.nome || ')', r.faltas, r.total_aulas
+        FROM resumo_alunos r
+        JOIN alunos a ON a.id = r.aluno_id
+        JOIN turmas t ON t.id = a.turma_id
+        WHERE r.total_aulas > 0 AND r.faltas * 100.0 > ? * r.total_aulas
+        ORDER BY r.faltas * 1.0 / r.total_aulas DESC, a.nome""",
+    ("aulas_periodo", "turma"): """
+        SELECT COUNT(*) FROM aulas
+        WHERE turma_id = ? AND data >= ? AND data < ?""",
+    ("aulas_periodo", "geral"): """
+        SELECT t.nome, COUNT(*)
+        FROM aulas au
+        JOIN turmas t ON t.id = au.turma_id
+        WHERE au.data >= ? AND au.data < ?
+        GROUP BY t.id
+        ORDER BY t.nome""",
+    ("frequencia", "turma"): """
+        SELECT COUNT(*), COALESCE(SUM(r.presencas), 0), COALESCE(SUM(r.total_aulas), 0)
+        FROM alunos a
+        JOIN resumo_alunos r ON r.aluno_id = a.id
+        WHERE a.turma_id = ?""",
+    ("frequencia", "geral"): """
+        SELECT t.nome, COALESCE(SUM(r.presencas), 0), COALESCE(SUM(r.total_aulas), 0)
+        FROM turmas t
+        JOIN alunos a ON a.turma_id = t.id
+        JOIN resumo_alunos r ON r.aluno_id = a.id
+        GROUP BY t.id
+        ORDER BY t.nome""",
+    ("total_alunos", "turma"): "SELECT COUNT(*) FROM alunos WHERE turma_id = ?",
+    ("total_alunos", "geral"): """
+        SELECT t.nome, COUNT(a.id)
+        FROM turmas t
+        LEFT JOIN alunos a ON a.turma_id = t.id
+        GROUP BY t.id
+        ORDER BY t.nome""",
+    ("atividades", "turma"): """
+        SELECT nome, data_entrega FROM atividades
+        WHERE turma_id = ? AND data_entrega >= ?
+        ORDER BY data_entrega
+        LIMIT ?""",
+    ("atividades", "geral"): """
+        SELECT at.nome || ' (' || t.nome || ')', at.data_entrega
+        FROM atividades at
+        JOIN turmas t ON t.id = at.turma_id
+        WHERE at.data_entrega >= ?
+        ORDER BY at.data_entrega
+        LIMIT ?""",
+}
+
+def _porcentagem(texto):
+    """Retorna o número antes de '%' ou 'por cento' (ou None)."""
+    achado = re.search(r"(\d+(?:[.,]\d+)?)\s*(?:%|por ?cento)", texto)
+    return float(achado.group(1).replace(",", ".")) if achado else None
+
+def _periodo(texto, hoje):
+    """
+    Extrai o período da pergunta.
+
+    Returns:
+        tuple: (inicio ISO, fim ISO exclusivo, descrição) ou None se não houver período.
+    """
+    ano = re.search(r"\b(19|20)\d{2}\b", texto)
+    ano = int(ano.group(0)) if ano else None
+
+    if re.search(r"\b(este|esse|neste|nesse) mes\b", texto):
+        mes, ano = hoje.month, hoje.year
+    elif re.search(r"\bmes passado\b", texto):
+        primeiro = hoje.replace(day=1) - datetime.timedelta(days=1)
+        mes, ano = primeiro.month, primeiro.year
+    else:
+        mes = next((i + 1 for i, nome in enumerate(MESES) if re.search(rf"\b{normalizar(nome)}\b", texto)), None)
+
+    if mes is not None:
+        ano = ano or hoje.year
+        fim = datetime.date(ano + (mes == 12), mes % 12 + 1, 1)
+        return (datetime.date(ano, mes, 1).isoformat(), fim.isoformat(), f"em {MESES[mes - 1]}/{ano}")
+    if ano is not None:
+        return (f"{ano}-01-01", f"{ano + 1}-01-01", f"em {ano}")
+    return None
+
+def _padrao_nome(nome):
+    """Regex que acha 'nome' (já normalizado) como palavra inteira no texto."""
+    return re.compile(rf"(?<!\w){re.escape(nome)}(?!\w)")
+
+def _percentual(parte, total):
+    """Formata parte/total como porcentagem ("-" se o total for zero)."""
+    return f"{parte * 100.0 / total:.1f}%" if total else "-"
+
+def _listar(linhas, formatar):
+    """Formata até MAX_LINHAS_RESPOSTA linhas, avisando quantas ficaram de fora."""
+    texto = "\n".join(formatar(linha) for linha in linhas[:MAX_LINHAS_RESPOSTA])
+    if len(linhas) > MAX_LINHAS_RESPOSTA:
+        texto += f"\n... e mais {len(linhas) - MAX_LINHAS_RESPOSTA}."
+    return texto
+
+class ConsultasChatbot:
+    """
+    Camada de intenções do Chatbot: pergunta -> consulta parametrizada -> resposta.
+
+    'interpretar' roda na thread do Tk; 'responder_pedido' (e o cache) só
+    na thread do executor do banco, com a conexão dela (a versão dos dados
+    só pode ser comparada na mesma thread, ver 'versao_dados').
+    """
+
+    def __init__(self):
+        self._versao = None # Versão dos dados das respostas em cache
+        self._respostas = {} # (intenção, parâmetros) -> texto da resposta
+        self.consultas = 0 # Respostas calculadas no banco
+        self.acertos_cache = 0 # Respostas servidas do cache
+
+    def responder(self, conn, pergunta, hoje=None):
+        """
+        Responde uma pergunta sobre os dados, se ela for de alguma intenção
+        ('interpretar' + 'responder_pedido' na mesma thread, para scripts).
+
+        Args:
+            conn (sqlite3.Connection): Conexão com o banco.
+            pergunta (str): Texto digitado no Chatbot.
+            hoje (datetime.date): Data de referência ("este mês", próximas
+                atividades). Padrão: a data atual.
+
+        Returns:
+            str: A resposta, ou None se a pergunta não for sobre os dados
+            (o Chatbot então procura na base de conhecimento).
+
+        Raises:
+            sqlite3.Error: Se a consulta falhar.
+        """
+        pedido = self.interpretar(pergunta, hoje or datetime.date.today())
+        return None if pedido is None else self.responder_pedido(conn, pedido)
+
+    def responder_pedido(self, conn, pedido):
+        """
+        Responde um pedido de 'interpretar' (do cache, se os dados não mudaram).
+        Roda no executor do banco.
+
+        Args:
+            conn (sqlite3.Connection): Conexão da thread do executor.
+            pedido (tuple): (intenção, TurmaRef ou None, parâmetros).
+
+        Returns:
+            str: A resposta.
+
+        Raises:
+            sqlite3.Error: Se a consulta falhar.
+        """
+        versao = versao_dados(conn)
+        if versao != self._versao:
+            self._respostas.clear() # Os dados mudaram: descarta as respostas antigas
+            self._versao = versao
+        resposta = self._respostas.get(pedido)
+        if resposta is not None:
+            self.acertos_cache += 1
+            return resposta
+
+        intencao, turma, parametros = pedido
+        resposta = getattr(self, f"_responder_{intencao}")(conn, turma, *parametros)
+        self._respostas[pedido] = resposta
+        self.consultas += 1
+        return resposta
+
+    def interpretar(self, pergunta, hoje):
+        """
+        Identifica a intenção e os parâmetros da pergunta.
+
+        Returns:
+            tuple: (intenção, TurmaRef ou None, parâmetros) — também a chave
+            do cache — ou None se não for uma pergunta sobre os dados.
+        """
+        texto = normalizar(pergunta).strip()
+        if not texto or texto.startswith("como "):
+            return None
+        turma = self._turma_citada(texto)
+        # Números e meses só contam fora do nome da turma ("Turma 2025" não é um ano)
+        resto = texto if turma is None else _padrao_nome(normalizar(turma.nome).strip()).sub(" ", texto)
+
+        if re.search(r"falt|ausen", texto) and re.search(r"\bquem\b|\balunos?\b|%|por ?cento", texto) \
+                and not re.search(r"\bquant[ao]s faltas\b", texto):
+            limite = _porcentagem(resto)
+            return ("faltosos", turma, (LIMITE_FALTAS_PADRAO if limite is None else limite,))
+        if re.search(r"\b(quant[ao]s|numero de|total de) aulas\b", texto):
+            periodo = _periodo(resto, hoje) or ("0000-01-01", "9999-12-31", "no total")
+            return ("aulas_periodo", turma, periodo)
+        if re.search(r"\b(quant[ao]s|numero de|total de) alunos\b", texto):
+            return ("total_alunos", turma, ())
+        if re.search(r"frequencia|presenca", texto) and re.search(r"\b(qual|quanto|media|taxa|percentual)\b", texto):
+            return ("frequencia", turma, ())
+        if re.search(r"atividade|prova|trabalho|entrega", texto) \
+                and re.search(r"\b(quais|qual|proxim\w*|quando|tem|lista\w*)\b", texto):
+            return ("atividades", turma, (hoje.isoformat(),))
+        return None
+
+    def _turma_citada(self, texto):
+        """Retorna a turma cujo nome aparece na pergunta (a de nome mais longo), ou None."""
+        citada = None
+        for turma in cache_turmas.obter():
+            nome = normalizar(turma.nome).strip()
+            if nome and _padrao_nome(nome).search(texto) \
+                    and (citada is None or len(nome) > len(normalizar(citada.nome))):
+                citada = turma
+        return citada
+
+    # --- Uma função por intenção: (conn, turma, *parâmetros) -> texto ---
+
+    def _responder_faltosos(self, conn, turma, limite):
+        """Alunos com faltas acima de 'limite'% das aulas."""
+        if turma is not None:
+            linhas = conn.execute(SQL_INTENCOES["faltosos", "turma"], (turma.id, limite)).fetchall()
+            onde = f"na turma {turma.nome}"
+        else:
+            linhas = conn.execute(SQL_INTENCOES["faltosos", "geral"], (limite,)).fetchall()
+            onde = "em todas as turmas"
+        if not linhas:
+            return f"Nenhum aluno com mais de {limite:g}% de faltas {onde}."
+        cabecalho = f"{len(linhas)} aluno(s) com mais de {limite:g}% de faltas {onde}:\n"
+        return cabecalho + _listar(linhas, lambda l: f"• {l[0]}: {l[1]} falta(s) em {l[2]} aula(s) ({_percentual(l[1], l[2])})")
+
+    def _responder_aulas_periodo(self, conn, turma, inicio, fim, descricao):
+        """Quantidade de aulas registradas no período."""
+        if turma is not None:
+            total = conn.execute(SQL_INTENCOES["aulas_periodo", "turma"], (turma.id, inicio, fim)).fetchone()[0]
+            return f"{total} aula(s) registrada(s) {descricao} na turma {turma.nome}."
+        linhas = conn.execute(SQL_INTENCOES["aulas_periodo", "geral"], (inicio, fim)).fetchall()
+        total = sum(quantidade for _, quantidade in linhas)
+        resposta = f"{total} aula(s) registrada(s) {descricao}."
+        if linhas:
+            resposta += "\n" + _listar(linhas, lambda l: f"• {l[0]}: {l[1]}")
+        return resposta
+
+    def _responder_total_alunos(self, conn, turma):
+        """Quantidade de alunos da turma (ou de cada turma)."""
+        if turma is not None:
+            total = conn.execute(SQL_INTENCOES["total_alunos", "turma"], (turma.id,)).fetchone()[0]
+            return f"A turma {turma.nome} tem {total} aluno(s)."
+        linhas = conn.execute(SQL_INTENCOES["total_alunos", "geral"]).fetchall()
+        total = sum(quantidade for _, quantidade in linhas)
+        resposta = f"{total} aluno(s) cadastrado(s) em {len(linhas)} turma(s)."
+        if linhas:
+            resposta += "\n" + _listar(linhas, lambda l: f"• {l[0]}: {l[1]}")
+        return resposta
+
+    def _responder_frequencia(self, conn, turma):
+        """Frequência média (presenças / aulas dos alunos) da turma ou de cada turma."""
+        if turma is not None:
+            alunos, presencas, total = conn.execute(SQL_INTENCOES["frequencia", "turma"], (turma.id,)).fetchone()
+            if not total:
+                return f"Ainda não há presenças registradas na turma {turma.nome}."
+            return (f"Frequência da turma {turma.nome}: {_percentual(presencas, total)} "
+                    f"({presencas} presença(s) em {total} registro(s), {alunos} aluno(s)).")
+        linhas = conn.execute(SQL_INTENCOES["frequencia", "geral"]).fetchall()
+        if not linhas:
+            return "Ainda não há presenças registradas."
+        return "Frequência por turma:\n" + _listar(linhas, lambda l: f"• {l[0]}: {_percentual(l[1], l[2])}")
+
+    def _responder_atividades(self, conn, turma, a_partir_de):
+        """Próximas atividades (entrega a partir de hoje)."""
+        if turma is not None:
+            linhas = conn.execute(SQL_INTENCOES["atividades", "turma"],
+                                  (turma.id, a_partir_de, MAX_LINHAS_RESPOSTA)).fetchall()
+            onde = f" da turma {turma.nome}"
+        else:
+            linhas = conn.execute(SQL_INTENCOES["atividades", "geral"],
+                                  (a_partir_de, MAX_LINHAS_RESPOSTA)).fetchall()
+            onde = ""
+        if not linhas:
+            return f"Nenhuma atividade{onde} com entrega a partir de hoje."
+        return f"Próximas atividades{onde}:\n" + _listar(linhas, lambda l: f"• {para_exibicao(l[1])}: {l[0]}")
+
+# Instância única usada pelo Chatbot
+consultas_chatbot = ConsultasChatbot()
@@ -3,42 +3,312 @@ Arquivo de Banco de Dados (database.py)
 
 Este módulo centraliza todas as interações com o banco de dados SQLite.
 Inclui funções para:
-1. Conectar ao banco de dados.
+1. Conectar ao banco de dados (com reaproveitamento de conexões).
 2. Criar todas as tabelas necessárias (schema).
-3. Gerenciar criptografia de senhas (hash e verificação).
+3. Gerenciar criptografia de senhas (hash, verificação e troca do custo bcrypt).
 """
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 import bcrypt
+from datas import iso_ou_original
+
+# Caminho padrão do arquivo do banco de dados
+CAMINHO_BANCO = "sistema_escolar.db"
+
+# Perfil de PRAGMAs aplicado a cada conexão nova (na ordem abaixo).
+# Pode ser ajustado com 'configurar_pragmas' antes da primeira conexão.
+# O padrão é seguro com o .db em uma pasta compartilhada (SMB/NFS), onde o
+# WAL e a memória mapeada não funcionam: ver PERFIL_LOCAL para disco local.
+PRAGMAS = {
+    # Journal clássico (rollback): funciona em qualquer sistema de arquivos
+    "journal_mode": "DELETE",
+    # Sem WAL, FULL é o nível que protege o arquivo em uma queda de energia
+    "synchronous": "FULL",
+    # Valor negativo = tamanho em KiB (aprox. 16 MB de cache de páginas)
+    "cache_size": -16000,
+    # Sem memória mapeada (em arquivo de rede, a mmap pode ler páginas velhas)
+    "mmap_size": 0,
+    # Tabelas temporárias (ORDER BY, GROUP BY grandes) ficam na memória
+    "temp_store": "MEMORY",
+    # Necessário para o ON DELETE CASCADE das presenças funcionar
+    "foreign_keys": "ON",
+}
+
+# Perfil mais rápido, SÓ para o .db em um disco local (ver 'usar_perfil_local'):
+# WAL permite leituras enquanto uma escrita acontece, e com WAL o NORMAL é
+# seguro contra corrupção e evita um fsync por commit.
+PERFIL_LOCAL = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 64 * 1024 * 1024,
+}
+
+def configurar_pragmas(**pragmas):
+    """
+    Altera o perfil de PRAGMAs usado nas próximas conexões.
+    Use o valor None para remover um PRAGMA do perfil.
+
+    Exemplo:
+        configurar_pragmas(journal_mode="DELETE", mmap_size=0)
+    """
+    for nome, valor in pragmas.items():
+        if valor is None:
+            PRAGMAS.pop(nome, None)
+        else:
+            PRAGMAS[nome] = valor
+
+def caminho_de_rede(caminho):
+    """
+    Retorna True se o caminho é de uma pasta de rede reconhecível pelo nome
+    (caminho UNC do Windows, ex: '\\\\servidor\\escola\\sistema_escolar.db').
+    Unidades mapeadas (ex: 'Z:') não são detectáveis por aqui.
+    """
+    return caminho.startswith(("\\\\", "//"))
+
+def usar_perfil_local(caminho=None):
+    """
+    Passa a usar PERFIL_LOCAL (WAL + memória mapeada) nas próximas conexões.
+    Ativado em main.py pela variável de ambiente SAGE_BANCO_LOCAL=1; só deve
+    ser usado com o .db em um disco local.
+
+    Args:
+        caminho (str): Arquivo do banco (padrão: o usado por 'conectar').
+
+    Returns:
+        bool: False (e nada muda) se o caminho for de uma pasta de rede.
+    """
+    caminho = caminho or gerenciador.caminho
+    if caminho_de_rede(caminho):
+        print(f"Perfil local ignorado: '{caminho}' está em uma pasta de rede (WAL não é seguro).")
+        return False
+    configurar_pragmas(**PERFIL_LOCAL)
+    return True
+
+# Classe das conexões abertas por 'conectar' (trocada por 'instrumentacao.ativar')
+FABRICA_CONEXAO = sqlite3.Connection
+
+def configurar_fabrica_conexao(fabrica):
+    """
+    Define a classe (subclasse de sqlite3.Connection) das próximas conexões.
+    As conexões já abertas não mudam.
+    """
+    global FABRICA_CONEXAO
+    FABRICA_CONEXAO = fabrica
+
+def aplicar_pragmas(conn, pragmas=None):
+    """
+    Aplica o perfil de PRAGMAs em uma conexão.
+
+    Args:
+        conn (sqlite3.Connection): A conexão a ser configurada.
+        pragmas (dict): Perfil a aplicar (padrão: PRAGMAS do módulo).
+    """
+    for nome, valor in (PRAGMAS if pragmas is None else pragmas).items():
+        conn.execute(f"PRAGMA {nome} = {valor}")
+
+class GerenciadorConexoes:
+    """
+    Mantém UMA conexão configurada por thread e a reaproveita entre chamadas.
+
+    Abrir uma conexão nova a cada consulta é caro (principalmente quando o
+    arquivo .db está em uma unidade de rede) e, como o 'with conn' só faz
+    commit/rollback, as conexões antigas ficavam abertas até o GC.
+    """
+
+    def __init__(self, caminho=CAMINHO_BANCO):
+        """
+        Args:
+            caminho (str): Caminho do arquivo do banco de dados.
+        """
+        self.caminho = caminho
+        self._local = threading.local() # Guarda a conexão de cada thread
+        self._lock = threading.Lock()
+        self._conexoes = [] # Todas as conexões abertas (para fechar no encerramento)
+        self.aberturas = 0
+        self.reutilizacoes = 0
+
+    def obter(self):
+        """
+        Retorna a conexão da thread atual, abrindo uma nova se necessário.
+
+        Returns:
+            sqlite3.Connection: A conexão da thread atual.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            with self._lock:
+                self.reutilizacoes += 1
+            return conn
+
+        # check_same_thread=False permite que o encerramento feche
+        # conexões criadas por outras threads. Cada thread continua
+        # usando apenas a sua própria conexão.
+        conn = sqlite3.connect(self.caminho, check_same_thread=False, factory=FABRICA_CONEXAO)
+        aplicar_pragmas(conn)
+        self._local.conn = conn
+        with self._lock:
+            self._conexoes.append(conn)
+            self.aberturas += 1
+        return conn
+
+    def fechar_todas(self):
+        """
+        Fecha todas as conexões abertas (chamado no encerramento do app).
+        """
+        with self._lock:
+            conexoes, self._conexoes = self._conexoes, []
+        for conn in conexoes:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Erro ao fechar conexão: {e}")
+        # Uma nova thread local descarta as referências às conexões fechadas
+        self._local = threading.local()
+
+    def estatisticas(self):
+        """
+        Retorna os contadores de uso das conexões.
+
+        Returns:
+            dict: Conexões abertas no momento, aberturas e reutilizações.
+        """
+        with self._lock:
+            return {
+                "abertas": len(self._conexoes),
+                "aberturas": self.aberturas,
+                "reutilizacoes": self.reutilizacoes,
+            }
+
+# Instância única usada por todo o sistema
+gerenciador = GerenciadorConexoes()
 
 def conectar():
     """
-    Estabelece conexão com o banco de dados SQLite.
-    Usa um 'with' statement para garantir que a conexão
-    seja fechada automaticamente (commit ou rollback).
+    Retorna a conexão compartilhada da thread atual.
+    O 'with conectar() as conn' continua fazendo commit (ou rollback em
+    caso de erro), mas a conexão é reaproveitada em vez de reaberta.
     
     Returns:
         sqlite3.Connection: Objeto de conexão ou None se falhar.
     """
     try:
-        # Tenta conectar ao arquivo do banco de dados
-        return sqlite3.connect("sistema_escolar.db")
+        return gerenciador.obter()
     except sqlite3.Error as e:
         # Imprime o erro se a conexão falhar
         print(f"Erro ao conectar ao banco: {e}")
         return None
 
-def hash_senha(senha):
+def usar_banco(caminho):
+    """
+    Troca o arquivo de banco usado por 'conectar' (ex: em ferramentas e
+    benchmarks que trabalham em uma cópia). Fecha as conexões atuais.
+
+    Args:
+        caminho (str): Caminho do novo arquivo de banco.
+    """
+    global gerenciador
+    gerenciador.fechar_todas()
+    gerenciador = GerenciadorConexoes(caminho)
+
+@contextmanager
+def contar_instrucoes(conn):
+    """
+    Registra todas as instruções SQL executadas na conexão dentro do bloco.
+
+    Exemplo:
+        with contar_instrucoes(conn) as instrucoes:
+            ...
+        print(len(instrucoes))
+
+    Yields:
+        list: Lista (preenchida durante o bloco) com o texto de cada instrução.
+    """
+    instrucoes = []
+    conn.set_trace_callback(instrucoes.append)
+    try:
+        yield instrucoes
+    finally:
+        conn.set_trace_callback(None)
+
+def versao_dados(conn=None):
+    """
+    Retorna um "número de versão" dos dados do banco, que muda sempre que
+    algum dado é alterado. As telas guardam a versão que exibiram e só
+    consultam o banco de novo se ela mudou.
+
+    Combina:
+    - PRAGMA data_version: muda quando OUTRA conexão (ex: a do executor do
+      banco, ou outro processo) grava no arquivo;
+    - total_changes: linhas alteradas pela PRÓPRIA conexão.
+
+    Args:
+        conn (sqlite3.Connection): Conexão da thread atual (padrão: conectar()).
+
+    Returns:
+        tuple: (data_version, total_changes). Só faz sentido comparar versões
+        obtidas na mesma thread.
+    """
+    conn = conn or conectar()
+    return (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+
+def fechar_conexoes():
+    """
+    Fecha todas as conexões e imprime o resumo de uso.
+    Deve ser chamado quando a aplicação for encerrada.
+    """
+    stats = gerenciador.estatisticas()
+    gerenciador.fechar_todas()
+    print(f"Conexões encerradas: {stats['abertas']} aberta(s), "
+          f"{stats['aberturas']} abertura(s), {stats['reutilizacoes']} reutilização(ões).")
+
+# Custo (log2 das rodadas) usado nos hashes bcrypt novos. Cada +1 dobra o
+# tempo de cálculo. Pode ser ajustado com a variável de ambiente
+# SAGE_CUSTO_BCRYPT (lida em main.py por 'configurar_custo_bcrypt'): as senhas
+# antigas são refeitas com o custo novo no próximo login (ver 'conferir_senha').
+CUSTO_BCRYPT = 12
+
+def configurar_custo_bcrypt(custo):
+    """
+    Altera o custo bcrypt usado nos próximos hashes.
+
+    Args:
+        custo (int): Entre 4 e 31 (o padrão do bcrypt é 12).
+
+    Raises:
+        ValueError: Se o custo estiver fora do intervalo aceito pelo bcrypt.
+    """
+    global CUSTO_BCRYPT
+    if not 4 <= int(custo) <= 31:
+        raise ValueError(f"Custo bcrypt inválido: {custo} (use de 4 a 31).")
+    CUSTO_BCRYPT = int(custo)
+
+def hash_senha(senha, custo=None):
     """
     Gera um hash seguro para uma senha usando bcrypt.
+    É uma operação lenta de propósito: nas telas, rode pelo executor de
+    senhas ('executor_banco.executar_senha'), nunca na fila do banco.
     
     Args:
         senha (str): A senha em texto plano.
+        custo (int): Custo bcrypt (padrão: CUSTO_BCRYPT).
         
     Returns:
         str: A senha hasheada (em formato string).
     """
-    return bcrypt.hashpw(senha.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    salt = bcrypt.gensalt(CUSTO_BCRYPT if custo is None else custo)
+    return bcrypt.hashpw(senha.encode('utf-8'), salt).decode('utf-8')
+
+def custo_do_hash(hashed):
+    """
+    Retorna o custo com que um hash bcrypt foi gerado (ex: '$2b$12$...' -> 12),
+    ou None se o texto não for um hash bcrypt.
+    """
+    partes = (hashed or "").split("$")
+    if len(partes) < 4 or not partes[2].isdigit():
+        return None
+    return int(partes[2])
 
 def verificar_senha(senha, hashed):
     """
@@ -56,6 +326,108 @@ def verificar_senha(senha, hashed):
     except Exception:
         return False
 
+def conferir_senha(senha, hashed):
+    """
+    Verifica a senha e, se ela estiver correta mas o hash guardado tiver um
+    custo diferente de CUSTO_BCRYPT, gera o hash novo (a ser gravado por
+    quem chama: o usuário não percebe nada). Não usa o banco.
+
+    Args:
+        senha (str): Senha em texto plano.
+        hashed (str): Hash guardado no banco.
+
+    Returns:
+        tuple: (correta, novo_hash), com novo_hash None se não for preciso refazer.
+    """
+    if not verificar_senha(senha, hashed):
+        return False, None
+    if custo_do_hash(hashed) != CUSTO_BCRYPT:
+        return True, hash_senha(senha)
+    return True, None
+
+def autenticar(conn, email, senha):
+    """
+    Verifica as credenciais de um usuário em uma única chamada (para scripts;
+    as telas separam a leitura do banco da verificação bcrypt, ver login.py).
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco.
+        email (str): E-mail do usuário.
+        senha (str): Senha em texto plano.
+
+    Returns:
+        bool: True se as credenciais estiverem corretas.
+    """
+    result = conn.execute("SELECT id, senha FROM usuarios WHERE email = ?", (email,)).fetchone()
+    if not result:
+        return False
+    correta, novo_hash = conferir_senha(senha, result[1])
+    if novo_hash is not None:
+        conn.execute("UPDATE usuarios SET senha = ? WHERE id = ?", (novo_hash, result[0]))
+        print(f"Senha do usuário {result[0]} refeita com custo bcrypt {CUSTO_BCRYPT}.")
+    return correta
+
+def consultas_telas():
+    """
+    Consultas das telas verificadas por 'verificar_planos_consulta': são as
+    próprias constantes SQL de 'repositorio' e do Chatbot, ou seja, o mesmo
+    texto que as telas executam.
+
+    Returns:
+        dict: {nome da consulta: SQL}.
+    """
+    # Importados aqui: esses módulos importam 'database'
+    from repositorio import alunos, atividades, aulas, exportacao, turmas
+    from consultas_chatbot import SQL_INTENCOES
+    consultas = {
+        "turmas (dropdowns)": turmas.SQL_LISTAR_TURMAS,
+        "Aula.carregar_alunos": alunos.SQL_LISTAR_ALUNOS_TURMA,
+        "Relatorio.carregar_aulas (1ª página)": aulas.SQL_PAGINA_AULAS.format(filtro=""),
+        "Relatorio.carregar_mais (página)": aulas.SQL_PAGINA_AULAS.format(filtro=aulas.FILTRO_DEPOIS_DE),
+        "Relatorio.alternar_frequencia": aulas.SQL_PRESENCAS_AULA,
+        "Relatorio.exportar_csv (lista, 1º lote)": exportacao.SQL_EXPORTAR_CSV.format(filtro=""),
+        "Relatorio.exportar_csv (lista, lote)": exportacao.SQL_EXPORTAR_CSV.format(
+            filtro=exportacao.FILTRO_CSV_DEPOIS_DE),
+        "Relatorio.exportar_csv (matriz, 1º lote)": exportacao.SQL_MATRIZ_FREQUENCIA.format(filtro=""),
+        "Relatorio.exportar_csv (matriz, lote)": exportacao.SQL_MATRIZ_FREQUENCIA.format(
+            filtro=exportacao.FILTRO_MATRIZ_DEPOIS_DE),
+        "Visualizacao.carregar_alunos_otimizado": alunos.SQL_RESUMO_ALUNOS,
+        "Visualizacao.alternar_historico": alunos.SQL_HISTORICO_ALUNO,
+        "JanelaEditarAula.carregar_presencas": aulas.SQL_PRESENCAS_EDICAO,
+        "Atividades.carregar_atividades": atividades.SQL_LISTAR_ATIVIDADES,
+    }
+    # Perguntas sobre os dados no Chatbot. As versões "geral" das somas por
+    # aluno leem todos os alunos por definição e ficam de fora.
+    for intencao, escopo in (("faltosos", "turma"), ("aulas_periodo", "turma"), ("aulas_periodo", "geral"),
+                             ("frequencia", "turma"), ("total_alunos", "turma"), ("atividades", "turma"),
+                             ("atividades", "geral")):
+        consultas[f"Chatbot.{intencao} ({escopo})"] = SQL_INTENCOES[intencao, escopo]
+    return consultas
+
+def verificar_planos_consulta(conn=None):
+    """
+    Roda EXPLAIN QUERY PLAN em cada consulta de tela e verifica se
+    nenhuma tabela é lida por varredura completa (SCAN sem índice) e se
+    'presencas' é lida só pelos índices (COVERING), sem ir até a tabela.
+
+    Args:
+        conn (sqlite3.Connection): Conexão a usar (padrão: a compartilhada).
+
+    Returns:
+        list: Tuplas (nome_da_consulta, ok, linhas_do_plano).
+    """
+    conn = conn or conectar()
+    resultados = []
+    for nome, sql in consultas_telas().items():
+        params = (0,) * sql.count("?")
+        plano = [linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        # "SCAN tabela" sem "USING ... INDEX" indica leitura da tabela inteira;
+        # "USING INDEX idx_presencas..." (sem COVERING), uma busca na tabela por linha
+        ok = not any((p.startswith("SCAN") and "INDEX" not in p) or "USING INDEX idx_presencas" in p
+                     for p in plano)
+        resultados.append((nome, ok, plano))
+    return resultados
+
 def criar_tabelas():
     """
     Cria todas as tabelas necessárias no banco de dados, se elas não existirem.
@@ -123,7 +495,375 @@ def criar_tabelas():
                 FOREIGN KEY(turma_id) REFERENCES turmas(id) ON DELETE CASCADE
             )""")
             # --- FIM DA NOVA TABELA ---
-            
-            print("Tabelas verificadas/criadas com sucesso.")
+
+        print("Tabelas verificadas/criadas com sucesso.")
+
+        # Aplica as migrações pendentes (índices, correções, novas colunas...)
+        executar_migracoes()
     except sqlite3.Error as e:
-        print(f"Erro ao criar tabelas: {e}")
\ No newline at end of file
+        print(f"Erro ao criar tabelas: {e}")
+
+def limpar_presencas_orfas(conn):
+    """
+    Remove presenças que apontam para aulas ou alunos que não existem mais.
+    Elas surgiram porque o 'foreign_keys' estava desligado e o
+    ON DELETE CASCADE nunca era executado.
+
+    Args:
+        conn (sqlite3.Connection): Conexão a ser usada.
+
+    Returns:
+        int: Quantidade de registros removidos.
+    """
+    cursor = conn.execute("""
+        DELETE FROM presencas
+        WHERE aula_id IS NULL OR aluno_id IS NULL
+           OR aula_id NOT IN (SELECT id FROM aulas)
+           OR aluno_id NOT IN (SELECT id FROM alunos)
+    """)
+    return cursor.rowcount
+
+def _presencas_tem_cascade(conn):
+    """Verifica se as chaves estrangeiras de 'presencas' usam ON DELETE CASCADE."""
+    fks = conn.execute("PRAGMA foreign_key_list(presencas)").fetchall()
+    # Coluna 6 = ação ON DELETE
+    return bool(fks) and all(fk[6] == "CASCADE" for fk in fks)
+
+def _recriar_presencas_com_cascade(conn):
+    """
+    Recria a tabela 'presencas' com ON DELETE CASCADE, mantendo os dados.
+    Bancos antigos foram criados sem o CASCADE e, com foreign_keys=ON,
+    a deleção de aulas/alunos com presença seria bloqueada.
+    """
+    conn.execute("""
+        CREATE TABLE presencas_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            aula_id INTEGER,
+            aluno_id INTEGER,
+            presente INTEGER,
+            FOREIGN KEY(aula_id) REFERENCES aulas(id) ON DELETE CASCADE,
+            FOREIGN KEY(aluno_id) REFERENCES alunos(id) ON DELETE CASCADE
+        )""")
+    conn.execute("""
+        INSERT INTO presencas_nova (id, aula_id, aluno_id, presente)
+        SELECT id, aula_id, aluno_id, presente FROM presencas
+    """)
+    conn.execute("DROP TABLE presencas")
+    conn.execute("ALTER TABLE presencas_nova RENAME TO presencas")
+
+def _migracao_001(conn):
+    """Remove presenças órfãs e garante o ON DELETE CASCADE em 'presencas'."""
+    removidas = limpar_presencas_orfas(conn)
+    if removidas:
+        print(f"  {removidas} presença(s) órfã(s) removida(s).")
+    if not _presencas_tem_cascade(conn):
+        _recriar_presencas_com_cascade(conn)
+
+def _migracao_002(conn):
+    """Índices das colunas usadas em WHERE/JOIN/ORDER BY pelas telas."""
+    # Os de 'presencas' incluem 'presente' para servir as consultas só pelo índice
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_presencas_aula ON presencas(aula_id, aluno_id, presente)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_presencas_aluno ON presencas(aluno_id, aula_id, presente)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_alunos_turma ON alunos(turma_id, nome)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_aulas_turma_data ON aulas(turma_id, data)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_atividades_turma_data ON atividades(turma_id, data_entrega)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_turmas_nome ON turmas(nome)")
+
+def _migracao_003(conn):
+    """Impede presença duplicada do mesmo aluno na mesma aula (UNIQUE)."""
+    # Mantém apenas o registro mais recente de cada par (aula, aluno)
+    conn.execute("""
+        DELETE FROM presencas
+        WHERE id NOT IN (SELECT MAX(id) FROM presencas GROUP BY aula_id, aluno_id)
+    """)
+    # O índice único substitui o idx_presencas_aula (mesmo prefixo de colunas)
+    conn.execute("DROP INDEX IF EXISTS idx_presencas_aula")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_presencas_aula_aluno ON presencas(aula_id, aluno_id)")
+
+def _migracao_004(conn):
+    """Converte as datas de aulas e atividades para ISO-8601 ('AAAA-MM-DD')."""
+    conn.create_function("sage_para_iso", 1, iso_ou_original, deterministic=True)
+    nao_iso = "NOT GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+    conn.execute(f"UPDATE aulas SET data = sage_para_iso(data) WHERE data {nao_iso}")
+    conn.execute(f"UPDATE atividades SET data_entrega = sage_para_iso(data_entrega) WHERE data_entrega {nao_iso}")
+
+# Expressão SQL da data da última aula com registro de presença de um aluno
+_SQL_ULTIMA_AULA = """(SELECT MAX(au.data) FROM presencas p JOIN aulas au ON au.id = p.aula_id
+                       WHERE p.aluno_id = {aluno})"""
+
+# Data de uma aula (NULL se a aula já foi apagada, ex: presenças saindo pelo CASCADE)
+_SQL_DATA_AULA = "(SELECT data FROM aulas WHERE id = {aula})"
+
+# 'ultima_aula' depois de uma presença nova: o maior entre o valor atual e a data da aula
+_SQL_ULTIMA_AULA_INSERIDA = "COALESCE(MAX(ultima_aula, {data}), ultima_aula, {data})".format(
+    data=_SQL_DATA_AULA.format(aula="NEW.aula_id"))
+
+# 'ultima_aula' depois de remover uma presença: só é recalculada se a aula
+# removida podia ser a última (data igual à atual, ou aula já apagada)
+_SQL_ULTIMA_AULA_REMOVIDA = """CASE WHEN {data} < ultima_aula THEN ultima_aula
+                                ELSE {recalculo} END""".format(
+    data=_SQL_DATA_AULA.format(aula="OLD.aula_id"), recalculo=_SQL_ULTIMA_AULA.format(aluno="OLD.aluno_id"))
+
+# Triggers que mantêm 'resumo_alunos' em dia a cada escrita em alunos/presencas/aulas.
+# Mudanças aqui precisam de uma migração nova que recrie os triggers (ver _migracao_008).
+_TRIGGERS_RESUMO = {
+    "trg_resumo_aluno_insert": """
+        AFTER INSERT ON alunos BEGIN
+            INSERT OR IGNORE INTO resumo_alunos (aluno_id) VALUES (NEW.id);
+        END""",
+    "trg_resumo_aluno_delete": """
+        AFTER DELETE ON alunos BEGIN
+            DELETE FROM resumo_alunos WHERE aluno_id = OLD.id;
+        END""",
+    "trg_resumo_presenca_insert": f"""
+        AFTER INSERT ON presencas BEGIN
+            UPDATE resumo_alunos
+            SET total_aulas = total_aulas + 1,
+                presencas = presencas + (CASE WHEN NEW.presente THEN 1 ELSE 0 END),
+                faltas = faltas + (CASE WHEN NEW.presente THEN 0 ELSE 1 END),
+                ultima_aula = {_SQL_ULTIMA_AULA_INSERIDA}
+            WHERE aluno_id = NEW.aluno_id;
+        END""",
+    "trg_resumo_presenca_delete": f"""
+        AFTER DELETE ON presencas BEGIN
+            UPDATE resumo_alunos
+            SET total_aulas = total_aulas - 1,
+                presencas = presencas - (CASE WHEN OLD.presente THEN 1 ELSE 0 END),
+                faltas = faltas - (CASE WHEN OLD.presente THEN 0 ELSE 1 END),
+                ultima_aula = {_SQL_ULTIMA_AULA_REMOVIDA}
+            WHERE aluno_id = OLD.aluno_id;
+        END""",
+    # A edição de aula regrava 'presente' de todos os alunos: só as linhas que
+    # mudaram de fato disparam o trigger. Se só 'presente' mudou, a data fica.
+    "trg_resumo_presenca_update": f"""
+        AFTER UPDATE OF presente, aluno_id, aula_id ON presencas
+        WHEN OLD.presente IS NOT NEW.presente OR OLD.aula_id IS NOT NEW.aula_id
+             OR OLD.aluno_id IS NOT NEW.aluno_id
+        BEGIN
+            UPDATE resumo_alunos
+            SET total_aulas = total_aulas - 1,
+                presencas = presencas - (CASE WHEN OLD.presente THEN 1 ELSE 0 END),
+                faltas = faltas - (CASE WHEN OLD.presente THEN 0 ELSE 1 END),
+                ultima_aula = CASE WHEN OLD.aula_id = NEW.aula_id AND OLD.aluno_id = NEW.aluno_id
+                                   THEN ultima_aula ELSE {_SQL_ULTIMA_AULA_REMOVIDA} END
+            WHERE aluno_id = OLD.aluno_id;
+            UPDATE resumo_alunos
+            SET total_aulas = total_aulas + 1,
+                presencas = presencas + (CASE WHEN NEW.presente THEN 1 ELSE 0 END),
+                faltas = faltas + (CASE WHEN NEW.presente THEN 0 ELSE 1 END),
+                ultima_aula = {_SQL_ULTIMA_AULA_INSERIDA}
+            WHERE aluno_id = NEW.aluno_id;
+        END""",
+    "trg_resumo_aula_data": f"""
+        AFTER UPDATE OF data ON aulas
+        WHEN OLD.data IS NOT NEW.data
+        BEGIN
+            UPDATE resumo_alunos
+            SET ultima_aula = {_SQL_ULTIMA_AULA.format(aluno="resumo_alunos.aluno_id")}
+            WHERE aluno_id IN (SELECT aluno_id FROM presencas WHERE aula_id = NEW.id);
+        END""",
+}
+
+# Resumo recalculado do zero a partir de 'presencas' (usado na migração e na verificação)
+_SQL_RESUMO_RECALCULADO = """
+    SELECT al.id,
+           COUNT(p.id),
+           COALESCE(SUM(CASE WHEN p.presente THEN 1 ELSE 0 END), 0),
+           COUNT(p.id) - COALESCE(SUM(CASE WHEN p.presente THEN 1 ELSE 0 END), 0),
+           MAX(au.data)
+    FROM alunos al
+    LEFT JOIN presencas p ON p.aluno_id = al.id
+    LEFT JOIN aulas au ON au.id = p.aula_id
+    GROUP BY al.id
+"""
+
+def _migracao_005(conn):
+    """Cria 'resumo_alunos' (totais por aluno) mantida por triggers."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS resumo_alunos (
+            aluno_id INTEGER PRIMARY KEY,
+            total_aulas INTEGER NOT NULL DEFAULT 0,
+            presencas INTEGER NOT NULL DEFAULT 0,
+            faltas INTEGER NOT NULL DEFAULT 0,
+            ultima_aula TEXT
+        )""")
+    for nome, corpo in _TRIGGERS_RESUMO.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nome} {corpo}")
+    conn.execute("DELETE FROM resumo_alunos")
+    conn.execute(f"INSERT INTO resumo_alunos (aluno_id, total_aulas, presencas, faltas, ultima_aula) {_SQL_RESUMO_RECALCULADO}")
+
+def _migracao_006(conn):
+    """Índices por data em 'aulas' e 'atividades' (perguntas do Chatbot sem turma)."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_aulas_data ON aulas(data)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_atividades_data ON atividades(data_entrega)")
+
+def _migracao_007(conn):
+    """Recria o índice de cobertura de 'presencas' por aula, removido na migração 3."""
+    # O UNIQUE(aula_id, aluno_id) não tem 'presente': sem este índice, cada
+    # presença lida por aula (relatório, exportação, edição) ia até a tabela
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_presencas_aula ON presencas(aula_id, aluno_id, presente)")
+
+def _migracao_008(conn):
+    """Recria os triggers de 'resumo_alunos' (ultima_aula incremental, UPDATE só se algo mudou)."""
+    for nome, corpo in _TRIGGERS_RESUMO.items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+        conn.execute(f"CREATE TRIGGER {nome} {corpo}")
+
+def verificar_resumo_alunos(conn=None, corrigir=False):
+    """
+    Recalcula os totais de cada aluno a partir de 'presencas' e compara com
+    a tabela 'resumo_alunos' (mantida pelos triggers). Diferenças ("drift")
+    só deveriam aparecer se o banco for alterado com os triggers ausentes.
+
+    Args:
+        conn (sqlite3.Connection): Conexão a usar (padrão: a compartilhada).
+        corrigir (bool): Se True, regrava o resumo dos alunos com diferença.
+
+    Returns:
+        list: Tuplas (aluno_id, esperado, gravado), onde 'esperado' e 'gravado'
+        são (total_aulas, presencas, faltas, ultima_aula); 'gravado' é None
+        se o aluno não tiver linha no resumo. Lista vazia = sem diferenças.
+    """
+    conn = conn or conectar()
+    gravados = {linha[0]: tuple(linha[1:]) for linha in
+                conn.execute("SELECT aluno_id, total_aulas, presencas, faltas, ultima_aula FROM resumo_alunos")}
+    diferencas = []
+    for aluno_id, *esperado in conn.execute(_SQL_RESUMO_RECALCULADO):
+        gravado = gravados.pop(aluno_id, None)
+        if gravado != tuple(esperado):
+            diferencas.append((aluno_id, tuple(esperado), gravado))
+    # Linhas de resumo de alunos que não existem mais
+    diferencas.extend((aluno_id, None, gravado) for aluno_id, gravado in gravados.items())
+
+    if corrigir and diferencas:
+        with conn:
+            for aluno_id, esperado, _ in diferencas:
+                if esperado is None:
+                    conn.execute("DELETE FROM resumo_alunos WHERE aluno_id = ?", (aluno_id,))
+                else:
+                    conn.execute("INSERT OR REPLACE INTO resumo_alunos VALUES (?, ?, ?, ?, ?)", (aluno_id, *esperado))
+    return diferencas
+
+@contextmanager
+def carga_em_massa(conn):
+    """
+    Suspende os triggers de 'resumo_alunos' durante uma carga grande de
+    presenças (ex: gerador de dados sintéticos) e recalcula o resumo inteiro
+    no final, em uma única query agrupada. Com os triggers, cada presença
+    inserida refaz o MAX(data) do aluno, o que torna cargas de milhões de
+    linhas inviáveis.
+
+    Tudo roda em UMA transação: se o bloco falhar, os triggers voltam junto
+    com o rollback.
+
+    Exemplo:
+        with carga_em_massa(conn):
+            conn.executemany("INSERT INTO presencas ...", linhas)
+    """
+    with conn:
+        # BEGIN explícito: o sqlite3 não abre transação antes de DDL sozinho
+        conn.execute("BEGIN")
+        for nome in _TRIGGERS_RESUMO:
+            conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+        yield conn
+        conn.execute("DELETE FROM resumo_alunos")
+        conn.execute(f"INSERT INTO resumo_alunos (aluno_id, total_aulas, presencas, faltas, ultima_aula) {_SQL_RESUMO_RECALCULADO}")
+        for nome, corpo in _TRIGGERS_RESUMO.items():
+            conn.execute(f"CREATE TRIGGER {nome} {corpo}")
+
+# Lista ORDENADA de migrações: (versão, descrição, função).
+# Nunca altere uma migração já publicada; adicione uma nova no final.
+MIGRACOES = [
+    (1, "Remove presenças órfãs e recria 'presencas' com ON DELETE CASCADE", _migracao_001),
+    (2, "Cria índices secundários das consultas das telas", _migracao_002),
+    (3, "Adiciona UNIQUE(aula_id, aluno_id) em 'presencas'", _migracao_003),
+    (4, "Converte datas de aulas e atividades para ISO-8601", _migracao_004),
+    (5, "Cria 'resumo_alunos' com os totais de presença por aluno (triggers)", _migracao_005),
+    (6, "Cria índices por data em 'aulas' e 'atividades'", _migracao_006),
+    (7, "Recria o índice de cobertura idx_presencas_aula", _migracao_007),
+    (8, "Recria os triggers de 'resumo_alunos' sem recálculos desnecessários", _migracao_008),
+]
+
+def versao_schema(conn=None):
+    """
+    Retorna a versão atual do schema (guardada no PRAGMA user_version).
+    """
+    conn = conn or conectar()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def executar_migracoes(dry_run=False, conn=None):
+    """
+    Aplica, em ordem, as migrações com versão maior que a do banco.
+    Cada migração roda na sua própria transação junto com a atualização
+    do 'user_version': se falhar, nada dela fica gravado.
+
+    Args:
+        dry_run (bool): Se True, executa as migrações pendentes e desfaz
+            tudo no final (útil para testar em uma cópia do banco real).
+        conn (sqlite3.Connection): Conexão a usar (padrão: a compartilhada).
+
+    Returns:
+        list: Tuplas (versão, descrição) das migrações executadas.
+    """
+    conn = conn or conectar()
+    atual = versao_schema(conn)
+    pendentes = [m for m in MIGRACOES if m[0] > atual]
+    if not pendentes:
+        return []
+
+    # Alterações de schema são feitas com foreign_keys desligado
+    # (e esse PRAGMA não pode ser alterado dentro de uma transação)
+    conn.execute("PRAGMA foreign_keys = OFF")
+    executadas = []
+    try:
+        if dry_run:
+            conn.execute("BEGIN")
+        for versao, descricao, funcao in pendentes:
+            prefixo = "[dry-run] " if dry_run else ""
+            print(f"{prefixo}Migração {versao}: {descricao}")
+            if not dry_run:
+                conn.execute("BEGIN")
+            try:
+                funcao(conn)
+                conn.execute(f"PRAGMA user_version = {versao}")
+                if not dry_run:
+                    conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                print(f"Erro na migração {versao}; banco mantido na versão {versao_schema(conn)}.")
+                raise
+            executadas.append((versao, descricao))
+        if dry_run:
+            conn.rollback()
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {PRAGMAS.get('foreign_keys', 'OFF')}")
+    return executadas
+
+if __name__ == "__main__":
+    # Uso:
+    #   python database.py            -> cria/atualiza o banco e mostra os planos de consulta
+    #   python database.py --dry-run  -> só lista/testa as migrações pendentes
+    #   python database.py --verificar-resumo [--corrigir] -> compara 'resumo_alunos' com 'presencas'
+    import sys
+    if "--dry-run" in sys.argv:
+        print(f"Versão atual do schema: {versao_schema()}")
+        executadas = executar_migracoes(dry_run=True)
+        print(f"{len(executadas)} migração(ões) pendente(s); nada foi gravado.")
+        fechar_conexoes()
+        sys.exit(0)
+    if "--verificar-resumo" in sys.argv:
+        criar_tabelas()
+        corrigir = "--corrigir" in sys.argv
+        diferencas = verificar_resumo_alunos(corrigir=corrigir)
+        for aluno_id, esperado, gravado in diferencas:
+            print(f"Aluno {aluno_id}: esperado {esperado}, gravado {gravado}")
+        situacao = "corrigida(s)" if corrigir else "encontrada(s)"
+        print(f"{len(diferencas)} diferença(s) {situacao} no resumo dos alunos.")
+        fechar_conexoes()
+        sys.exit(1 if diferencas and not corrigir else 0)
+    criar_tabelas()
+    for nome, ok, plano in verificar_planos_consulta():
+        print(f"[{'OK' if ok else 'SCAN'}] {nome}")
+        for linha in plano:
+            print(f"      {linha}")
+    fechar_conexoes()
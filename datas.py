@@ -0,0 +1,76 @@
+"""
+Arquivo de Datas (datas.py)
+
+Este módulo concentra a conversão de datas entre:
+1. O formato gravado no banco: ISO-8601 ('AAAA-MM-DD'), que ordena
+   corretamente como texto e permite consultas por intervalo com índice.
+2. O formato exibido nas telas: 'DD/MM/AAAA'.
+"""
+
+import datetime
+
+# Formato usado nas telas (e no calendário)
+FORMATO_EXIBICAO = "%d/%m/%Y"
+# Padrão equivalente para o tkcalendar.Calendar(date_pattern=...)
+PADRAO_CALENDARIO = "dd/mm/yyyy"
+
+# Formatos aceitos na entrada, em ordem de preferência. Datas com barras são
+# sempre dia/mês (padrão brasileiro), com ano de 4 ou 2 dígitos.
+_FORMATOS_ENTRADA = ("%Y-%m-%d", "%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y")
+
+# Só para a migração dos dados antigos: o tkcalendar sem 'date_pattern'
+# gravava mês/dia/ano com 2 dígitos (ex: '10/17/26'). Digitado na tela,
+# '03/04/25' é 3 de abril, nunca 4 de março.
+_FORMATOS_MIGRACAO = ("%Y-%m-%d", "%d/%m/%Y", "%m/%d/%y", "%d/%m/%y", "%d-%m-%Y")
+
+def para_date(texto, formatos=_FORMATOS_ENTRADA):
+    """
+    Converte um texto de data em 'datetime.date'.
+
+    Args:
+        texto (str): Data em qualquer um dos formatos aceitos.
+        formatos (tuple): Formatos tentados, em ordem (padrão: os da entrada nas telas).
+
+    Returns:
+        datetime.date: A data convertida.
+
+    Raises:
+        ValueError: Se o texto não estiver em nenhum formato conhecido.
+    """
+    texto = (texto or "").strip()
+    for formato in formatos:
+        try:
+            return datetime.datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Data inválida: '{texto}'")
+
+def para_iso(texto):
+    """
+    Converte um texto de data para o formato do banco ('AAAA-MM-DD').
+
+    Raises:
+        ValueError: Se o texto não for uma data válida.
+    """
+    return para_date(texto).isoformat()
+
+def para_exibicao(valor):
+    """
+    Converte uma data do banco para o formato das telas ('DD/MM/AAAA').
+    Valores que não puderem ser convertidos são devolvidos sem alteração.
+    """
+    try:
+        return para_date(valor).strftime(FORMATO_EXIBICAO)
+    except ValueError:
+        return valor or ""
+
+def iso_ou_original(valor):
+    """
+    Versão tolerante de 'para_iso', usada na migração dos dados antigos
+    (aceita também o formato antigo do tkcalendar): devolve o valor original
+    quando ele não puder ser convertido.
+    """
+    try:
+        return para_date(valor, _FORMATOS_MIGRACAO).isoformat()
+    except ValueError:
+        return valor
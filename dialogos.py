@@ -6,13 +6,17 @@ que são usadas em várias partes do sistema, como:
 1. JanelaConfirmacao: Um pop-up genérico de "Sim/Não".
 2. JanelaEditarAula: Um pop-up específico para editar aulas e presenças.
 3. JanelaEditarAtividade: Um pop-up específico para editar atividades.
+4. JanelaConsultas: Painel de diagnóstico com as estatísticas das consultas (F12).
 """
 
 import customtkinter as ctk
-import sqlite3
-from database import conectar
-from tkcalendar import Calendar
+from executor_banco import executar
+from datas import para_iso, para_exibicao, PADRAO_CALENDARIO
+from repositorio.aulas import buscar_presencas_edicao, atualizar_aula
+from repositorio.atividades import atualizar_atividade
+import instrumentacao
 import datetime
+from tkinter.filedialog import asksaveasfilename
 
 class JanelaConfirmacao(ctk.CTkToplevel):
     """
@@ -88,7 +92,7 @@ class JanelaEditarAula(ctk.CTkToplevel):
         self.data = ctk.CTkEntry(self, width=300, height=40,
                                  fg_color="white", border_color="#E0E0E0", border_width=1,
                                  text_color="#24232F", placeholder_text_color="#888888")
-        self.data.insert(0, data_atual)
+        self.data.insert(0, para_exibicao(data_atual)) # Banco guarda ISO, tela mostra DD/MM/AAAA
         self.data.pack(pady=5)
         self.data.bind("<Button-1>", self.abrir_calendario)
 
@@ -120,7 +124,7 @@ class JanelaEditarAula(ctk.CTkToplevel):
         self.frame_alunos.pack(pady=10, fill="x", expand=True, padx=20)
         
         self.alunos_checkboxes = [] 
-        self.carregar_presencas() 
+        self.nomes_alunos = {} # aluno_id -> nome (para atualizar o card no Relatório)
 
         frame_botoes = ctk.CTkFrame(self, fg_color="transparent")
         frame_botoes.pack(pady=10)
@@ -136,33 +140,36 @@ class JanelaEditarAula(ctk.CTkToplevel):
         self.status = ctk.CTkLabel(self, text="", text_color="red") 
         self.status.pack(pady=5)
 
-    def carregar_presencas(self):
-        """Carrega os alunos e suas presenças para esta aula."""
-        try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    SELECT a.id, a.nome, p.presente
-                    FROM alunos a
-                    JOIN presencas p ON a.id = p.aluno_id
-                    WHERE p.aula_id = ?
-                    ORDER BY a.nome
-                """, (self.aula_id,))
-                presencas = cursor.fetchall()
-            
-            for aluno_id, nome, presente in presencas:
-                var = ctk.BooleanVar(value=bool(presente))
-                checkbox = ctk.CTkCheckBox(self.frame_alunos, text=nome, variable=var, 
-                                           text_color="#24232F",
-                                           border_color="#24232F",
-                                           hover_color="#3A3A46",
-                                           fg_color="#24232F")
-                checkbox.pack(anchor="w", padx=20, pady=5)
-                self.alunos_checkboxes.append((aluno_id, var))
-
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao carregar presenças: {e}", text_color="red")
+        self.carregar_presencas()
 
+    def carregar_presencas(self):
+        """
+        Carrega os alunos e suas presenças para esta aula (no executor do
+        banco). O botão Salvar fica desabilitado até a lista chegar.
+        """
+        self.btn_salvar.configure(state="disabled")
+        self._mensagem_lista = ctk.CTkLabel(self.frame_alunos, text="Carregando presenças...", text_color="#555555")
+        self._mensagem_lista.pack(pady=10)
+        aula_id = self.aula_id
+        executar(lambda conn: buscar_presencas_edicao(conn, aula_id),
+                 ao_concluir=self._presencas_carregadas,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar presenças: {e}", text_color="red"),
+                 chave="JanelaEditarAula.presencas", dono=self)
+
+    def _presencas_carregadas(self, presencas):
+        """Chamado (na thread do Tk) com as presenças: cria um checkbox por aluno."""
+        self._mensagem_lista.destroy()
+        for aluno_id, nome, presente in presencas:
+            var = ctk.BooleanVar(value=bool(presente))
+            checkbox = ctk.CTkCheckBox(self.frame_alunos, text=nome, variable=var, 
+                                       text_color="#24232F",
+                                       border_color="#24232F",
+                                       hover_color="#3A3A46",
+                                       fg_color="#24232F")
+            checkbox.pack(anchor="w", padx=20, pady=5)
+            self.alunos_checkboxes.append((aluno_id, var))
+            self.nomes_alunos[aluno_id] = nome
+        self.btn_salvar.configure(state="normal")
 
     def salvar_alteracoes(self):
         """Salva as alterações da aula E das presenças."""
@@ -178,39 +185,48 @@ class JanelaEditarAula(ctk.CTkToplevel):
             return
 
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                
-                # 1. Atualiza a AULA
-                cursor.execute("""
-                    UPDATE aulas 
-                    SET data = ?, tema = ?, descricao = ?
-                    WHERE id = ?
-                """, (nova_data, novo_tema, nova_desc, self.aula_id))
-                
-                # 2. Prepara dados das PRESENÇAS
-                dados_presenca_atualizados = []
-                for aluno_id, var in self.alunos_checkboxes:
-                    status_presente = 1 if var.get() else 0
-                    dados_presenca_atualizados.append((status_presente, self.aula_id, aluno_id))
-                
-                # 3. Atualiza as PRESENÇAS
-                cursor.executemany("""
-                    UPDATE presencas 
-                    SET presente = ? 
-                    WHERE aula_id = ? AND aluno_id = ?
-                """, dados_presenca_atualizados)
-            
-            # Avisa o frame Relatorio para recarregar
-            self.frame_pai.status.configure(text="Aula e frequências atualizadas!", text_color="green")
-            self.frame_pai.carregar_aulas(self.frame_pai.turma_selecionada.get())
+            nova_data = para_iso(nova_data)
+        except ValueError:
+            self.status.configure(text="Data inválida. Use DD/MM/AAAA.", text_color="red")
+            return
+
+        aula_id = self.aula_id
+        # As presenças são lidas dos checkboxes aqui, na thread do Tk
+        presencas_marcadas = [(aluno_id, 1 if var.get() else 0) for aluno_id, var in self.alunos_checkboxes]
+        # Dados novos da aula, para o Relatório atualizar só o card dela
+        presencas = [(self.nomes_alunos[aluno_id], presente) for aluno_id, presente in presencas_marcadas]
+
+        def gravar(conn):
+            atualizar_aula(conn, aula_id, nova_data, novo_tema, nova_desc, presencas_marcadas)
+            return aula_id, nova_data, novo_tema, nova_desc, presencas
+
+        # A gravação roda no executor do banco; o botão fica desabilitado até terminar
+        self.btn_salvar.configure(state="disabled")
+        self.status.configure(text="Salvando...", text_color="#555555")
+        # O dono é o frame Relatorio, não esta janela: se ela for fechada antes
+        # do fim da gravação, o card da aula ainda é atualizado
+        executar(gravar, ao_concluir=self._alteracoes_salvas, ao_falhar=self._erro_ao_salvar,
+                 dono=self.frame_pai)
+
+    def _alteracoes_salvas(self, aula):
+        """Chamado (na thread do Tk) quando as alterações foram gravadas."""
+        # Avisa o frame Relatorio para atualizar o card desta aula
+        self.frame_pai.status.configure(text="Aula e frequências atualizadas!", text_color="green")
+        self.frame_pai.aula_editada(*aula)
+        if self.winfo_exists():
             self.destroy()
-            
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao salvar: {str(e)}", text_color="red")
+
+    def _erro_ao_salvar(self, erro):
+        """Chamado (na thread do Tk) quando a gravação falhou."""
+        if not self.winfo_exists(): # Janela já fechada: o erro aparece no Relatório
+            self.frame_pai.status.configure(text=f"Erro ao salvar a aula: {erro}", text_color="red")
+            return
+        self.btn_salvar.configure(state="normal")
+        self.status.configure(text=f"Erro ao salvar: {str(erro)}", text_color="red")
             
     def abrir_calendario(self, event=None):
         """Abre o pop-up de calendário."""
+        from tkcalendar import Calendar # Import adiado até o calendário ser aberto
         top_cal = ctk.CTkToplevel(self)
         top_cal.title("Selecionar Data")
         top_cal.geometry("300x320")
@@ -218,7 +234,8 @@ class JanelaEditarAula(ctk.CTkToplevel):
         cal = Calendar(top_cal, selectmode='day', 
                        year=datetime.datetime.now().year,
                        month=datetime.datetime.now().month, 
-                       day=datetime.datetime.now().day)
+                       day=datetime.datetime.now().day,
+                       date_pattern=PADRAO_CALENDARIO)
         cal.pack(pady=10, fill="both", expand=True)
 
         def pegar_data(): 
@@ -273,7 +290,7 @@ class JanelaEditarAtividade(ctk.CTkToplevel):
         self.data = ctk.CTkEntry(self, width=300, height=40,
                                  fg_color="white", border_color="#E0E0E0", border_width=1,
                                  text_color="#24232F", placeholder_text_color="#888888")
-        self.data.insert(0, data_atual)
+        self.data.insert(0, para_exibicao(data_atual)) # Banco guarda ISO, tela mostra DD/MM/AAAA
         self.data.pack(pady=5)
         self.data.bind("<Button-1>", self.abrir_calendario)
 
@@ -322,24 +339,38 @@ class JanelaEditarAtividade(ctk.CTkToplevel):
             return
 
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE atividades 
-                    SET nome = ?, data_entrega = ?, descricao = ?
-                    WHERE id = ?
-                """, (novo_nome, nova_data, nova_desc, self.ativ_id))
-            
-            # Avisa o frame pai (Atividades) para recarregar
-            self.frame_pai.status.configure(text="Atividade atualizada com sucesso!", text_color="green")
-            self.frame_pai.carregar_atividades(self.frame_pai.turma_selecionada.get())
+            nova_data = para_iso(nova_data)
+        except ValueError:
+            self.status.configure(text="Data inválida. Use DD/MM/AAAA.", text_color="red")
+            return
+
+        ativ_id = self.ativ_id
+        self.btn_salvar.configure(state="disabled")
+        self.status.configure(text="Salvando...", text_color="#555555")
+        # Como na JanelaEditarAula: o dono é o frame Atividades, não esta janela
+        executar(lambda conn: atualizar_atividade(conn, ativ_id, novo_nome, nova_data, nova_desc),
+                 ao_concluir=self._alteracoes_salvas, ao_falhar=self._erro_ao_salvar,
+                 dono=self.frame_pai)
+
+    def _alteracoes_salvas(self, _):
+        """Chamado (na thread do Tk) quando as alterações foram gravadas."""
+        # Avisa o frame pai (Atividades) para recarregar
+        self.frame_pai.status.configure(text="Atividade atualizada com sucesso!", text_color="green")
+        self.frame_pai.carregar_atividades(self.frame_pai.turma_id_selecionada())
+        if self.winfo_exists():
             self.destroy()
-            
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao salvar: {str(e)}", text_color="red")
+
+    def _erro_ao_salvar(self, erro):
+        """Chamado (na thread do Tk) quando a gravação falhou."""
+        if not self.winfo_exists(): # Janela já fechada: o erro aparece na tela de Atividades
+            self.frame_pai.status.configure(text=f"Erro ao salvar a atividade: {erro}", text_color="red")
+            return
+        self.btn_salvar.configure(state="normal")
+        self.status.configure(text=f"Erro ao salvar: {str(erro)}", text_color="red")
             
     def abrir_calendario(self, event=None):
         """Abre o pop-up de calendário."""
+        from tkcalendar import Calendar # Import adiado até o calendário ser aberto
         top_cal = ctk.CTkToplevel(self)
         top_cal.title("Selecionar Data")
         top_cal.geometry("300x320")
@@ -347,7 +378,8 @@ class JanelaEditarAtividade(ctk.CTkToplevel):
         cal = Calendar(top_cal, selectmode='day', 
                        year=datetime.datetime.now().year,
                        month=datetime.datetime.now().month, 
-                       day=datetime.datetime.now().day)
+                       day=datetime.datetime.now().day,
+                       date_pattern=PADRAO_CALENDARIO)
         cal.pack(pady=10, fill="both", expand=True)
 
         def pegar_data(): 
@@ -367,4 +399,70 @@ class JanelaEditarAtividade(ctk.CTkToplevel):
     def restaurar_placeholder(self, event):
         if self.descricao.get("0.0", "end").strip() == "":
             self.descricao.insert("0.0", self.desc_placeholder)
-            self.descricao.configure(text_color="#888888")
\ No newline at end of file
+            self.descricao.configure(text_color="#888888")
+
+class JanelaConsultas(ctk.CTkToplevel):
+    """
+    Painel de diagnóstico (aberto com F12): mostra as estatísticas das
+    consultas ao banco coletadas por 'instrumentacao', para o suporte
+    descobrir qual tela está lenta na máquina do professor.
+    """
+    def __init__(self, parent):
+        """
+        Inicializa o painel e mostra o relatório atual.
+        """
+        super().__init__(parent)
+        self.title("Diagnóstico - Consultas ao Banco")
+        self.geometry("900x550")
+        self.configure(fg_color="#F0F0F0")
+        self.attributes("-topmost", True)
+
+        self.texto = ctk.CTkTextbox(self, font=("Consolas", 12), wrap="none",
+                                    fg_color="white", border_color="#E0E0E0", border_width=1,
+                                    text_color="#24232F")
+        self.texto.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+
+        frame_botoes = ctk.CTkFrame(self, fg_color="transparent")
+        frame_botoes.pack(pady=(5, 10))
+        for texto, comando in (("Atualizar", self.atualizar), ("Zerar", self.zerar),
+                               ("Salvar em arquivo...", self.salvar), ("Fechar", self.destroy)):
+            ctk.CTkButton(frame_botoes, text=texto, command=comando, width=150,
+                          fg_color="#24232F", text_color="white", hover_color="#3A3A46").pack(side="left", padx=5)
+
+        self.bind("<F5>", lambda event: self.atualizar())
+        self.atualizar()
+
+    def relatorio(self):
+        """Texto exibido no painel (ou como ativar a instrumentação, se estiver desligada)."""
+        if not instrumentacao.ativa():
+            return ("A instrumentação das consultas está desligada.\n\n"
+                    "Para coletar as estatísticas, feche o SAGE e abra de novo com\n"
+                    "    python main.py --instrumentar\n"
+                    "ou com a variável de ambiente SAGE_INSTRUMENTAR=1.")
+        return instrumentacao.estatisticas.relatorio()
+
+    def atualizar(self):
+        """Mostra o relatório atual (também impresso no console)."""
+        relatorio = self.relatorio()
+        print(relatorio)
+        self.texto.configure(state="normal")
+        self.texto.delete("0.0", "end")
+        self.texto.insert("0.0", relatorio)
+        self.texto.configure(state="disabled")
+
+    def zerar(self):
+        """Descarta as medidas (para medir só a próxima ação)."""
+        instrumentacao.estatisticas.zerar()
+        self.atualizar()
+
+    def salvar(self):
+        """Grava o relatório em um arquivo de texto (para enviar ao suporte)."""
+        arquivo = asksaveasfilename(parent=self, defaultextension=".txt", initialfile="diagnostico_sage.txt",
+                                    filetypes=[("Arquivo de texto", "*.txt")])
+        if not arquivo:
+            return
+        try:
+            with open(arquivo, "w", encoding="utf-8") as saida:
+                saida.write(self.relatorio() + "\n")
+        except OSError as e:
+            print(f"Erro ao salvar o diagnóstico: {e}")
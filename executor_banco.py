@@ -0,0 +1,210 @@
+"""
+Arquivo do Executor do Banco (executor_banco.py)
+
+Este módulo define o 'ExecutorBanco', que executa as consultas ao SQLite em
+uma thread separada, para que os eventos do Tk (cliques, trocas de turma)
+nunca fiquem esperando o banco — o que congelava a janela, principalmente
+com o arquivo .db em uma unidade de rede.
+
+Fluxo:
+1. A tela chama 'executar(funcao, ao_concluir, ...)'.
+2. A thread do executor roda 'funcao(conn)' com a SUA conexão (ver
+   'GerenciadorConexoes') dentro de um 'with conn' (commit/rollback).
+3. O resultado volta por uma fila, que a thread do Tk verifica com .after();
+   'ao_concluir(resultado)' ou 'ao_falhar(erro)' rodam na thread do Tk,
+   podendo mexer nos widgets normalmente.
+
+Pedidos com a mesma 'chave' se substituem: ao trocar de turma rapidamente,
+só o último pedido é executado/entregue e os anteriores são cancelados.
+
+Trabalho lento que NÃO usa o banco (o hash bcrypt das senhas) vai para um
+segundo executor, 'executor_senhas' (ver 'executar_senha'): na fila do
+executor do banco, ele atrasaria as consultas de todas as telas.
+"""
+
+import itertools
+import queue
+import threading
+from database import conectar
+
+class Tarefa:
+    """
+    Um pedido enviado ao executor.
+
+    Attributes:
+        chave (str): Chave de substituição (ou None).
+        cancelada (bool): Se True, a função não roda e os callbacks não são chamados.
+    """
+
+    def __init__(self, numero, funcao, ao_concluir, ao_falhar, chave, dono):
+        self.numero = numero
+        self.funcao = funcao
+        self.ao_concluir = ao_concluir
+        self.ao_falhar = ao_falhar
+        self.chave = chave
+        self.dono = dono
+        self.cancelada = False
+
+    def cancelar(self):
+        """Cancela a tarefa (se ainda não foi entregue)."""
+        self.cancelada = True
+
+class ExecutorBanco:
+    """
+    Uma thread dedicada que executa funções de banco em ordem de chegada.
+
+    Com usa_banco=False, as funções são chamadas sem argumentos (sem abrir
+    conexão nem transação): é o caso do 'executor_senhas'.
+    """
+
+    INTERVALO_VERIFICACAO = 20 # ms entre as verificações da fila de resultados
+
+    def __init__(self, nome="ExecutorBanco", usa_banco=True):
+        self.nome = nome
+        self.usa_banco = usa_banco
+        self._pedidos = queue.Queue()
+        self._resultados = queue.Queue()
+        self._numeros = itertools.count(1)
+        self._ultimas = {} # chave -> última Tarefa enviada com essa chave
+        self._lock = threading.Lock()
+        self._thread = None
+        self._raiz = None
+        self._verificacao = None # id do .after() agendado
+        self.executadas = 0
+        self.canceladas = 0
+
+    def iniciar(self, raiz):
+        """
+        Inicia a thread do executor e a verificação periódica de resultados.
+
+        Args:
+            raiz (ctk.CTk): A janela principal (usada para o .after()).
+        """
+        self._raiz = raiz
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._laco, name=self.nome, daemon=True)
+            self._thread.start()
+        if self._verificacao is None:
+            self._verificacao = raiz.after(self.INTERVALO_VERIFICACAO, self._entregar_resultados)
+
+    def encerrar(self, timeout=2.0):
+        """
+        Para a thread (depois de terminar a tarefa atual) e a verificação.
+        Resultados ainda não entregues são descartados.
+        """
+        if self._verificacao is not None and self._raiz is not None:
+            try:
+                self._raiz.after_cancel(self._verificacao)
+            except Exception:
+                pass # A janela já foi destruída
+        self._verificacao = None
+        if self._thread is not None:
+            self._pedidos.put(None) # Sinal de parada
+            self._thread.join(timeout)
+            self._thread = None
+
+    def executar(self, funcao, ao_concluir=None, ao_falhar=None, chave=None, dono=None):
+        """
+        Agenda 'funcao(conn)' para rodar na thread do executor.
+
+        Args:
+            funcao (callable): Recebe a conexão da thread do executor e retorna o resultado.
+            ao_concluir (callable): Chamada na thread do Tk com o resultado.
+            ao_falhar (callable): Chamada na thread do Tk com a exceção (padrão: só imprime).
+            chave (str): Pedidos com a mesma chave se substituem (o anterior é cancelado).
+            dono (widget): Se o widget for destruído antes da entrega, os callbacks são ignorados.
+
+        Returns:
+            Tarefa: O pedido (pode ser cancelado com .cancelar()).
+        """
+        if self._thread is None:
+            raise RuntimeError(f"{self.nome} não iniciado (chame iniciar(raiz)).")
+        tarefa = Tarefa(next(self._numeros), funcao, ao_concluir, ao_falhar, chave, dono)
+        if chave is not None:
+            with self._lock:
+                anterior = self._ultimas.get(chave)
+                self._ultimas[chave] = tarefa
+            if anterior is not None and not anterior.cancelada:
+                anterior.cancelar()
+                self.canceladas += 1
+        self._pedidos.put(tarefa)
+        return tarefa
+
+    def cancelar(self, chave):
+        """Cancela o pedido pendente com a chave informada (se houver)."""
+        with self._lock:
+            tarefa = self._ultimas.pop(chave, None)
+        if tarefa is not None and not tarefa.cancelada:
+            tarefa.cancelar()
+            self.canceladas += 1
+
+    def _laco(self):
+        """Laço da thread do executor: roda as tarefas na ordem de chegada."""
+        while True:
+            tarefa = self._pedidos.get()
+            if tarefa is None:
+                return
+            if tarefa.cancelada:
+                continue # Um pedido mais novo com a mesma chave já foi enviado
+            try:
+                if self.usa_banco:
+                    conn = conectar()
+                    with conn:
+                        resultado = tarefa.funcao(conn)
+                else:
+                    resultado = tarefa.funcao()
+                self._resultados.put((tarefa, True, resultado))
+            except Exception as e:
+                self._resultados.put((tarefa, False, e))
+            self.executadas += 1
+
+    def _entregar_resultados(self):
+        """
+        Roda na thread do Tk: entrega os resultados prontos e se reagenda.
+        """
+        try:
+            while True:
+                tarefa, sucesso, valor = self._resultados.get_nowait()
+                self._entregar(tarefa, sucesso, valor)
+        except queue.Empty:
+            pass
+        self._verificacao = self._raiz.after(self.INTERVALO_VERIFICACAO, self._entregar_resultados)
+
+    def _entregar(self, tarefa, sucesso, valor):
+        """Chama o callback de uma tarefa (se ela ainda for relevante)."""
+        if tarefa.chave is not None:
+            with self._lock:
+                if self._ultimas.get(tarefa.chave) is tarefa:
+                    del self._ultimas[tarefa.chave]
+        if tarefa.cancelada:
+            return
+        if tarefa.dono is not None and not tarefa.dono.winfo_exists():
+            return
+        try:
+            if sucesso:
+                if tarefa.ao_concluir is not None:
+                    tarefa.ao_concluir(valor)
+            elif tarefa.ao_falhar is not None:
+                tarefa.ao_falhar(valor)
+            else:
+                print(f"Erro em tarefa do banco: {valor}")
+        except Exception as e:
+            # Um erro em um callback não pode parar a verificação da fila
+            print(f"Erro ao entregar resultado do banco: {e}")
+
+# Instâncias únicas usadas por todo o sistema
+executor = ExecutorBanco()
+executor_senhas = ExecutorBanco(nome="ExecutorSenhas", usa_banco=False)
+
+def executar(funcao, ao_concluir=None, ao_falhar=None, chave=None, dono=None):
+    """
+    Atalho para 'executor.executar' (ver ExecutorBanco.executar).
+    """
+    return executor.executar(funcao, ao_concluir, ao_falhar, chave, dono)
+
+def executar_senha(funcao, ao_concluir=None, ao_falhar=None, dono=None):
+    """
+    Agenda 'funcao()' (sem conexão) no executor de senhas, para o hash e a
+    verificação bcrypt não ocuparem a thread do banco.
+    """
+    return executor_senhas.executar(funcao, ao_concluir, ao_falhar, dono=dono)
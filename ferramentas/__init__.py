@@ -0,0 +1,5 @@
+"""
+Ferramentas de desenvolvimento do SAGE (benchmarks e verificações).
+Execute a partir da pasta raiz do projeto, ex: python -m ferramentas.benchmark_relatorio
+(as verificações automáticas ficam em tests/: python -m pytest)
+"""
@@ -0,0 +1,97 @@
+"""
+Benchmark do Relatório (ferramentas/benchmark_relatorio.py)
+
+Monta um banco temporário com uma turma grande e mostra o tempo e o número
+de instruções SQL de abrir o relatório (primeira página), expandir uma aula
+e percorrer todas as páginas, comparados com a implementação N+1 antiga.
+
+As contagens de instruções (uma por página e por aula expandida) são
+verificadas automaticamente em tests/test_relatorio.py; este script serve
+só para medir os tempos.
+
+Uso: python -m ferramentas.benchmark_relatorio [num_aulas] [num_alunos]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import database
+from repositorio.aulas import TAMANHO_PAGINA, buscar_pagina_aulas, buscar_presencas_aula
+
+def _popular(conn, num_aulas, num_alunos):
+    """Cria uma turma com 'num_alunos' alunos e 'num_aulas' aulas com presença."""
+    with conn:
+        turma_id = conn.execute("INSERT INTO turmas (nome) VALUES ('Turma Benchmark')").lastrowid
+        conn.executemany("INSERT INTO alunos (nome, turma_id) VALUES (?, ?)",
+                         [(f"Aluno {i:03d}", turma_id) for i in range(num_alunos)])
+        alunos = [r[0] for r in conn.execute("SELECT id FROM alunos WHERE turma_id = ?", (turma_id,))]
+        for i in range(num_aulas):
+            data = f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}"
+            aula_id = conn.execute("INSERT INTO aulas (turma_id, data, tema, descricao) VALUES (?, ?, ?, '')",
+                                   (turma_id, data, f"Tema {i}")).lastrowid
+            conn.executemany("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (?, ?, ?)",
+                             [(aula_id, aluno_id, (aula_id + aluno_id) % 5 != 0) for aluno_id in alunos])
+    return turma_id
+
+def _buscar_n_mais_1(conn, turma_id):
+    """Implementação antiga (uma query de presenças por aula), para comparação."""
+    aulas = conn.execute("SELECT id, data, tema, descricao FROM aulas WHERE turma_id = ? ORDER BY data DESC, id DESC",
+                         (turma_id,)).fetchall()
+    resultado = []
+    for aula_id, data, tema, descricao in aulas:
+        presencas = conn.execute("""
+            SELECT alunos.nome, presencas.presente
+            FROM presencas
+            JOIN alunos ON presencas.aluno_id = alunos.id
+            WHERE presencas.aula_id = ?
+            ORDER BY alunos.nome
+        """, (aula_id,)).fetchall()
+        resultado.append((aula_id, data, tema, descricao, presencas))
+    return resultado
+
+def _medir(funcao, *args):
+    """Executa 'funcao(*args)' contando instruções e tempo."""
+    conn = args[0]
+    with database.contar_instrucoes(conn) as instrucoes:
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempo = time.perf_counter() - inicio
+    return resultado, len(instrucoes), tempo
+
+def _todas_as_paginas(conn, turma_id):
+    """Percorre todas as páginas do relatório, como na rolagem até o fim."""
+    aulas, chave = [], None
+    while True:
+        pagina = buscar_pagina_aulas(conn, turma_id, TAMANHO_PAGINA, chave)
+        aulas.extend(pagina)
+        if len(pagina) < TAMANHO_PAGINA:
+            return aulas
+        chave = (pagina[-1][1], pagina[-1][0])
+
+def main(num_aulas=200, num_alunos=40):
+    """
+    Executa o benchmark e imprime os tempos. Retorna 0.
+    """
+    with tempfile.TemporaryDirectory() as pasta:
+        database.usar_banco(os.path.join(pasta, "benchmark.db"))
+        database.criar_tabelas()
+        conn = database.conectar()
+        turma_id = _popular(conn, num_aulas, num_alunos)
+
+        _, n_antigo, t_antigo = _medir(_buscar_n_mais_1, conn, turma_id)
+        pagina, n_pagina, t_pagina = _medir(buscar_pagina_aulas, conn, turma_id)
+        _, n_expandir, t_expandir = _medir(buscar_presencas_aula, conn, pagina[0][0])
+        _, n_todas, t_todas = _medir(_todas_as_paginas, conn, turma_id)
+        database.fechar_conexoes()
+
+    print(f"{num_aulas} aulas x {num_alunos} alunos (páginas de {TAMANHO_PAGINA})")
+    print(f"  N+1 (antigo)      : {n_antigo:5d} instruções  {t_antigo * 1000:8.1f} ms")
+    print(f"  Primeira página   : {n_pagina:5d} instruções  {t_pagina * 1000:8.1f} ms")
+    print(f"  Expandir uma aula : {n_expandir:5d} instruções  {t_expandir * 1000:8.1f} ms")
+    print(f"  Todas as páginas  : {n_todas:5d} instruções  {t_todas * 1000:8.1f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,244 @@
+"""
+Benchmark das telas com dados de escola (ferramentas/benchmark_telas.py)
+
+Mede, em um banco gerado por 'ferramentas.gerar_dados', as consultas e
+gravações que cada tela faz (pelas mesmas funções de 'repositorio'):
+latência p50/p95/máxima e número de instruções SQL de cada caminho.
+
+O resultado pode ser gravado em JSON (--salvar) e comparado com um JSON
+anterior (--comparar): um caminho regrediu se o p95 passou de
+(1 + TOLERANCIA) x o p95 de referência (e de FOLGA_MS em valor absoluto,
+para não acusar ruído em consultas de fração de milissegundo) ou se passou
+a executar mais instruções SQL.
+
+Uso:
+    python -m ferramentas.benchmark_telas [--banco escola.db] [--fator F]
+        [--repeticoes N] [--salvar baseline.json] [--comparar baseline.json]
+
+Sem --banco, um banco é gerado em uma pasta temporária (--fator e os
+tamanhos são os de 'gerar_dados'). Com --banco, o arquivo é copiado antes:
+as gravações medidas não alteram o original.
+
+Os tempos só podem ser comparados na mesma máquina: grave a referência
+(--salvar) antes da mudança e compare (--comparar) depois; nenhuma
+referência de tempos é versionada. As contagens de instruções, que valem em
+qualquer máquina, são verificadas automaticamente em
+tests/test_benchmark_telas.py.
+"""
+
+import io
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import database
+from ferramentas.gerar_dados import ler_argumentos, escala_de, gerar_banco
+from repositorio.turmas import listar_turmas
+from repositorio.alunos import listar_alunos_turma, buscar_resumo_alunos, buscar_historico_aluno
+from repositorio.aulas import (TAMANHO_PAGINA, buscar_pagina_aulas, buscar_presencas_aula,
+                               buscar_presencas_edicao, registrar_aula, atualizar_aula)
+from repositorio.exportacao import (contar_linhas_csv, contar_linhas_matriz,
+                                    exportar_csv_em_lotes, exportar_matriz_em_lotes)
+
+REPETICOES = 30
+
+# Regressão: p95 acima de (1 + TOLERANCIA) x referência E mais de FOLGA_MS acima dela
+TOLERANCIA = 0.5
+FOLGA_MS = 2.0
+
+def percentil(valores, fracao):
+    """
+    Percentil pelo método do posto mais próximo (sem interpolação).
+
+    Args:
+        valores (list): Valores já ordenados.
+        fracao (float): Ex: 0.95 para o p95.
+    """
+    return valores[max(0, math.ceil(fracao * len(valores)) - 1)]
+
+def _exportar(conn, turma_id, contar, exportar):
+    """Exporta a turma inteira, como 'Relatorio.exportar_csv' (contagem + lotes)."""
+    contar(conn, turma_id)
+    with io.StringIO() as arquivo:
+        for _ in exportar(conn, turma_id, arquivo):
+            pass
+
+def _gravar(conn, funcao, *args):
+    """Grava como o executor do banco: dentro de 'with conn' (commit no final)."""
+    with conn:
+        funcao(conn, *args)
+
+def _casos(conn, rng):
+    """
+    Monta os caminhos medidos. Cada caso é (nome, preparar), onde
+    preparar() sorteia a turma/aula/aluno da repetição FORA da medição e
+    devolve (funcao, args) a medir.
+    """
+    turmas = [turma.id for turma in listar_turmas(conn)]
+
+    def turma():
+        return rng.choice(turmas)
+
+    def aula_da_turma():
+        return rng.choice(buscar_pagina_aulas(conn, turma()))
+
+    def aluno_da_turma():
+        return rng.choice(listar_alunos_turma(conn, turma()))
+
+    def segunda_pagina():
+        turma_id = turma()
+        ultima = buscar_pagina_aulas(conn, turma_id)[-1]
+        return buscar_pagina_aulas, (conn, turma_id, TAMANHO_PAGINA, (ultima.data, ultima.id))
+
+    def salvar_aula():
+        turma_id = turma()
+        presencas = [(aluno.id, rng.randint(0, 1)) for aluno in listar_alunos_turma(conn, turma_id)]
+        return _gravar, (conn, registrar_aula, turma_id, "2025-12-20", "Benchmark", "", presencas)
+
+    def editar_aula():
+        aula = aula_da_turma()
+        presencas = [(p.aluno_id, 1 - p.presente) for p in buscar_presencas_edicao(conn, aula.id)]
+        return _gravar, (conn, atualizar_aula, aula.id, aula.data, aula.tema, aula.descricao, presencas)
+
+    return [
+        ("cache_turmas.obter", lambda: (listar_turmas, (conn,))),
+        ("Relatorio.carregar_aulas", lambda: (buscar_pagina_aulas, (conn, turma()))),
+        ("Relatorio.carregar_mais", segunda_pagina),
+        ("Relatorio.alternar_frequencia", lambda: (buscar_presencas_aula, (conn, aula_da_turma().id))),
+        ("Relatorio.exportar_csv (lista)",
+         lambda: (_exportar, (conn, turma(), contar_linhas_csv, exportar_csv_em_lotes))),
+        ("Relatorio.exportar_csv (matriz)",
+         lambda: (_exportar, (conn, turma(), contar_linhas_matriz, exportar_matriz_em_lotes))),
+        ("Visualizacao.carregar_alunos_otimizado", lambda: (buscar_resumo_alunos, (conn, turma()))),
+        ("Visualizacao.alternar_historico", lambda: (buscar_historico_aluno, (conn, aluno_da_turma().id))),
+        ("Aula.carregar_alunos", lambda: (listar_alunos_turma, (conn, turma()))),
+        ("Aula.salvar_aula", salvar_aula),
+        ("JanelaEditarAula.carregar_presencas", lambda: (buscar_presencas_edicao, (conn, aula_da_turma().id))),
+        ("JanelaEditarAula.salvar_alteracoes", editar_aula),
+    ]
+
+def medir(conn, repeticoes=REPETICOES, semente=0):
+    """
+    Mede todos os caminhos das telas.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco (já com dados).
+        repeticoes (int): Medições por caminho (depois de uma de aquecimento).
+        semente (int): Semente do sorteio de turmas/aulas/alunos.
+
+    Returns:
+        dict: {caminho: {"p50_ms", "p95_ms", "max_ms", "instrucoes"}}.
+    """
+    rng = random.Random(semente)
+    medidas = {}
+    for nome, preparar in _casos(conn, rng):
+        funcao, args = preparar()
+        funcao(*args) # Aquecimento (cache de páginas e de instruções preparadas)
+        tempos, instrucoes = [], 0
+        for _ in range(repeticoes):
+            funcao, args = preparar()
+            with database.contar_instrucoes(conn) as executadas:
+                inicio = time.perf_counter()
+                funcao(*args)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            instrucoes = max(instrucoes, len(executadas))
+        tempos.sort()
+        medidas[nome] = {
+            "p50_ms": round(percentil(tempos, 0.50), 3),
+            "p95_ms": round(percentil(tempos, 0.95), 3),
+            "max_ms": round(tempos[-1], 3),
+            "instrucoes": instrucoes,
+        }
+    return medidas
+
+def comparar(medidas, referencia):
+    """
+    Compara as medidas com as de um JSON anterior.
+
+    Returns:
+        list: Textos descrevendo cada regressão (vazia = sem regressões).
+    """
+    regressoes = []
+    for nome, atual in medidas.items():
+        antes = referencia.get(nome)
+        if antes is None:
+            continue
+        limite = max(antes["p95_ms"] * (1 + TOLERANCIA), antes["p95_ms"] + FOLGA_MS)
+        if atual["p95_ms"] > limite:
+            regressoes.append(f"{nome}: p95 {atual['p95_ms']:.2f} ms (referência {antes['p95_ms']:.2f} ms)")
+        if atual["instrucoes"] > antes["instrucoes"]:
+            regressoes.append(f"{nome}: {atual['instrucoes']} instruções (referência {antes['instrucoes']})")
+    return regressoes
+
+def _executar(caminho, args):
+    """Abre o banco de trabalho, mede e devolve o relatório completo (dict)."""
+    database.usar_banco(caminho)
+    conn = database.conectar()
+    try:
+        escala = {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                  for tabela in ("turmas", "alunos", "aulas", "presencas", "atividades")}
+        medidas = medir(conn, args.repeticoes, args.semente)
+    finally:
+        database.fechar_conexoes()
+    return {
+        "data": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "escala": escala,
+        "repeticoes": args.repeticoes,
+        "medidas": medidas,
+    }
+
+def main(argv=None):
+    """Executa o benchmark. Retorna 0, ou 1 se houve regressão em relação a --comparar."""
+    parser = ler_argumentos(__doc__)
+    parser.add_argument("--banco", help="banco gerado por 'ferramentas.gerar_dados' (é copiado antes)")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--salvar", metavar="JSON", help="grava o resultado (nova referência)")
+    parser.add_argument("--comparar", metavar="JSON", help="compara com uma referência gravada")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "benchmark.db")
+        if args.banco:
+            shutil.copyfile(args.banco, caminho)
+        else:
+            print("Gerando banco sintético...")
+            gerar_banco(caminho, semente=args.semente, criar_login=False, **escala_de(args))
+            database.fechar_conexoes()
+        resultado = _executar(caminho, args)
+
+    escala = ", ".join(f"{total} {tabela}" for tabela, total in resultado["escala"].items())
+    print(f"\n{escala} ({args.repeticoes} repetições)")
+    print(f"  {'caminho':<40} {'p50 ms':>8} {'p95 ms':>8} {'máx ms':>8} {'instr.':>6}")
+    for nome, m in resultado["medidas"].items():
+        print(f"  {nome:<40} {m['p50_ms']:8.2f} {m['p95_ms']:8.2f} {m['max_ms']:8.2f} {m['instrucoes']:6d}")
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+        print(f"Resultado gravado em '{args.salvar}'.")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            referencia = json.load(arquivo)
+        if referencia.get("escala") != resultado["escala"]:
+            print("Aviso: a referência foi medida com outro tamanho de banco.")
+        regressoes = comparar(resultado["medidas"], referencia["medidas"])
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        if regressoes:
+            return 1
+        print("Sem regressões em relação à referência.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
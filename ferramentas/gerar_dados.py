@@ -0,0 +1,196 @@
+"""
+Gerador de dados sintéticos (ferramentas/gerar_dados.py)
+
+Cria um banco do SAGE com o tamanho de uma escola real, para medir as telas
+fora do banco de exemplo (que tem só algumas linhas). O mesmo tamanho e a
+mesma semente geram sempre o mesmo banco, então medidas feitas em máquinas
+ou versões diferentes comparam os mesmos dados.
+
+O banco é criado pelo caminho normal ('criar_tabelas' + migrações) e as
+presenças são carregadas com os triggers de 'resumo_alunos' suspensos
+(ver 'database.carga_em_massa').
+
+Uso:
+    python -m ferramentas.gerar_dados destino.db [--turmas N] [--alunos N]
+        [--aulas N] [--atividades N] [--semente N] [--fator F]
+
+--fator multiplica todos os tamanhos (ex: 0.1 para um banco de testes rápido).
+"""
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+import database
+
+# Tamanho de uma escola grande: 40 alunos e 200 aulas por turma (1,6 milhão de presenças)
+ESCALA_ESCOLA = {"turmas": 200, "alunos": 8000, "aulas": 40000, "atividades": 4000}
+
+SEMENTE_PADRAO = 2024
+
+# Login criado no banco gerado (para abrir as telas com os dados sintéticos)
+EMAIL_PROFESSOR = "professor@sage.local"
+SENHA_PROFESSOR = "sage1234"
+
+PRIMEIROS_NOMES = (
+    "Ana", "Beatriz", "Bruno", "Camila", "Carlos", "Daniel", "Eduarda", "Felipe",
+    "Gabriel", "Gabriela", "Guilherme", "Heloísa", "Igor", "Isabela", "João",
+    "Júlia", "Larissa", "Lucas", "Luiza", "Marcos", "Maria", "Mateus", "Nicole",
+    "Otávio", "Pedro", "Rafael", "Sofia", "Thiago", "Valentina", "Vinícius",
+)
+SOBRENOMES = (
+    "Almeida", "Alves", "Barbosa", "Cardoso", "Costa", "Dias", "Ferreira",
+    "Gomes", "Lima", "Martins", "Melo", "Nascimento", "Oliveira", "Pereira",
+    "Ribeiro", "Rocha", "Santos", "Silva", "Souza", "Teixeira",
+)
+TEMAS = (
+    "Frações", "Equações do 1º grau", "Revolução Industrial", "Fotossíntese",
+    "Interpretação de texto", "Geometria plana", "Verbos no passado",
+    "Sistema solar", "Brasil Colônia", "Tabela periódica", "Funções",
+    "Leitura e produção de texto", "Cadeias alimentares", "Probabilidade",
+)
+TIPOS_ATIVIDADE = ("Prova", "Trabalho", "Seminário", "Lista de exercícios")
+
+# Ano letivo usado nas datas (aulas só em dias úteis de fevereiro a dezembro)
+ANO_LETIVO = 2025
+
+def _dividir(total, partes):
+    """Divide 'total' em 'partes' inteiros o mais iguais possível."""
+    base, resto = divmod(total, partes)
+    return [base + (1 if i < resto else 0) for i in range(partes)]
+
+def _dias_letivos():
+    """Dias úteis do ano letivo, em ISO (AAAA-MM-DD)."""
+    dia = datetime.date(ANO_LETIVO, 2, 1)
+    fim = datetime.date(ANO_LETIVO, 12, 15)
+    dias = []
+    while dia <= fim:
+        if dia.weekday() < 5:
+            dias.append(dia.isoformat())
+        dia += datetime.timedelta(days=1)
+    return dias
+
+def _nomes_turmas(quantidade):
+    """Gera nomes únicos como '7º Ano B' (com um número se as combinações acabarem)."""
+    combinacoes = [f"{serie}º Ano {letra}" for letra in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" for serie in range(1, 10)]
+    return [combinacoes[i % len(combinacoes)] + (f" ({i // len(combinacoes) + 1})" if i >= len(combinacoes) else "")
+            for i in range(quantidade)]
+
+def _presencas(rng, aulas_turma, alunos_turma):
+    """
+    Gera as presenças de uma turma. Cada aluno tem a sua própria taxa de
+    presença (a maioria entre 85% e 100%, alguns bem faltosos), para as
+    consultas de faltosos e frequência terem o que mostrar.
+    """
+    taxas = [rng.choice((0.6, 0.75)) if rng.random() < 0.1 else rng.uniform(0.85, 1.0) for _ in alunos_turma]
+    for aula_id in aulas_turma:
+        for aluno_id, taxa in zip(alunos_turma, taxas):
+            yield (aula_id, aluno_id, 1 if rng.random() < taxa else 0)
+
+def gerar_banco(caminho, turmas, alunos, aulas, atividades, semente=SEMENTE_PADRAO, criar_login=True):
+    """
+    Cria um banco novo em 'caminho' com dados sintéticos reproduzíveis.
+
+    Args:
+        caminho (str): Arquivo do banco (não pode existir).
+        turmas (int): Número de turmas.
+        alunos (int): Total de alunos (divididos igualmente entre as turmas).
+        aulas (int): Total de aulas (divididas igualmente; cada aula tem
+            chamada de todos os alunos da turma).
+        atividades (int): Total de atividades.
+        semente (int): Semente do gerador aleatório.
+        criar_login (bool): Se True, cria o professor EMAIL_PROFESSOR.
+
+    Returns:
+        dict: Quantidade de linhas de cada tabela.
+    """
+    if os.path.exists(caminho):
+        raise FileExistsError(f"'{caminho}' já existe; escolha outro destino ou apague o arquivo.")
+    if turmas < 1:
+        raise ValueError("É preciso pelo menos uma turma.")
+
+    rng = random.Random(semente)
+    dias = _dias_letivos()
+    database.usar_banco(caminho)
+    database.criar_tabelas()
+    conn = database.conectar()
+    # O banco é descartável até a carga terminar: não precisa de fsync
+    conn.execute("PRAGMA synchronous = OFF")
+
+    with database.carga_em_massa(conn):
+        conn.executemany("INSERT INTO turmas (nome) VALUES (?)", ((nome,) for nome in _nomes_turmas(turmas)))
+        ids_turmas = [linha[0] for linha in conn.execute("SELECT id FROM turmas ORDER BY id")]
+
+        for turma_id, n_alunos, n_aulas, n_atividades in zip(ids_turmas, _dividir(alunos, turmas),
+                                                             _dividir(aulas, turmas), _dividir(atividades, turmas)):
+            alunos_turma = [conn.execute("INSERT INTO alunos (nome, turma_id) VALUES (?, ?)",
+                                         (f"{rng.choice(PRIMEIROS_NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+                                          turma_id)).lastrowid
+                            for _ in range(n_alunos)]
+            aulas_turma = [conn.execute("INSERT INTO aulas (turma_id, data, tema, descricao) VALUES (?, ?, ?, ?)",
+                                        (turma_id, data, rng.choice(TEMAS), "")).lastrowid
+                           for data in sorted(rng.choice(dias) for _ in range(n_aulas))]
+            conn.executemany("INSERT INTO atividades (turma_id, nome, data_entrega, descricao) VALUES (?, ?, ?, ?)",
+                             [(turma_id, f"{rng.choice(TIPOS_ATIVIDADE)} {i + 1}", rng.choice(dias), "")
+                              for i in range(n_atividades)])
+
+            # O gerador é consumido aos poucos pelo executemany (sem lista na memória)
+            conn.executemany("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (?, ?, ?)",
+                             _presencas(rng, aulas_turma, alunos_turma))
+
+    if criar_login:
+        with conn:
+            conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES (?, ?, ?)",
+                         ("Professor Sintético", EMAIL_PROFESSOR, database.hash_senha(SENHA_PROFESSOR)))
+    conn.execute("PRAGMA optimize")
+    conn.execute(f"PRAGMA synchronous = {database.PRAGMAS.get('synchronous', 'FULL')}")
+
+    return {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+            for tabela in ("turmas", "alunos", "aulas", "presencas", "atividades")}
+
+def ler_argumentos(descricao=__doc__):
+    """
+    Lê os tamanhos da linha de comando (também usado por 'benchmark_telas').
+
+    Returns:
+        argparse.ArgumentParser: O parser, com as opções de tamanho já incluídas.
+    """
+    parser = argparse.ArgumentParser(description=descricao.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    for nome, padrao in ESCALA_ESCOLA.items():
+        parser.add_argument(f"--{nome}", type=int, default=padrao, help=f"padrão: {padrao}")
+    parser.add_argument("--fator", type=float, default=1.0, help="multiplica todos os tamanhos")
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    return parser
+
+def escala_de(args):
+    """Aplica o --fator aos tamanhos lidos por 'ler_argumentos'."""
+    return {nome: max(1, round(getattr(args, nome) * args.fator)) for nome in ESCALA_ESCOLA}
+
+def main(argv=None):
+    """Gera o banco pedido na linha de comando. Retorna o código de saída."""
+    parser = ler_argumentos()
+    parser.add_argument("destino", help="arquivo .db a criar")
+    args = parser.parse_args(argv)
+    escala = escala_de(args)
+
+    inicio = time.perf_counter()
+    try:
+        totais = gerar_banco(args.destino, semente=args.semente, **escala)
+    except (FileExistsError, ValueError) as e:
+        print(f"Erro: {e}")
+        return 2
+    finally:
+        database.fechar_conexoes()
+
+    print(f"Banco '{args.destino}' gerado em {time.perf_counter() - inicio:.1f} s (semente {args.semente}):")
+    for tabela, total in totais.items():
+        print(f"  {tabela:<11}: {total:>9,}".replace(",", "."))
+    print(f"Login: {EMAIL_PROFESSOR} / {SENHA_PROFESSOR}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
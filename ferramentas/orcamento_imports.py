@@ -0,0 +1,78 @@
+"""
+Orçamento de tempo de import (ferramentas/orcamento_imports.py)
+
+Roda 'python -X importtime -c "import main"' em um processo novo e falha se:
+1. O tempo cumulativo do import de 'main' passar do orçamento; ou
+2. Algum módulo pesado que deveria ser carregado só sob demanda
+   (ex: tkcalendar, importado ao abrir o calendário) for importado na abertura.
+
+Como a primeira execução pode pagar a compilação dos .pyc, a medição é
+repetida algumas vezes e vale a MENOR.
+
+Uso: python -m ferramentas.orcamento_imports [orcamento_ms]
+"""
+
+import os
+import subprocess
+import sys
+
+# Orçamento padrão (ms) para o import cumulativo de 'main'
+ORCAMENTO_MS = 250
+
+# Módulos que não podem ser importados na abertura do app
+IMPORTS_ADIADOS = ("tkcalendar", "pandas")
+
+REPETICOES = 3
+
+def medir_imports(modulo="main"):
+    """
+    Importa 'modulo' em um processo novo com '-X importtime'.
+
+    Returns:
+        dict: {nome_do_modulo: tempo cumulativo em ms} de todos os módulos importados.
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                              cwd=raiz, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar '{modulo}':\n{processo.stderr}")
+
+    tempos = {}
+    # Formato de cada linha: "import time: <próprio µs> | <cumulativo µs> | <nome>"
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue # Cabeçalho
+        tempos[partes[2].strip()] = int(partes[1]) / 1000
+    return tempos
+
+def main(orcamento_ms=ORCAMENTO_MS):
+    """
+    Executa a verificação e retorna 0 se passou, 1 se o orçamento foi estourado.
+    """
+    medicoes = [medir_imports() for _ in range(REPETICOES)]
+    tempos = min(medicoes, key=lambda t: t.get("main", 0))
+    total = tempos.get("main", 0)
+
+    print(f"Import de 'main': {total:.1f} ms (orçamento: {orcamento_ms} ms, menor de {REPETICOES})")
+    maiores = sorted(((ms, nome) for nome, ms in tempos.items() if "." not in nome and nome != "main"),
+                     reverse=True)[:8]
+    for ms, nome in maiores:
+        print(f"  {nome:<25} {ms:8.1f} ms")
+
+    falhou = False
+    adiados = [nome for nome in IMPORTS_ADIADOS if nome in tempos]
+    if adiados:
+        print(f"FALHOU: importados na abertura (deveriam ser sob demanda): {', '.join(adiados)}")
+        falhou = True
+    if total > orcamento_ms:
+        print(f"FALHOU: {total:.1f} ms > {orcamento_ms} ms.")
+        falhou = True
+    if not falhou:
+        print("OK")
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main(*(float(arg) for arg in sys.argv[1:2])))
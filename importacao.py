@@ -0,0 +1,201 @@
+"""
+Arquivo de Importação de Alunos (importacao.py)
+
+Este módulo importa uma lista de alunos (CSV com as colunas 'nome' e
+'turma') de uma vez, para o início do ano letivo, em vez de cadastrar
+aluno por aluno na tela de Cadastro de Aluno.
+
+- O arquivo é lido em streaming (linha a linha, em lotes de TAMANHO_LOTE):
+  a memória usada não cresce com o tamanho do arquivo.
+- Turmas que ainda não existem são criadas (pelo nome).
+- Alunos que já existem na turma (mesmo nome) são ignorados, inclusive os
+  repetidos dentro do próprio arquivo.
+- Cada lote é gravado com UM 'executemany', e tudo roda em UMA transação:
+  se o banco falhar no meio, nada é gravado.
+- Linhas inválidas (sem nome, sem turma) não interrompem a importação: são
+  contadas e listadas no resultado, com o número da linha.
+
+Uso (sem interface): python importacao.py alunos.csv
+"""
+
+import csv
+import sqlite3
+import sys
+import time
+from database import conectar, criar_tabelas
+
+# Linhas gravadas por 'executemany'
+TAMANHO_LOTE = 1000
+
+# Quantos erros são guardados com detalhes (os demais só são contados)
+MAX_ERROS_DETALHADOS = 100
+
+# Só insere o aluno se ainda não houver um com o mesmo nome na turma
+# (usa o índice idx_alunos_turma (turma_id, nome))
+SQL_INSERIR_ALUNO = """
+    INSERT INTO alunos (nome, turma_id)
+    SELECT ?1, ?2
+    WHERE NOT EXISTS (SELECT 1 FROM alunos WHERE turma_id = ?2 AND nome = ?1)
+"""
+
+class ResultadoImportacao:
+    """
+    Resumo de uma importação.
+
+    Attributes:
+        lidas (int): Linhas de dados lidas (sem contar o cabeçalho).
+        inseridas (int): Alunos gravados.
+        duplicadas (int): Linhas ignoradas porque o aluno já existia na turma.
+        turmas_criadas (list): Nomes das turmas criadas.
+        erros (list): Tuplas (numero_da_linha, mensagem), até MAX_ERROS_DETALHADOS.
+        total_erros (int): Quantidade total de linhas inválidas.
+        segundos (float): Duração da importação.
+    """
+
+    def __init__(self):
+        self.lidas = 0
+        self.inseridas = 0
+        self.duplicadas = 0
+        self.turmas_criadas = []
+        self.erros = []
+        self.total_erros = 0
+        self.segundos = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        """Linhas lidas por segundo."""
+        return self.lidas / self.segundos if self.segundos > 0 else 0.0
+
+    def registrar_erro(self, linha, mensagem):
+        """Conta uma linha inválida (e guarda os detalhes das primeiras)."""
+        self.total_erros += 1
+        if len(self.erros) < MAX_ERROS_DETALHADOS:
+            self.erros.append((linha, mensagem))
+
+    def resumo(self):
+        """
+        Returns:
+            str: Uma linha com os totais (ex: para a barra de status).
+        """
+        texto = (f"{self.inseridas} alunos importados, {self.duplicadas} já existentes, "
+                 f"{len(self.turmas_criadas)} turmas criadas, {self.total_erros} linhas com erro "
+                 f"({self.lidas} linhas em {self.segundos:.2f} s, {self.linhas_por_segundo:,.0f} linhas/s)")
+        return texto
+
+def _detectar_dialeto(arquivo):
+    """Descobre o separador (',' ';' ou tab) pelo início do arquivo e volta ao começo."""
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    try:
+        return csv.Sniffer().sniff(amostra, delimiters=",;\t")
+    except csv.Error:
+        return csv.excel # Uma coluna só ou arquivo vazio: deixa a validação apontar o erro
+
+def _mapa_turmas(conn):
+    """Retorna {nome: id} das turmas existentes (no caso de nomes repetidos, a mais antiga)."""
+    return {nome: turma_id for turma_id, nome in
+            conn.execute("SELECT id, nome FROM turmas ORDER BY id DESC")}
+
+def _gravar_lote(conn, lote, resultado):
+    """Grava um lote de (nome, turma_id) e atualiza os totais."""
+    cursor = conn.executemany(SQL_INSERIR_ALUNO, lote)
+    resultado.inseridas += cursor.rowcount
+    resultado.duplicadas += len(lote) - cursor.rowcount
+
+def importar_alunos(conn, arquivo, tamanho_lote=TAMANHO_LOTE):
+    """
+    Importa alunos de um CSV já aberto (modo texto, newline="").
+
+    O cabeçalho é opcional: se a primeira linha tiver as colunas 'nome' e
+    'turma' (em qualquer ordem), ela define as posições; senão, a ordem é
+    nome, turma.
+
+    Args:
+        conn (sqlite3.Connection): Conexão usada (a transação é aberta e
+            confirmada aqui; em caso de erro do banco, tudo é desfeito).
+        arquivo: Arquivo (ou qualquer iterável de linhas com .read/.seek).
+        tamanho_lote (int): Linhas por 'executemany'.
+
+    Returns:
+        ResultadoImportacao: Os totais e os erros por linha.
+
+    Raises:
+        sqlite3.Error: Se a gravação falhar (nada é gravado).
+    """
+    inicio = time.perf_counter()
+    resultado = ResultadoImportacao()
+    leitor = csv.reader(arquivo, _detectar_dialeto(arquivo))
+    col_nome, col_turma = 0, 1
+
+    with conn:
+        turmas = _mapa_turmas(conn)
+        lote = []
+        for linha in leitor:
+            numero = leitor.line_num
+            if not linha or not any(campo.strip() for campo in linha):
+                continue # Linha em branco
+            if numero == 1:
+                cabecalho = [campo.strip().lower() for campo in linha]
+                if "nome" in cabecalho and "turma" in cabecalho:
+                    col_nome, col_turma = cabecalho.index("nome"), cabecalho.index("turma")
+                    continue
+
+            resultado.lidas += 1
+            nome = linha[col_nome].strip() if col_nome < len(linha) else ""
+            turma = linha[col_turma].strip() if col_turma < len(linha) else ""
+            if not nome:
+                resultado.registrar_erro(numero, "nome do aluno vazio")
+                continue
+            if not turma:
+                resultado.registrar_erro(numero, f"turma vazia para '{nome}'")
+                continue
+
+            turma_id = turmas.get(turma)
+            if turma_id is None:
+                turma_id = conn.execute("INSERT INTO turmas (nome) VALUES (?)", (turma,)).lastrowid
+                turmas[turma] = turma_id
+                resultado.turmas_criadas.append(turma)
+
+            lote.append((nome, turma_id))
+            if len(lote) >= tamanho_lote:
+                _gravar_lote(conn, lote, resultado)
+                lote = []
+        if lote:
+            _gravar_lote(conn, lote, resultado)
+
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+def importar_arquivo(caminho, conn=None, tamanho_lote=TAMANHO_LOTE):
+    """
+    Abre o CSV em 'caminho' (UTF-8, com ou sem BOM) e importa os alunos.
+
+    Args:
+        caminho (str): Caminho do arquivo CSV.
+        conn (sqlite3.Connection): Conexão usada (padrão: conectar()).
+
+    Returns:
+        ResultadoImportacao: Os totais e os erros por linha.
+
+    Raises:
+        OSError, UnicodeDecodeError: Se o arquivo não puder ser lido.
+        sqlite3.Error: Se a gravação falhar (nada é gravado).
+    """
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        return importar_alunos(conn or conectar(), arquivo, tamanho_lote)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Uso: python importacao.py alunos.csv")
+        sys.exit(2)
+    criar_tabelas() # Garante as migrações (o índice usado na busca de duplicados)
+    try:
+        resultado = importar_arquivo(sys.argv[1])
+    except (OSError, UnicodeDecodeError, sqlite3.Error) as e:
+        print(f"Erro na importação (nada foi gravado): {e}")
+        sys.exit(1)
+    print(resultado.resumo())
+    for numero, mensagem in resultado.erros:
+        print(f"  Linha {numero}: {mensagem}")
+    if resultado.total_erros > len(resultado.erros):
+        print(f"  ... e mais {resultado.total_erros - len(resultado.erros)} linhas com erro.")
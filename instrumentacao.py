@@ -0,0 +1,351 @@
+"""
+Instrumentação das consultas ao banco (instrumentacao.py)
+
+Desligada por padrão. Quando ativada (antes da primeira conexão), as
+conexões abertas por 'database.conectar' passam a ser uma
+'ConexaoInstrumentada', que mede cada instrução SQL executada e agrega:
+- por SQL normalizado (literais trocados por '?', espaços colapsados);
+- por método de tela que originou a consulta (ex: "Relatorio.carregar_aulas"),
+  inclusive quando ela roda no executor do banco.
+
+O tempo de uma instrução inclui o execute E a leitura das linhas (fetch),
+e o commit/rollback do 'with conn' aparece como "COMMIT"/"ROLLBACK".
+Instruções acima de LIMITE_LENTA_MS vão para o log de consultas lentas
+(só o SQL normalizado: os parâmetros, como nomes de alunos, não são gravados).
+
+Para ativar no app: 'python main.py --instrumentar' ou a variável de ambiente
+SAGE_INSTRUMENTAR=1. Com o app aberto, F12 mostra o painel com as estatísticas.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+
+import database
+
+# Instruções mais lentas que isso (ms) vão para o log de consultas lentas
+LIMITE_LENTA_MS = 100
+
+# Log de consultas lentas (na pasta do programa, ao lado do banco)
+ARQUIVO_LOG = "consultas_lentas.log"
+
+# Consultas lentas mantidas na memória (para o painel)
+MAX_LENTAS = 50
+
+# Tamanho máximo do SQL normalizado guardado (SQL montado muito longo, como
+# um IN (...) com muitos valores, não vira uma chave enorme por variante)
+TAMANHO_MAX_SQL = 300
+
+# Módulos que não contam como "quem chamou" (o chamador é a tela acima deles)
+MODULOS_INTERNOS = ("instrumentacao", "database", "executor_banco", "contextlib", "repositorio")
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_ESPACOS = re.compile(r"\s+")
+
+def normalizar_sql(sql):
+    """
+    Normaliza uma instrução para agrupar execuções da mesma consulta.
+
+    Exemplo:
+        "SELECT * FROM aulas  WHERE id = 42" -> "SELECT * FROM aulas WHERE id = ?"
+    """
+    return _ESPACOS.sub(" ", _LITERAIS.sub("?", sql)).strip()
+
+def _chamador():
+    """
+    Retorna o método (ou função) fora da camada de banco que executou a
+    consulta, ex: "Visualizacao.carregar_alunos_otimizado". Funções locais
+    e lambdas contam como o método que as definiu.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if modulo.split(".")[0] not in MODULOS_INTERNOS:
+            nome = getattr(frame.f_code, "co_qualname", frame.f_code.co_name).split(".<locals>")[0]
+            if nome == "<module>":
+                return modulo
+            return nome if "." in nome else f"{modulo}.{nome}"
+        frame = frame.f_back
+    return "?"
+
+class Agregado:
+    """Contagem, tempo total e tempo máximo (segundos) de um grupo de instruções."""
+
+    __slots__ = ("contagem", "total", "maximo")
+
+    def __init__(self):
+        self.contagem = 0
+        self.total = 0.0
+        self.maximo = 0.0
+
+    def somar(self, segundos):
+        self.contagem += 1
+        self.total += segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+class EstatisticasConsultas:
+    """
+    Agrega as medidas das instruções (usada pela thread do Tk e pelo
+    executor do banco ao mesmo tempo, por isso o lock).
+    """
+
+    def __init__(self, limite_lenta_ms=LIMITE_LENTA_MS, arquivo_log=ARQUIVO_LOG):
+        """
+        Args:
+            limite_lenta_ms (float): A partir de quantos ms uma instrução é lenta.
+            arquivo_log (str): Arquivo do log de consultas lentas (None = não grava).
+        """
+        self.limite_lenta_ms = limite_lenta_ms
+        self.arquivo_log = arquivo_log
+        self._lock = threading.Lock()
+        self._normalizados = {} # SQL original -> normalizado (o mesmo texto se repete muito)
+        self.zerar()
+
+    def zerar(self):
+        """Descarta todas as medidas."""
+        with self._lock:
+            self.por_sql = {}
+            self.por_chamador = {}
+            self.lentas = deque(maxlen=MAX_LENTAS)
+            self.desde = time.time()
+
+    def registrar(self, sql, chamador, segundos):
+        """
+        Registra uma instrução executada.
+
+        Args:
+            sql (str): O SQL como foi executado.
+            chamador (str): Método que originou a instrução.
+            segundos (float): Duração (execute + fetch).
+        """
+        normalizado = self._normalizados.get(sql)
+        if normalizado is None:
+            normalizado = normalizar_sql(sql)[:TAMANHO_MAX_SQL]
+            if len(self._normalizados) < 2000: # SQL montado com valores não pode crescer sem limite
+                self._normalizados[sql] = normalizado
+        with self._lock:
+            for tabela, chave in ((self.por_sql, normalizado), (self.por_chamador, chamador)):
+                agregado = tabela.get(chave)
+                if agregado is None:
+                    agregado = tabela[chave] = Agregado()
+                agregado.somar(segundos)
+            lenta = None
+            if segundos * 1000 >= self.limite_lenta_ms:
+                lenta = (time.strftime("%Y-%m-%d %H:%M:%S"), segundos, chamador, normalizado)
+                self.lentas.append(lenta)
+        if lenta:
+            self._gravar_lenta(lenta)
+
+    def _gravar_lenta(self, registro):
+        """Acrescenta uma consulta lenta ao arquivo de log."""
+        quando, segundos, chamador, sql = registro
+        linha = f"{quando}\t{segundos * 1000:.1f} ms\t{chamador}\t{sql}\n"
+        print(f"Consulta lenta ({segundos * 1000:.1f} ms) em {chamador}: {sql[:120]}")
+        if self.arquivo_log:
+            try:
+                with open(self.arquivo_log, "a", encoding="utf-8") as arquivo:
+                    arquivo.write(linha)
+            except OSError as e:
+                print(f"Erro ao gravar o log de consultas lentas: {e}")
+
+    def mais_custosas(self, por="sql", limite=15):
+        """
+        Returns:
+            list: Tuplas (chave, Agregado) ordenadas pelo tempo total, da maior para a menor.
+        """
+        with self._lock:
+            tabela = self.por_sql if por == "sql" else self.por_chamador
+            itens = [(chave, agregado) for chave, agregado in tabela.items()]
+        itens.sort(key=lambda item: item[1].total, reverse=True)
+        return itens[:limite]
+
+    def relatorio(self, limite=15):
+        """
+        Monta o relatório em texto (mostrado no painel e impresso no console).
+
+        Returns:
+            str: O relatório.
+        """
+        with self._lock:
+            instrucoes = sum(a.contagem for a in self.por_sql.values())
+            total = sum(a.total for a in self.por_sql.values())
+            lentas = list(self.lentas)
+        linhas = [
+            f"Desde {time.strftime('%d/%m/%Y %H:%M:%S', time.localtime(self.desde))}: "
+            f"{instrucoes} instrução(ões), {total * 1000:.1f} ms no banco.",
+            f"Consultas lentas: >= {self.limite_lenta_ms} ms (log: {self.arquivo_log or 'desligado'})",
+            "",
+            "--- Por tela/método (maior tempo total) ---",
+            f"{'qtd':>6} {'total ms':>10} {'máx ms':>8}  método",
+        ]
+        for chave, a in self.mais_custosas("chamador", limite):
+            linhas.append(f"{a.contagem:6d} {a.total * 1000:10.1f} {a.maximo * 1000:8.1f}  {chave}")
+        linhas += ["", "--- Por SQL (maior tempo total) ---", f"{'qtd':>6} {'total ms':>10} {'máx ms':>8}  sql"]
+        for chave, a in self.mais_custosas("sql", limite):
+            linhas.append(f"{a.contagem:6d} {a.total * 1000:10.1f} {a.maximo * 1000:8.1f}  {chave[:160]}")
+        linhas += ["", f"--- Últimas consultas lentas ({len(lentas)}) ---"]
+        for quando, segundos, chamador, sql in reversed(lentas):
+            linhas.append(f"{quando}  {segundos * 1000:8.1f} ms  {chamador}  {sql[:120]}")
+        return "\n".join(linhas)
+
+# Instância única usada pelas conexões instrumentadas
+estatisticas = EstatisticasConsultas()
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Cursor que mede cada instrução: o tempo do execute mais o das leituras
+    seguintes é somado e registrado quando a instrução termina (fim das
+    linhas, novo execute, close ou quando o cursor é descartado).
+    """
+
+    _medida = None # [sql, chamador, segundos] da instrução em andamento
+
+    def _iniciar(self, sql, inicio):
+        self._finalizar()
+        chamador = _chamador()
+        self._medida = [sql, chamador, time.perf_counter() - inicio]
+        if isinstance(self.connection, ConexaoInstrumentada):
+            self.connection.ultimo_chamador = chamador
+
+    def _somar(self, inicio):
+        if self._medida is not None:
+            self._medida[2] += time.perf_counter() - inicio
+
+    def _finalizar(self):
+        medida, self._medida = self._medida, None
+        if medida is not None:
+            estatisticas.registrar(*medida)
+
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._iniciar(sql, inicio)
+
+    def executemany(self, sql, parametros):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            self._iniciar(sql, inicio)
+            self._finalizar()
+
+    def __next__(self):
+        inicio = time.perf_counter()
+        try:
+            linha = super().__next__()
+        except StopIteration:
+            self._somar(inicio)
+            self._finalizar()
+            raise
+        self._somar(inicio)
+        return linha
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        linha = super().fetchone()
+        self._somar(inicio)
+        if linha is None:
+            self._finalizar()
+        return linha
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        linhas = super().fetchmany(*args, **kwargs)
+        self._somar(inicio)
+        if not linhas:
+            self._finalizar()
+        return linhas
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        linhas = super().fetchall()
+        self._somar(inicio)
+        self._finalizar()
+        return linhas
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+    def __del__(self):
+        self._finalizar()
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """
+    Conexão cujos cursores são instrumentados. O 'conn.execute' do sqlite3
+    não passa por 'cursor()', por isso os atalhos são refeitos aqui.
+    """
+
+    # Quem executou a última instrução: o commit/rollback é atribuído a ele
+    # (no executor, o 'with conn' fica no laço da thread, não na tela)
+    ultimo_chamador = "?"
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+    def _medir_fim_de_transacao(self, nome, funcao, *args):
+        if not self.in_transaction:
+            return funcao(*args)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args)
+        finally:
+            estatisticas.registrar(nome, self.ultimo_chamador, time.perf_counter() - inicio)
+
+    def commit(self):
+        return self._medir_fim_de_transacao("COMMIT", super().commit)
+
+    def rollback(self):
+        return self._medir_fim_de_transacao("ROLLBACK", super().rollback)
+
+    def __exit__(self, tipo, valor, rastro):
+        # O 'with conn' faz commit/rollback em C, sem chamar os métodos acima
+        nome = "COMMIT" if tipo is None else "ROLLBACK"
+        return self._medir_fim_de_transacao(nome, super().__exit__, tipo, valor, rastro)
+
+def ativa():
+    """Retorna True se as conexões novas estão sendo instrumentadas."""
+    return database.FABRICA_CONEXAO is ConexaoInstrumentada
+
+def pedida(argv=None, ambiente=None):
+    """
+    Retorna True se a instrumentação foi pedida na linha de comando
+    ('--instrumentar') ou na variável de ambiente SAGE_INSTRUMENTAR.
+    """
+    argv = sys.argv if argv is None else argv
+    ambiente = os.environ if ambiente is None else ambiente
+    return "--instrumentar" in argv or ambiente.get("SAGE_INSTRUMENTAR", "") not in ("", "0")
+
+def ativar(limite_lenta_ms=None, arquivo_log=ARQUIVO_LOG):
+    """
+    Passa a instrumentar as conexões abertas DEPOIS desta chamada (chame
+    antes de 'criar_tabelas' para pegar todas).
+
+    Args:
+        limite_lenta_ms (float): Limite das consultas lentas (padrão:
+            SAGE_LIMITE_LENTA_MS ou LIMITE_LENTA_MS).
+        arquivo_log (str): Arquivo do log de consultas lentas (None = só no console).
+    """
+    if limite_lenta_ms is None:
+        limite_lenta_ms = float(os.environ.get("SAGE_LIMITE_LENTA_MS", LIMITE_LENTA_MS))
+    estatisticas.limite_lenta_ms = limite_lenta_ms
+    estatisticas.arquivo_log = arquivo_log
+    database.configurar_fabrica_conexao(ConexaoInstrumentada)
+    print(f"Instrumentação de consultas ativada (lentas: >= {limite_lenta_ms:g} ms). F12 abre o painel.")
+
+def desativar():
+    """Volta a abrir conexões comuns (as já abertas continuam instrumentadas)."""
+    database.configurar_fabrica_conexao(sqlite3.Connection)
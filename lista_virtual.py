@@ -0,0 +1,257 @@
+"""
+Arquivo da Lista Virtual (lista_virtual.py)
+
+Este módulo define a classe 'ListaVirtual', uma lista rolável que cria
+widgets APENAS para as linhas visíveis (mais uma pequena margem) e os
+reaproveita durante a rolagem.
+
+Com o CTkScrollableFrame, cada aula/aluno/presença virava um conjunto de
+widgets (milhares em turmas com histórico longo) e o Tk levava segundos para
+criar e destruir tudo a cada atualização. Aqui o custo depende só da altura
+da tela, não do tamanho do histórico.
+"""
+
+import customtkinter as ctk
+from bisect import bisect_right
+
+class ListaVirtual(ctk.CTkFrame):
+    """
+    Lista rolável virtualizada com linhas de altura fixa por tipo.
+
+    Cada item da lista é uma tupla (tipo, dados). Para cada tipo é informado:
+        - altura (int): altura da linha em pixels;
+        - criar(parent) -> widget: cria um widget de linha vazio;
+        - preencher(widget, dados): mostra 'dados' em um widget já criado.
+
+    Os widgets são criados sob demanda e reciclados: ao rolar, a linha que
+    sai da tela é preenchida com os dados da linha que entra.
+
+    Opcionalmente, os itens podem ter uma CHAVE (ex: o id da aula), para que
+    uma edição/deleção altere só o item afetado (ver 'indice' e 'bloco') em
+    vez de remontar a lista inteira.
+    """
+
+    PASSO_ROLAGEM = 30 # Pixels por "unidade" de rolagem
+
+    def __init__(self, parent, tipos, overscan=3, mensagem_vazia="", chave=None, **kwargs):
+        """
+        Inicializa a lista virtual.
+
+        Args:
+            parent: Widget pai.
+            tipos (dict): {tipo: (altura, criar, preencher)}.
+            overscan (int): Linhas extras renderizadas acima/abaixo da área visível.
+            mensagem_vazia (str): Texto exibido quando a lista não tem itens.
+            chave (callable): chave(tipo, dados) -> chave do item, ou None se o
+                item não tiver chave (ex: linhas de detalhe).
+            **kwargs: Repassados ao CTkFrame (ex: fg_color, corner_radius).
+        """
+        super().__init__(parent, **kwargs)
+        self.tipos = tipos
+        self.overscan = overscan
+        self.chave = chave
+
+        self._itens = []
+        self._indices = {} # chave -> índice do item (se 'chave' foi informada)
+        self._offsets = [0] # _offsets[i] = topo do item i; o último é a altura total
+        self._topo = 0 # Deslocamento atual da rolagem (pixels)
+        self._visiveis = {} # índice -> widget renderizado
+        self._livres = {tipo: [] for tipo in tipos} # Widgets disponíveis para reuso
+        self.widgets_criados = 0 # Quantidade total de widgets de linha já criados
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._rolar)
+        self.scrollbar.pack(side="right", fill="y", padx=(0, 3), pady=5)
+
+        # Área visível (os widgets de linha são posicionados com .place)
+        self.area = ctk.CTkFrame(self, fg_color="transparent")
+        self.area.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+        self.area.bind("<Configure>", lambda e: self._renderizar())
+
+        self.mensagem = ctk.CTkLabel(self.area, text=mensagem_vazia, text_color="#555555")
+
+        # A roda do mouse é tratada na janela e filtrada pela posição do ponteiro
+        janela = self.winfo_toplevel()
+        for sequencia in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            janela.bind(sequencia, self._roda_mouse, add="+")
+
+    # --- API pública ---
+
+    def definir_itens(self, itens, mensagem_vazia=None):
+        """
+        Substitui todos os itens da lista e volta para o topo.
+
+        Args:
+            itens (list): Lista de tuplas (tipo, dados).
+            mensagem_vazia (str): Texto a exibir se 'itens' estiver vazia.
+        """
+        self._itens = list(itens)
+        self._topo = 0
+        if mensagem_vazia is not None:
+            self.mensagem.configure(text=mensagem_vazia)
+        self._recalcular()
+
+    def itens(self):
+        """Retorna a lista de itens atual (não modificar diretamente)."""
+        return self._itens
+
+    def indice(self, chave):
+        """Retorna o índice do item com a chave informada, ou None."""
+        return self._indices.get(chave)
+
+    def bloco(self, chave, tipos_filhos):
+        """
+        Retorna o intervalo [inicio, fim) formado pelo item 'chave' e pelos
+        itens dos tipos 'tipos_filhos' logo abaixo dele (ex: uma aula e as
+        suas linhas de presença), ou None se a chave não estiver na lista.
+        """
+        inicio = self._indices.get(chave)
+        if inicio is None:
+            return None
+        fim = inicio + 1
+        while fim < len(self._itens) and self._itens[fim][0] in tipos_filhos:
+            fim += 1
+        return inicio, fim
+
+    def atualizar_item(self, indice, item):
+        """
+        Substitui um único item. Se ele estiver visível e mantiver o mesmo
+        tipo, apenas o seu widget é preenchido novamente.
+        """
+        antigo = self._itens[indice]
+        self._itens[indice] = item
+        if self.chave is not None:
+            chave_antiga, chave_nova = self.chave(*antigo), self.chave(*item)
+            if chave_antiga != chave_nova:
+                self._indices.pop(chave_antiga, None)
+                if chave_nova is not None:
+                    self._indices[chave_nova] = indice
+        if antigo[0] != item[0]:
+            self._recalcular(manter_posicao=True)
+            return
+        widget = self._visiveis.get(indice)
+        if widget is not None:
+            self.tipos[item[0]][2](widget, item[1])
+
+    def inserir_itens(self, indice, itens):
+        """Insere itens a partir da posição 'indice', mantendo a rolagem."""
+        self._itens[indice:indice] = itens
+        self._recalcular(manter_posicao=True)
+
+    def remover_itens(self, inicio, fim):
+        """Remove os itens no intervalo [inicio, fim), mantendo a rolagem."""
+        del self._itens[inicio:fim]
+        self._recalcular(manter_posicao=True)
+
+    def limpar(self, mensagem_vazia=None):
+        """Remove todos os itens (e mostra a mensagem de lista vazia)."""
+        self.definir_itens([], mensagem_vazia)
+
+    # --- Layout e renderização ---
+
+    def _recalcular(self, manter_posicao=False):
+        """Recalcula as posições das linhas e renderiza tudo de novo."""
+        offsets = [0]
+        for tipo, _ in self._itens:
+            offsets.append(offsets[-1] + self.tipos[tipo][0])
+        self._offsets = offsets
+        if self.chave is not None:
+            self._indices = {}
+            for indice, (tipo, dados) in enumerate(self._itens):
+                chave = self.chave(tipo, dados)
+                if chave is not None:
+                    self._indices[chave] = indice
+        if not manter_posicao:
+            self._topo = 0
+
+        # Os índices mudaram: devolve todos os widgets ao pool antes de renderizar
+        for indice in list(self._visiveis):
+            self._liberar(indice)
+
+        if self._itens:
+            self.mensagem.place_forget()
+        else:
+            self.mensagem.place(relx=0.5, y=10, anchor="n")
+        self._renderizar()
+
+    def _liberar(self, indice):
+        """Esconde o widget da linha 'indice' e o devolve ao pool do seu tipo."""
+        widget = self._visiveis.pop(indice)
+        widget.place_forget()
+        self._livres[widget.tipo_linha].append(widget)
+
+    def _obter_widget(self, tipo):
+        """Retorna um widget livre do tipo pedido (criando um novo se preciso)."""
+        if self._livres[tipo]:
+            return self._livres[tipo].pop()
+        altura, criar, _ = self.tipos[tipo]
+        widget = criar(self.area)
+        widget.configure(height=altura)
+        widget.tipo_linha = tipo
+        self.widgets_criados += 1
+        return widget
+
+    def _altura_area(self):
+        """
+        Altura da área visível em unidades do CustomTkinter (sem a escala de DPI),
+        as mesmas usadas nas alturas das linhas e no .place().
+        """
+        return max(self.area.winfo_height() / self._get_widget_scaling(), 1)
+
+    def _renderizar(self):
+        """Posiciona apenas as linhas que aparecem na área visível."""
+        altura_area = self._altura_area()
+        total = self._offsets[-1]
+        self._topo = max(0, min(self._topo, total - altura_area))
+
+        n = len(self._itens)
+        primeiro = max(0, bisect_right(self._offsets, self._topo) - 1 - self.overscan)
+        ultimo = min(n, bisect_right(self._offsets, self._topo + altura_area) + self.overscan)
+
+        # Libera as linhas que saíram da faixa visível
+        for indice in [i for i in self._visiveis if i < primeiro or i >= ultimo]:
+            self._liberar(indice)
+
+        for indice in range(primeiro, ultimo):
+            widget = self._visiveis.get(indice)
+            if widget is None:
+                tipo, dados = self._itens[indice]
+                widget = self._obter_widget(tipo)
+                self.tipos[tipo][2](widget, dados)
+                self._visiveis[indice] = widget
+            widget.place(x=0, y=int(self._offsets[indice] - self._topo), relwidth=1)
+
+        if total <= altura_area:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self._topo / total, (self._topo + altura_area) / total)
+
+    # --- Rolagem ---
+
+    def _rolar(self, *args):
+        """Comando da scrollbar: ('moveto', fração) ou ('scroll', n, 'units'/'pages')."""
+        altura_area = self._altura_area()
+        if args[0] == "moveto":
+            self._topo = float(args[1]) * self._offsets[-1]
+        elif args[0] == "scroll":
+            passo = altura_area if args[2] == "pages" else self.PASSO_ROLAGEM
+            self._topo += float(args[1]) * passo
+        self._renderizar()
+
+    def _roda_mouse(self, event):
+        """Rola a lista quando a roda do mouse é usada sobre ela."""
+        if not self.winfo_ismapped():
+            return
+        widget = self.winfo_containing(event.x_root, event.y_root)
+        caminho = str(widget) if widget is not None else ""
+        if caminho != str(self) and not caminho.startswith(str(self) + "."):
+            return
+        if caminho.startswith(str(self.scrollbar)):
+            return # A própria scrollbar já trata a roda do mouse
+        if event.num == 4:
+            unidades = -3
+        elif event.num == 5:
+            unidades = 3
+        else:
+            # Windows envia múltiplos de 120; macOS envia valores pequenos
+            unidades = -int(event.delta / 120 * 3) if abs(event.delta) >= 120 else -event.delta
+        self._rolar("scroll", unidades, "units")
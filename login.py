@@ -7,7 +7,9 @@ para a tela de cadastro.
 """
 
 import customtkinter as ctk
-from database import conectar, verificar_senha
+from database import conferir_senha
+from repositorio.usuarios import buscar_credenciais, atualizar_hash_senha
+from executor_banco import executar, executar_senha
 import re
 import sqlite3
 
@@ -114,28 +116,53 @@ class Login(ctk.CTkFrame):
             self.status.configure(text="E-mail inválido.", text_color="red")
             return
         
-        try:
-            # Conecta ao DB usando 'with' para segurança
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT senha FROM usuarios WHERE email = ?", (email,))
-                result = cursor.fetchone() # Pega um resultado (ou None)
-            
-            # Verifica se o usuário existe (result != None) e se a senha bate
-            if result and verificar_senha(senha, result[0]):
-                self.status.configure(text="Login bem-sucedido!", text_color="green")
-                # Limpa os campos SÓ DEPOIS do login bem-sucedido
-                self.email.delete(0, 'end')
-                self.senha.delete(0, 'end')
-                # Chama o controlador para mudar de tela após 1 segundo
-                self.after(1000, lambda: self.controlador.mostrar_tela("MenuPrincipal"))
-            else:
-                self.status.configure(text="Email ou senha incorretos.", text_color="red")
-        
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro no banco de dados: {e}", text_color="red")
-        except Exception as e:
-            self.status.configure(text=f"Erro: {e}", text_color="red")
+        # Só a leitura do hash vai ao executor do banco. A verificação bcrypt,
+        # lenta de propósito, roda no executor de senhas: a janela continua
+        # respondendo e as consultas das outras telas não esperam por ela.
+        self.btn_login.configure(state="disabled")
+        self.status.configure(text="Verificando...", text_color="#555555")
+        executar(lambda conn: buscar_credenciais(conn, email),
+                 ao_concluir=lambda credenciais: self._conferir_senha(credenciais, senha),
+                 ao_falhar=self._erro_no_login, dono=self)
+
+    def _conferir_senha(self, credenciais, senha):
+        """Chamado (na thread do Tk) com o hash guardado: envia a verificação bcrypt."""
+        if credenciais is None: # E-mail não cadastrado
+            self._login_verificado(False)
+            return
+        usuario_id, senha_hash = credenciais
+        executar_senha(lambda: conferir_senha(senha, senha_hash),
+                       ao_concluir=lambda resultado: self._senha_conferida(usuario_id, *resultado),
+                       ao_falhar=self._erro_no_login, dono=self)
+
+    def _senha_conferida(self, usuario_id, correta, novo_hash):
+        """Chamado (na thread do Tk) com o resultado da verificação bcrypt."""
+        if novo_hash is not None:
+            # Hash com outro custo bcrypt: grava o refeito (o login não espera por isso)
+            executar(lambda conn: atualizar_hash_senha(conn, usuario_id, novo_hash))
+            print(f"Senha do usuário {usuario_id} refeita com o custo bcrypt atual.")
+        self._login_verificado(correta)
+
+    def _login_verificado(self, autenticado):
+        """Chamado (na thread do Tk) com o resultado da verificação."""
+        self.btn_login.configure(state="normal")
+        if autenticado:
+            self.status.configure(text="Login bem-sucedido!", text_color="green")
+            # Limpa os campos SÓ DEPOIS do login bem-sucedido
+            self.email.delete(0, 'end')
+            self.senha.delete(0, 'end')
+            # Chama o controlador para mudar de tela após 1 segundo
+            self.after(1000, lambda: self.controlador.mostrar_tela("MenuPrincipal"))
+        else:
+            self.status.configure(text="Email ou senha incorretos.", text_color="red")
+
+    def _erro_no_login(self, erro):
+        """Chamado (na thread do Tk) se a verificação falhar com um erro."""
+        self.btn_login.configure(state="normal")
+        if isinstance(erro, sqlite3.Error):
+            self.status.configure(text=f"Erro no banco de dados: {erro}", text_color="red")
+        else:
+            self.status.configure(text=f"Erro: {erro}", text_color="red")
 
     def abrir_cadastro(self):
         """
@@ -2,8 +2,15 @@
 Arquivo Principal (main.py) - SAGE (Sistema Acadêmico de Gestão Educacional)
 """
 
+import os
+import time
+_INICIO = time.perf_counter() # Marca do início do processo (para o relatório de inicialização)
+
 import customtkinter as ctk
-from database import criar_tabelas
+from database import criar_tabelas, fechar_conexoes, versao_dados, configurar_custo_bcrypt, usar_perfil_local
+from executor_banco import executor, executor_senhas
+import instrumentacao
+from dialogos import JanelaConsultas
 
 # Importa todas as classes de tela dos seus respectivos arquivos .py
 from login import Login
@@ -17,56 +24,207 @@ from relatorio import Relatorio
 from chatbot import Chatbot
 from atividades import Atividades
 
+_FIM_IMPORTS = time.perf_counter()
+
 class Aplicativo(ctk.CTk):
     """
     Classe principal da aplicação (Controlador).
+
+    As telas são criadas sob demanda: cada uma só é construída na primeira
+    vez em que é mostrada (ver 'obter_tela'). Assim, abrir o app só custa a
+    tela de Login; as demais podem ser pré-construídas quando a janela
+    estiver ociosa (ver 'pre_aquecer').
     """
-    
+
+    # Tela inicial e atraso (ms) antes de começar a pré-construir as outras.
+    # Use PRE_AQUECER = False para construir cada tela só quando for aberta.
+    TELA_INICIAL = "Login"
+    PRE_AQUECER = True
+    ATRASO_PRE_AQUECIMENTO = 500
+
     def __init__(self):
         """
-        Inicializa a janela principal e todos os frames.
+        Inicializa a janela principal e o registro de telas.
         """
+        inicio = time.perf_counter()
         super().__init__()
-        
+
         self.title("SAGE - Sistema Acadêmico de Gestão Educacional")
-        self.geometry("950x650") 
-        self.resizable(False, False) 
+        self.geometry("950x650")
+        self.resizable(False, False)
 
-        ctk.set_appearance_mode("dark") 
+        ctk.set_appearance_mode("dark")
         ctk.set_default_color_theme("blue")
 
-        container = ctk.CTkFrame(self, fg_color="#24232F")
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = ctk.CTkFrame(self, fg_color="#24232F")
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
 
-        self.frames = {}
+        # Thread que executa as consultas ao banco fora da thread do Tk, e a
+        # que calcula os hashes de senha (bcrypt) sem ocupar a fila do banco
+        executor.iniciar(self)
+        executor_senhas.iniciar(self)
 
-        # Tupla com todas as classes de tela que devem ser carregadas
-        telas = (Login, Cadastro, MenuPrincipal, Aluno, Turma, 
+        # Registro de telas: nome -> classe. Os frames são criados sob demanda.
+        telas = (Login, Cadastro, MenuPrincipal, Aluno, Turma,
                  Aula, Visualizacao, Relatorio, Chatbot,
                  Atividades)
+        self.telas = {F.__name__: F for F in telas}
+        self.frames = {} # Telas já construídas
+        self.tempos_telas = {} # nome -> (segundos para construir, se foi pré-aquecida)
+        self._tela_atual = None
+        self._versoes_telas = {} # nome -> versão dos dados na última ativação
+        self.atualizacoes = 0 # Ativações que recarregaram dados
+        self.atualizacoes_evitadas = 0 # Ativações sem mudança no banco (nenhuma consulta)
 
-        # Itera sobre as classes de tela, criando uma instância de cada
-        for F in telas:
-            nome_tela = F.__name__
-            frame = F(parent=container, controlador=self) 
-            self.frames[nome_tela] = frame
-            frame.grid(row=0, column=0, sticky="nsew")
+        # Fecha as conexões do banco quando a janela for fechada
+        self.protocol("WM_DELETE_WINDOW", self.encerrar)
+
+        # F12 abre o painel de diagnóstico das consultas (ver 'instrumentacao')
+        self._painel_consultas = None
+        self.bind("<F12>", self.abrir_painel_consultas)
 
         print("App inicializada. Mostrando tela de Login.")
-        self.mostrar_tela("Login")
+        self.mostrar_tela(self.TELA_INICIAL)
+
+        self.tempos = {
+            "imports": _FIM_IMPORTS - _INICIO,
+            "janela": time.perf_counter() - inicio,
+        }
+        # O primeiro momento ocioso do mainloop = a tela de login já responde
+        self.after_idle(self._marcar_interativo)
+
+    def obter_tela(self, nome_tela, pre_aquecida=False):
+        """
+        Retorna o frame de uma tela, construindo-o na primeira vez.
+
+        Args:
+            nome_tela (str): Nome da classe da tela (ex: "Relatorio").
+            pre_aquecida (bool): Se a construção veio do pré-aquecimento.
+
+        Returns:
+            ctk.CTkFrame: O frame da tela.
+        """
+        frame = self.frames.get(nome_tela)
+        if frame is None:
+            inicio = time.perf_counter()
+            frame = self.telas[nome_tela](parent=self.container, controlador=self)
+            frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[nome_tela] = frame
+            self.tempos_telas[nome_tela] = (time.perf_counter() - inicio, pre_aquecida)
+            # Uma tela nova fica por cima: devolve a tela atual para a frente
+            if pre_aquecida and self._tela_atual is not None:
+                self.frames[self._tela_atual].tkraise()
+        return frame
 
     def mostrar_tela(self, nome_tela):
         """
-        Traz um frame (tela) específico para a frente.
+        Traz um frame (tela) específico para a frente, construindo-o se preciso.
+
+        Se a tela tiver o método 'ao_mostrar', ele é chamado para recarregar
+        os dados, mas só quando o banco mudou desde a última vez que ela foi
+        mostrada (ver 'versao_dados'). Antes, cada tela recarregava tudo a
+        cada evento <Visibility>, que o Tk dispara várias vezes.
         """
-        frame = self.frames[nome_tela]
+        frame = self.obter_tela(nome_tela)
+        self._tela_atual = nome_tela
         frame.tkraise()
+        self._ativar(nome_tela, frame)
+
+    def _ativar(self, nome_tela, frame):
+        """Chama 'frame.ao_mostrar()' se os dados mudaram desde a última ativação."""
+        ao_mostrar = getattr(frame, "ao_mostrar", None)
+        if ao_mostrar is None:
+            return
+        try:
+            versao = versao_dados()
+        except Exception as e:
+            print(f"Erro ao verificar a versão dos dados: {e}")
+            versao = None # Sem versão: recarrega sempre
+        if versao is not None and self._versoes_telas.get(nome_tela) == versao:
+            self.atualizacoes_evitadas += 1
+            return
+        self._versoes_telas[nome_tela] = versao
+        self.atualizacoes += 1
+        ao_mostrar()
+
+    def pre_aquecer(self):
+        """
+        Constrói as telas que ainda não existem, uma por vez, nos momentos em
+        que a janela está ociosa (entre uma e outra, os eventos são tratados).
+        """
+        pendentes = [nome for nome in self.telas if nome not in self.frames]
+        if not pendentes:
+            self.relatorio_inicializacao()
+            return
+        self.obter_tela(pendentes[0], pre_aquecida=True)
+        # after(1) + after_idle: deixa o Tk tratar cliques/teclas antes da próxima
+        self.after(1, lambda: self.after_idle(self.pre_aquecer))
+
+    def _marcar_interativo(self):
+        """Registra o tempo até a tela inicial responder e agenda o pré-aquecimento."""
+        self.tempos["interativo"] = time.perf_counter() - _INICIO
+        if self.PRE_AQUECER:
+            self.after(self.ATRASO_PRE_AQUECIMENTO, self.pre_aquecer)
+        else:
+            self.relatorio_inicializacao()
+
+    def relatorio_inicializacao(self):
+        """
+        Imprime (e retorna) os tempos de inicialização: imports, criação da
+        janela, tempo até a tela inicial responder e construção de cada tela.
+
+        Returns:
+            dict: {"imports", "janela", "interativo", "telas": {nome: (s, pre_aquecida)}}.
+        """
+        print("--- Tempos de inicialização ---")
+        for nome, chave in (("Imports", "imports"), ("Janela + tela inicial", "janela"),
+                            ("Até a tela inicial responder", "interativo")):
+            if chave in self.tempos:
+                print(f"  {nome:<30} {self.tempos[chave] * 1000:8.1f} ms")
+        for nome, (segundos, pre_aquecida) in self.tempos_telas.items():
+            origem = "pré-aquecida" if pre_aquecida else "sob demanda"
+            print(f"  Tela {nome:<25} {segundos * 1000:8.1f} ms ({origem})")
+        return dict(self.tempos, telas=dict(self.tempos_telas))
+
+    def abrir_painel_consultas(self, event=None):
+        """
+        Abre (ou traz para a frente) o painel com as estatísticas das consultas.
+        """
+        if self._painel_consultas is not None and self._painel_consultas.winfo_exists():
+            self._painel_consultas.atualizar()
+            self._painel_consultas.lift()
+            return
+        self._painel_consultas = JanelaConsultas(self)
+
+    def encerrar(self):
+        """
+        Para o executor do banco, fecha as conexões e destrói a janela principal.
+        """
+        print(f"Atualizações de tela: {self.atualizacoes} feitas, {self.atualizacoes_evitadas} evitadas.")
+        if instrumentacao.ativa():
+            print(instrumentacao.estatisticas.relatorio())
+        executor_senhas.encerrar()
+        executor.encerrar()
+        fechar_conexoes()
+        self.destroy()
 
 # Ponto de entrada da aplicação
 if __name__ == "__main__":
+    # Opcional: 'python main.py --instrumentar' (ou SAGE_INSTRUMENTAR=1) mede as consultas
+    if instrumentacao.pedida():
+        instrumentacao.ativar()
+    # Opcional: SAGE_BANCO_LOCAL=1 usa WAL e memória mapeada (só com o .db em disco local)
+    if os.environ.get("SAGE_BANCO_LOCAL", "") not in ("", "0"):
+        usar_perfil_local()
+    # Opcional: SAGE_CUSTO_BCRYPT=N muda o custo dos hashes de senha (padrão 12)
+    if os.environ.get("SAGE_CUSTO_BCRYPT"):
+        try:
+            configurar_custo_bcrypt(os.environ["SAGE_CUSTO_BCRYPT"])
+        except ValueError as e:
+            print(f"SAGE_CUSTO_BCRYPT ignorado: {e}")
     print("Criando tabelas do banco de dados (se não existirem)...")
-    criar_tabelas() 
-    app = Aplicativo() 
-    app.mainloop()
\ No newline at end of file
+    criar_tabelas()
+    app = Aplicativo()
+    app.mainloop()
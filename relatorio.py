@@ -10,11 +10,17 @@ Este módulo define a classe 'Relatorio', que permite:
 """
 
 import customtkinter as ctk
-from database import conectar
-import pandas as pd # Usado para exportar CSV
+from cache_turmas import cache_turmas
+from executor_banco import executar, executor
+from datas import para_exibicao
+from repositorio.aulas import (TAMANHO_PAGINA, buscar_pagina_aulas, buscar_presencas_aula,
+                               deletar_aula as deletar_aula_no_banco)
+from repositorio.exportacao import (contar_linhas_csv, contar_linhas_matriz,
+                                    exportar_csv_em_lotes, exportar_matriz_em_lotes)
 import sqlite3
 from tkinter.filedialog import asksaveasfilename # Para salvar o CSV
 from dialogos import JanelaConfirmacao, JanelaEditarAula # Importa os pop-ups
+from lista_virtual import ListaVirtual
 
 class Relatorio(ctk.CTkFrame):
     """
@@ -64,22 +70,46 @@ class Relatorio(ctk.CTkFrame):
         self.dropdown_turma = ctk.CTkOptionMenu(self.painel_direito,
                                                 values=self.turmas, 
                                                 variable=self.turma_selecionada, 
-                                                command=self.carregar_aulas, 
+                                                command=cache_turmas.com_id(self.carregar_aulas), 
                                                 width=300, height=40,
                                                 fg_color="white", button_color="#E0E0E0",
                                                 text_color="#24232F", dropdown_fg_color="white",
                                                 dropdown_text_color="#24232F")
         self.dropdown_turma.pack(pady=10)
 
-        # Frame de Rolagem para os cards das aulas
-        self.frame_relatorio = ctk.CTkScrollableFrame(self.painel_direito, fg_color="#EAEAEA", corner_radius=10)
+        # Lista virtual para os cards das aulas (só as linhas visíveis viram widgets)
+        self.frame_relatorio = ListaVirtual(self.painel_direito,
+                                            tipos={
+                                                "aula": (96, self._criar_linha_aula, self._preencher_linha_aula),
+                                                "presenca": (24, self._criar_linha_presenca, self._preencher_linha_presenca),
+                                                "mais": (50, self._criar_linha_mais, self._preencher_linha_mais),
+                                            },
+                                            # Cada aula é identificada pelo seu id (edições alteram só o card dela)
+                                            chave=lambda tipo, dados: dados[0] if tipo == "aula" else None,
+                                            fg_color="#EAEAEA", corner_radius=10)
         self.frame_relatorio.pack(pady=10, fill="both", expand=True)
 
-        # Botão Exportar
-        self.btn_exportar = ctk.CTkButton(self.painel_direito, text="Exportar para CSV", command=self.exportar_csv, 
+        # Estado da paginação da turma exibida
+        self._turma_id = None
+        self._ultima_chave = None # (data, id) da última aula carregada
+        self._tem_mais = False
+        self._carregando_pagina = False
+        self._presencas_cache = {} # aula_id -> lista de presença (das aulas já expandidas)
+        self._exportacao = None # (função que grava um lote, total) durante a exportação CSV
+
+        # Exportação: formato (lista ou matriz) + botão Exportar
+        frame_exportar = ctk.CTkFrame(self.painel_direito, fg_color="transparent")
+        frame_exportar.pack(pady=10)
+
+        self.formato_exportacao = ctk.StringVar(value="Lista")
+        ctk.CTkSegmentedButton(frame_exportar, values=["Lista", "Matriz"], variable=self.formato_exportacao,
+                               selected_color="#24232F", selected_hover_color="#3A3A46",
+                               height=35).pack(side="left", padx=(0, 10))
+
+        self.btn_exportar = ctk.CTkButton(frame_exportar, text="Exportar para CSV", command=self.exportar_csv, 
                                           fg_color="#24232F", hover_color="#3A3A46", 
                                           height=35, corner_radius=10)
-        self.btn_exportar.pack(pady=10)
+        self.btn_exportar.pack(side="left")
         
         self.status = ctk.CTkLabel(self.painel_direito, text="", text_color="green")
         self.status.pack(pady=5)
@@ -91,7 +121,15 @@ class Relatorio(ctk.CTkFrame):
         self.btn_voltar.pack(pady=10)
         # --- Fim do Painel Direito ---
         
-        self.bind("<Visibility>", self.atualizar_relatorio)
+        # Atualiza o dropdown quando uma turma for criada/alterada
+        cache_turmas.assinar(self.atualizar_dropdown)
+
+    def ao_mostrar(self):
+        """
+        Gancho de ativação chamado por Aplicativo.mostrar_tela quando o banco
+        mudou desde a última exibição: recarrega as turmas e as aulas.
+        """
+        self.atualizar_relatorio()
 
     def atualizar_relatorio(self, event=None):
         """
@@ -99,118 +137,280 @@ class Relatorio(ctk.CTkFrame):
         """
         print("Atualizando relatório...")
         self.status.configure(text="") 
-        turma_anterior = self.turma_selecionada.get()
+        self.carregar_aulas(self.atualizar_dropdown())
+
+    def atualizar_dropdown(self):
+        """
+        Assinante do cache_turmas (igual ao aula.py): atualiza só o dropdown e
+        devolve o id da turma selecionada (ou None). As aulas não são
+        recarregadas aqui: a tela pode estar escondida; 'ao_mostrar' recarrega.
+        """
         self.turmas = self.carregar_turmas()
-        default_value = self.turmas[0] if self.turmas else "Nenhuma turma cadastrada"
-        
-        if self.turmas:
-            self.dropdown_turma.configure(values=self.turmas)
-            if turma_anterior in self.turmas:
-                self.dropdown_turma.set(turma_anterior)
-            else:
-                self.dropdown_turma.set(default_value)
-            self.carregar_aulas(self.dropdown_turma.get())
-        else:
+        if not self.turmas:
             self.dropdown_turma.configure(values=["Nenhuma turma cadastrada"])
             self.dropdown_turma.set("Nenhuma turma cadastrada")
-            self.carregar_aulas("Nenhuma turma cadastrada")
+            return None
+        self.dropdown_turma.configure(values=self.turmas)
+        turma = cache_turmas.turma(self.turma_selecionada.get()) or cache_turmas.turma(self.turmas[0])
+        self.dropdown_turma.set(turma.rotulo)
+        return turma.id
 
     def carregar_turmas(self):
         """
-        Busca a lista de turmas no banco de dados.
+        Retorna a lista de turmas (do cache compartilhado em memória).
         
         Returns:
             list: Lista de strings formatadas "ID - Nome" ou lista vazia.
         """
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM turmas ORDER BY nome")
-                turmas = cursor.fetchall()
-                return [f"{id} - {nome}" for id, nome in turmas]
+            # Lista compartilhada em memória: só consulta o banco se as turmas mudaram
+            return cache_turmas.rotulos()
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro ao carregar turmas: {e}", text_color="red")
             return []
 
-    def carregar_aulas(self, turma_str):
+    def carregar_aulas(self, turma_id):
         """
-        Carrega todas as aulas e presenças da turma selecionada.
+        Carrega a PRIMEIRA página de aulas da turma selecionada.
+        As aulas mais antigas são carregadas ao rolar até o fim da lista
+        (ou pelo botão "Carregar mais"), e a frequência de cada aula só é
+        buscada quando o card é expandido.
+
+        As consultas rodam no executor do banco (fora da thread do Tk); ao
+        trocar de turma, o pedido da turma anterior é cancelado.
         
         Args:
-            turma_str (str): A string da turma selecionada (ex: "1 - 3º Ano A").
+            turma_id (int): ID da turma selecionada, ou None se não houver turmas.
         """
-        for widget in self.frame_relatorio.winfo_children():
-            widget.destroy()
-        
         # Não limpa o status se for uma mensagem de sucesso (ex: "Aula deletada")
         if self.status.cget("text_color") != "green":
              self.status.configure(text="")
 
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
-            if turma_str == "Nenhuma turma cadastrada":
-                ctk.CTkLabel(self.frame_relatorio, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+        self._turma_id = None
+        self._ultima_chave = None
+        self._tem_mais = False
+        self._carregando_pagina = False # Um pedido pendente da turma anterior será substituído
+        self._presencas_cache.clear()
+
+        if turma_id is None:
+            executor.cancelar("Relatorio.aulas")
+            self.frame_relatorio.limpar("Cadastre uma turma primeiro.")
             return
 
-        try:
-            turma_id = turma_str.split(" - ")[0]
-            with conectar() as conn:
-                cursor = conn.cursor()
-                # Busca todas as aulas da turma
-                cursor.execute("SELECT id, data, tema, descricao FROM aulas WHERE turma_id = ? ORDER BY data DESC", (turma_id,))
-                aulas = cursor.fetchall()
-                
-                if not aulas:
-                    ctk.CTkLabel(self.frame_relatorio, text="Nenhuma aula registrada para esta turma.", text_color="#555555").pack(pady=10)
-                    return
-
-                # Cria um card para cada aula encontrada
-                for aula_id, data, tema, descricao in aulas:
-                    aula_frame = ctk.CTkFrame(self.frame_relatorio, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
-                    aula_frame.pack(fill="x", padx=10, pady=5)
-                    
-                    # Frame para alinhar textos à esquerda e botões à direita
-                    content_frame = ctk.CTkFrame(aula_frame, fg_color="transparent")
-                    content_frame.pack(fill="x", padx=10, pady=5)
-                    text_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
-                    text_frame.pack(side="left", fill="x", expand=True)
-                    btn_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
-                    btn_frame.pack(side="right")
-                    
-                    # Detalhes da Aula
-                    ctk.CTkLabel(text_frame, text=f"📅 {data} | 🧠 {tema}", font=("Segoe UI", 16, "bold"), text_color="#24232F").pack(anchor="w")
-                    ctk.CTkLabel(text_frame, text=f"📝 {descricao or 'Sem descrição'}", font=("Segoe UI", 14), text_color="#444444", wraplength=400, justify="left").pack(anchor="w")
-
-                    # Botões de Ação
-                    ctk.CTkButton(btn_frame, text="Editar", width=60, height=30, corner_radius=8,
-                                  command=lambda id=aula_id, d=data, t=tema, desc=descricao: self.abrir_janela_edicao(id, d, t, desc),
-                                  fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9").pack(pady=2)
-                    ctk.CTkButton(btn_frame, text="Deletar", width=60, height=30, corner_radius=8,
-                                  command=lambda id=aula_id: self.deletar_aula(id),
-                                  fg_color="#FF6B6B", text_color="white", hover_color="#FF5252").pack(pady=2)
-                    
-                    # Busca as presenças para *esta* aula específica
-                    cursor.execute("""
-                        SELECT alunos.nome, presencas.presente
-                        FROM presencas
-                        JOIN alunos ON presencas.aluno_id = alunos.id
-                        WHERE presencas.aula_id = ?
-                        ORDER BY alunos.nome
-                    """, (aula_id,))
-                    presencas = cursor.fetchall()
-                    
-                    # Exibe a lista de presença
-                    if presencas:
-                        presenca_label = ctk.CTkLabel(aula_frame, text="Frequência:", font=("Segoe UI", 13, "italic"), text_color="#555555")
-                        presenca_label.pack(anchor="w", padx=20, pady=(5,0))
-                    
-                    for nome, presente in presencas:
-                        status = "✅ Presente" if presente else "❌ Ausente"
-                        ctk.CTkLabel(aula_frame, text=f"{nome}: {status}", font=("Segoe UI", 13), text_color="#24232F").pack(anchor="w", padx=40)
-                    
-                    ctk.CTkLabel(aula_frame, text="").pack(pady=2) # Espaçador
-                    
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao carregar aulas: {e}", text_color="red")
+        self._turma_id = turma_id
+        self.frame_relatorio.limpar("Carregando aulas...")
+        self.carregar_mais()
+
+    def carregar_mais(self):
+        """
+        Pede a próxima página de aulas (mais antigas) ao executor do banco.
+        Ela é adicionada ao final da lista em '_pagina_carregada'.
+        """
+        if self._turma_id is None or self._carregando_pagina:
+            return
+        self._carregando_pagina = True
+        turma_id, depois_de = self._turma_id, self._ultima_chave
+        executar(lambda conn: buscar_pagina_aulas(conn, turma_id, TAMANHO_PAGINA, depois_de),
+                 ao_concluir=self._pagina_carregada,
+                 ao_falhar=self._erro_ao_carregar,
+                 chave="Relatorio.aulas", dono=self)
+
+    def _pagina_carregada(self, aulas):
+        """Adiciona uma página de aulas (vinda do executor) ao final da lista."""
+        self._carregando_pagina = False
+        itens = self.frame_relatorio.itens()
+        if not itens and not aulas:
+            self.frame_relatorio.limpar("Nenhuma aula registrada para esta turma.")
+            return
+
+        inicio = len(itens)
+        if itens and itens[-1][0] == "mais":
+            inicio -= 1 # A linha "Carregar mais" é substituída pela nova página
+
+        novos = [("aula", (aula_id, data, tema, descricao, presentes, total, False))
+                 for aula_id, data, tema, descricao, presentes, total in aulas]
+        self._tem_mais = len(aulas) == TAMANHO_PAGINA
+        if aulas:
+            self._ultima_chave = (aulas[-1][1], aulas[-1][0])
+        if self._tem_mais:
+            novos.append(("mais", None))
+
+        self.frame_relatorio.remover_itens(inicio, len(itens))
+        self.frame_relatorio.inserir_itens(inicio, novos)
+
+    def _erro_ao_carregar(self, erro):
+        """Mostra um erro de carregamento vindo do executor."""
+        self._carregando_pagina = False
+        if not self.frame_relatorio.itens():
+            self.frame_relatorio.limpar("")
+        self.status.configure(text=f"Erro ao carregar aulas: {erro}", text_color="red")
+
+    def alternar_frequencia(self, aula_id):
+        """
+        Expande (buscando a lista de presença, se ainda não estiver em cache)
+        ou recolhe a frequência de uma aula.
+        """
+        bloco = self.frame_relatorio.bloco(aula_id, ("presenca",))
+        if bloco is None:
+            return
+        inicio, fim = bloco
+        dados = self.frame_relatorio.itens()[inicio][1]
+
+        if dados[6]: # Já expandida: recolhe (remove as linhas de presença abaixo do cabeçalho)
+            self.frame_relatorio.atualizar_item(inicio, ("aula", dados[:6] + (False,)))
+            self.frame_relatorio.remover_itens(inicio + 1, fim)
+            return
+
+        if aula_id in self._presencas_cache:
+            self._expandir(aula_id, self._presencas_cache[aula_id])
+            return
+
+        def concluir(presencas):
+            self._presencas_cache[aula_id] = presencas
+            self._expandir(aula_id, presencas)
+
+        executar(lambda conn: buscar_presencas_aula(conn, aula_id),
+                 ao_concluir=concluir,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar frequência: {e}", text_color="red"),
+                 chave=f"Relatorio.frequencia.{aula_id}", dono=self)
+
+    def _expandir(self, aula_id, presencas):
+        """Mostra a lista de presença abaixo do cabeçalho da aula."""
+        # A lista pode ter mudado enquanto a frequência era buscada
+        indice = self.frame_relatorio.indice(aula_id)
+        if indice is None:
+            return
+        dados = self.frame_relatorio.itens()[indice][1]
+        if dados[6]:
+            return
+        self.frame_relatorio.atualizar_item(indice, ("aula", dados[:6] + (True,)))
+        self.frame_relatorio.inserir_itens(indice + 1, [("presenca", p) for p in presencas])
+
+    def aula_editada(self, aula_id, data, tema, descricao, presencas):
+        """
+        Atualiza só o card de uma aula depois de editada (chamado pela
+        JanelaEditarAula), sem recarregar o relatório.
+
+        Args:
+            aula_id (int): ID da aula.
+            data (str): Data (ISO) da aula.
+            tema (str): Tema da aula.
+            descricao (str): Descrição da aula.
+            presencas (list): Tuplas (nome_do_aluno, presente) em ordem alfabética.
+        """
+        self._presencas_cache[aula_id] = presencas
+        bloco = self.frame_relatorio.bloco(aula_id, ("presenca",))
+        if bloco is None:
+            return
+        inicio, fim = bloco
+        itens = self.frame_relatorio.itens()
+        data_antiga, total, expandida = itens[inicio][1][1], itens[inicio][1][5], itens[inicio][1][6]
+        presentes = sum(1 for _, presente in presencas if presente)
+        cabecalho = ("aula", (aula_id, data, tema, descricao, presentes, total, expandida))
+        linhas = [("presenca", p) for p in presencas] if expandida else []
+
+        if data == data_antiga and len(linhas) == fim - inicio - 1:
+            # A aula continua no mesmo lugar: atualiza só o card e as suas linhas
+            self.frame_relatorio.atualizar_item(inicio, cabecalho)
+            for deslocamento, linha in enumerate(linhas, start=1):
+                self.frame_relatorio.atualizar_item(inicio + deslocamento, linha)
+            return
+
+        # A data mudou: a aula muda de posição na lista (ordenada por data, id)
+        self.frame_relatorio.remover_itens(inicio, fim)
+        itens = self.frame_relatorio.itens()
+        if self._tem_mais and (data, aula_id) < self._ultima_chave:
+            return # Pertence a uma página ainda não carregada: aparecerá ao rolar
+        posicao = len(itens) - (1 if itens and itens[-1][0] == "mais" else 0)
+        for indice, (tipo, dados) in enumerate(itens):
+            if tipo == "aula" and (dados[1], dados[0]) < (data, aula_id):
+                posicao = indice
+                break
+        self.frame_relatorio.inserir_itens(posicao, [cabecalho] + linhas)
+
+    # --- Linhas da lista virtual ---
+
+    def _criar_linha_aula(self, parent):
+        """Cria o widget (reutilizável) do cabeçalho de uma aula."""
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
+        linha.pack_propagate(False)
+
+        aula_frame = ctk.CTkFrame(linha, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
+        aula_frame.pack(fill="both", expand=True, padx=10, pady=(8, 0))
+
+        # Frame para alinhar textos à esquerda e botões à direita
+        content_frame = ctk.CTkFrame(aula_frame, fg_color="transparent")
+        content_frame.pack(fill="x", padx=10, pady=5)
+        text_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        text_frame.pack(side="left", fill="x", expand=True)
+        btn_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
+        btn_frame.pack(side="right")
+
+        # Detalhes da Aula
+        linha.titulo = ctk.CTkLabel(text_frame, text="", font=("Segoe UI", 16, "bold"), text_color="#24232F", height=24)
+        linha.titulo.pack(anchor="w")
+        linha.descricao = ctk.CTkLabel(text_frame, text="", font=("Segoe UI", 14), text_color="#444444", justify="left", height=22)
+        linha.descricao.pack(anchor="w")
+        # Botão que expande/recolhe a lista de presença (recolhida por padrão)
+        linha.frequencia = ctk.CTkButton(text_frame, text="", font=("Segoe UI", 13, "italic"), height=20,
+                                         fg_color="transparent", hover_color="#F0F0F0", text_color="#555555",
+                                         anchor="w", command=lambda: self.alternar_frequencia(linha.dados[0]))
+        linha.frequencia.pack(anchor="w")
+
+        # Botões de Ação (usam os dados que a linha estiver mostrando no momento)
+        ctk.CTkButton(btn_frame, text="Editar", width=60, height=30, corner_radius=8,
+                      command=lambda: self.abrir_janela_edicao(*linha.dados[:4]),
+                      fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9").pack(pady=2)
+        ctk.CTkButton(btn_frame, text="Deletar", width=60, height=30, corner_radius=8,
+                      command=lambda: self.deletar_aula(linha.dados[0]),
+                      fg_color="#FF6B6B", text_color="white", hover_color="#FF5252").pack(pady=2)
+        return linha
+
+    def _preencher_linha_aula(self, linha, dados):
+        """Mostra os dados de uma aula em um widget de cabeçalho."""
+        aula_id, data, tema, descricao, presentes, total, expandida = dados
+        linha.dados = dados
+        linha.titulo.configure(text=f"📅 {para_exibicao(data)} | 🧠 {tema}")
+        descricao = descricao or "Sem descrição"
+        # A linha tem altura fixa: descrições longas são abreviadas
+        if len(descricao) > 60:
+            descricao = descricao[:57] + "..."
+        linha.descricao.configure(text=f"📝 {descricao}")
+        if total:
+            seta = "▼" if expandida else "▶"
+            linha.frequencia.configure(text=f"{seta} Frequência: {presentes}/{total} presentes", state="normal")
+        else:
+            linha.frequencia.configure(text="Sem frequência registrada.", state="disabled")
+
+    def _criar_linha_presenca(self, parent):
+        """Cria o widget (reutilizável) de uma linha de presença."""
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
+        linha.pack_propagate(False)
+        linha.texto = ctk.CTkLabel(linha, text="", font=("Segoe UI", 13), text_color="#24232F", height=22)
+        linha.texto.pack(anchor="w", padx=50)
+        return linha
+
+    def _preencher_linha_presenca(self, linha, dados):
+        """Mostra 'Nome: Presente/Ausente' em uma linha de presença."""
+        nome, presente = dados
+        status = "✅ Presente" if presente else "❌ Ausente"
+        linha.texto.configure(text=f"{nome}: {status}")
+
+    def _criar_linha_mais(self, parent):
+        """Cria a linha final com o botão "Carregar mais aulas"."""
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
+        linha.pack_propagate(False)
+        ctk.CTkButton(linha, text="Carregar mais aulas", command=self.carregar_mais,
+                      fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9",
+                      width=200, height=30, corner_radius=8).pack(pady=10)
+        return linha
+
+    def _preencher_linha_mais(self, linha, dados):
+        """
+        A linha "Carregar mais" só é preenchida quando aparece na tela:
+        aproveitamos para buscar a próxima página automaticamente (rolagem infinita).
+        """
+        self.after_idle(self.carregar_mais)
 
     def deletar_aula(self, aula_id):
         """
@@ -225,19 +425,25 @@ class Relatorio(ctk.CTkFrame):
         self.wait_window(dialog) 
         
         if dialog.obter_resposta(): # Se clicou "Sim"
-            try:
-                with conectar() as conn:
-                    cursor = conn.cursor()
-                    # O "ON DELETE CASCADE" no DB cuida de deletar as presenças
-                    cursor.execute("DELETE FROM aulas WHERE id = ?", (aula_id,))
-                
-                self.status.configure(text="Aula deletada com sucesso!", text_color="green")
-                self.carregar_aulas(self.turma_selecionada.get()) # Recarrega
-            except sqlite3.Error as e:
-                self.status.configure(text=f"Erro ao deletar: {str(e)}", text_color="red")
+            # O "ON DELETE CASCADE" no DB cuida de deletar as presenças
+            executar(lambda conn: deletar_aula_no_banco(conn, aula_id),
+                     ao_concluir=lambda _: self._aula_deletada(aula_id),
+                     ao_falhar=lambda e: self.status.configure(text=f"Erro ao deletar: {e}", text_color="red"),
+                     dono=self)
         else:
             self.status.configure(text="Deleção cancelada.", text_color="#A9A9A9")
 
+    def _aula_deletada(self, aula_id):
+        """Chamado (na thread do Tk) quando a aula foi deletada do banco."""
+        self.status.configure(text="Aula deletada com sucesso!", text_color="green")
+        # Remove só o card da aula (e as suas linhas de presença)
+        self._presencas_cache.pop(aula_id, None)
+        bloco = self.frame_relatorio.bloco(aula_id, ("presenca",))
+        if bloco is not None:
+            self.frame_relatorio.remover_itens(*bloco)
+        if not self.frame_relatorio.itens():
+            self.frame_relatorio.limpar("Nenhuma aula registrada para esta turma.")
+
     def abrir_janela_edicao(self, aula_id, data, tema, descricao):
         """
         Abre a janela pop-up 'JanelaEditarAula' para editar a aula selecionada.
@@ -255,55 +461,115 @@ class Relatorio(ctk.CTkFrame):
         
     def exportar_csv(self):
         """
-        Exporta os dados de frequência da turma selecionada para um arquivo CSV.
+        Exporta os dados de frequência da turma selecionada para um arquivo CSV,
+        no formato escolhido:
+        - "Lista": uma linha por presença (data, tema, nome, status);
+        - "Matriz": uma linha por aluno, uma coluna por aula e os totais.
+        A contagem e a gravação rodam no executor do banco, um lote por
+        pedido, com o progresso no status e a interface sempre respondendo.
         """
-        turma_str = self.turma_selecionada.get()
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
+        if self._exportacao is not None:
+            self.status.configure(text="Aguarde: uma exportação já está em andamento.", text_color="red")
+            return
+
+        turma = cache_turmas.turma(self.turma_selecionada.get())
+        if turma is None:
             self.status.configure(text="Selecione uma turma para exportar.", text_color="red")
             return
 
+        matriz = self.formato_exportacao.get() == "Matriz"
+        contar = contar_linhas_matriz if matriz else contar_linhas_csv
+        self.status.configure(text="Preparando a exportação...", text_color="#555555")
+        executar(lambda conn: contar(conn, turma.id),
+                 ao_concluir=lambda total: self._iniciar_exportacao(turma, matriz, total),
+                 ao_falhar=self._erro_ao_exportar, chave="Relatorio.exportacao", dono=self)
+
+    def _iniciar_exportacao(self, turma, matriz, total):
+        """
+        Chamado (na thread do Tk) com o total de linhas: pede o arquivo e
+        envia o primeiro lote ao executor.
+
+        Args:
+            turma (TurmaRef): A turma exportada.
+            matriz (bool): Se True, exporta a matriz alunos x aulas.
+            total (int): Linhas que a exportação terá (para o progresso).
+        """
+        if total == 0:
+            self.status.configure(text="Não há dados para exportar.", text_color="red")
+            return
+
+        # Abre a janela "Salvar Como..." (nome completo da turma, mesmo que contenha " - ")
+        filepath = asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("Arquivos CSV", "*.csv"), ("Todos os arquivos", "*.*")],
+            initialfile=f"{'matriz' if matriz else 'relatorio'}_frequencia_{turma.nome.replace(' ', '_')}.csv",
+            title="Salvar Relatório CSV"
+        )
+
+        if not filepath: # Se o usuário cancelar
+            self.status.configure(text="Exportação cancelada.", text_color="#A9A9A9")
+            return
+
         try:
-            turma_id = turma_str.split(" - ")[0]
-            turma_nome = turma_str.split(" - ")[1]
-            
-            # Query complexa para pegar todos os dados de uma vez
-            query = """
-                SELECT aulas.data, aulas.tema, alunos.nome, 
-                       CASE presencas.presente WHEN 1 THEN 'Presente' ELSE 'Ausente' END AS status
-                FROM aulas
-                JOIN presencas ON aulas.id = presencas.aula_id
-                JOIN alunos ON presencas.aluno_id = alunos.id
-                WHERE aulas.turma_id = ?
-                ORDER BY aulas.data DESC, alunos.nome
+            arquivo = open(filepath, "w", newline="", encoding="utf-8-sig")
+        except OSError as e:
+            self.status.configure(text=f"Erro ao exportar: {e}", text_color="red")
+            return
+
+        exportar = exportar_matriz_em_lotes if matriz else exportar_csv_em_lotes
+        lotes = None
+
+        def gravar_lote(conn):
+            """
+            Roda no executor: grava um lote. A consulta do lote é aberta e lida
+            até o fim nesta tarefa, então nenhum lock de leitura fica retido
+            entre os lotes (as gravações das outras telas não esperam a exportação).
             """
-            
-            with conectar() as conn:
-                # O Pandas lê diretamente da query SQL para um DataFrame
-                df = pd.read_sql_query(query, conn, params=(turma_id,))
-
-            if df.empty:
-                self.status.configure(text="Não há dados para exportar.", text_color="red")
-                return
-
-            # Abre a janela "Salvar Como..."
-            filepath = asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("Arquivos CSV", "*.csv"), ("Todos os arquivos", "*.*")],
-                initialfile=f"relatorio_frequencia_{turma_nome.replace(' ', '_')}.csv",
-                title="Salvar Relatório CSV"
-            )
-
-            if not filepath: # Se o usuário cancelar
-                self.status.configure(text="Exportação cancelada.", text_color="#A9A9A9")
-                return
-
-            df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            nonlocal lotes
+            terminou = True
+            try:
+                if lotes is None:
+                    lotes = exportar(conn, turma.id, arquivo)
+                gravadas = next(lotes, None)
+                terminou = gravadas is None
+                return gravadas
+            finally:
+                # Fim ou erro: o arquivo é fechado aqui, mesmo que a tela não receba o resultado
+                if terminou:
+                    arquivo.close()
+
+        self._exportacao = (gravar_lote, total)
+        self.status.configure(text=f"Exportando... 0/{total} linhas (0%)", text_color="#555555")
+        self._exportar_proximo_lote()
+
+    def _exportar_proximo_lote(self):
+        """Envia o próximo lote da exportação em andamento ao executor."""
+        gravar_lote, _ = self._exportacao
+        executar(gravar_lote, ao_concluir=self._lote_exportado, ao_falhar=self._erro_ao_exportar,
+                 chave="Relatorio.exportacao", dono=self)
+
+    def _lote_exportado(self, gravadas):
+        """
+        Chamado (na thread do Tk) depois de cada lote: atualiza o progresso e
+        pede o próximo.
+        """
+        _, total = self._exportacao
+        if gravadas is None: # Acabaram as linhas
+            self._exportacao = None
             self.status.configure(text=f"Relatório exportado com sucesso!", text_color="green")
+            return
 
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro no banco: {e}", text_color="red")
-        except Exception as e:
-            self.status.configure(text=f"Erro ao exportar: {e}", text_color="red")
+        porcentagem = min(100, gravadas * 100 // total)
+        self.status.configure(text=f"Exportando... {gravadas}/{total} linhas ({porcentagem}%)", text_color="#555555")
+        self._exportar_proximo_lote()
+
+    def _erro_ao_exportar(self, erro):
+        """Chamado (na thread do Tk) quando a contagem ou um lote falhou."""
+        self._exportacao = None
+        if isinstance(erro, sqlite3.Error):
+            self.status.configure(text=f"Erro no banco: {erro}", text_color="red")
+        else:
+            self.status.configure(text=f"Erro ao exportar: {erro}", text_color="red")
 
     def voltar(self):
         """
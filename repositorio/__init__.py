@@ -0,0 +1,23 @@
+"""
+Camada de acesso aos dados do SAGE (repositorio).
+
+Todas as leituras e gravações que as telas fazem no banco ficam aqui, em
+funções sem nenhuma dependência de interface (podem ser usadas em
+ferramentas, benchmarks e testes sem abrir janela):
+
+- turmas.py:     turmas (dropdowns, cadastro)
+- alunos.py:     alunos, resumo de presença e histórico de cada aluno
+- aulas.py:      aulas e presenças (registro, edição, relatório paginado)
+- atividades.py: atividades (provas, trabalhos) das turmas
+- usuarios.py:   cadastro e login de professores
+- exportacao.py: exportação da frequência para CSV (lista e matriz)
+- modelos.py:    as linhas retornadas (namedtuples compactas)
+
+Convenções:
+- Toda função recebe a conexão como primeiro argumento ('conn') e NÃO faz
+  commit: quem chama decide a transação ('with conectar() as conn:' na
+  thread do Tk, ou o 'with conn' do executor do banco).
+- As leituras retornam listas de namedtuples de 'modelos' (que continuam
+  sendo tuplas: podem ser desempacotadas como antes).
+- Erros do banco sobem como sqlite3.Error; a tela decide a mensagem.
+"""
@@ -0,0 +1,70 @@
+"""
+Alunos (repositorio/alunos.py).
+
+Os totais de presença vêm da tabela 'resumo_alunos', mantida por triggers
+(ver database.py): nada aqui precisa recalculá-los.
+"""
+
+from repositorio.modelos import AlunoRef, ResumoAluno, RegistroHistorico
+
+# Consultas das telas (também verificadas por 'database.verificar_planos_consulta')
+SQL_LISTAR_ALUNOS_TURMA = "SELECT id, nome FROM alunos WHERE turma_id = ? ORDER BY nome"
+
+SQL_RESUMO_ALUNOS = """
+    SELECT a.id, a.nome, COALESCE(r.presencas, 0), COALESCE(r.faltas, 0), r.ultima_aula
+    FROM alunos a
+    LEFT JOIN resumo_alunos r ON r.aluno_id = a.id
+    WHERE a.turma_id = ?
+    ORDER BY a.nome
+"""
+
+SQL_HISTORICO_ALUNO = """
+    SELECT au.data, p.presente
+    FROM presencas p
+    JOIN aulas au ON au.id = p.aula_id
+    WHERE p.aluno_id = ?
+    ORDER BY au.data DESC
+"""
+
+def listar_alunos_turma(conn, turma_id):
+    """
+    Returns:
+        list: AlunoRef dos alunos da turma, em ordem alfabética.
+    """
+    return list(map(AlunoRef._make, conn.execute(SQL_LISTAR_ALUNOS_TURMA, (turma_id,))))
+
+def inserir_aluno(conn, nome, turma_id):
+    """
+    Cadastra um aluno na turma.
+
+    Returns:
+        int: O ID do aluno criado.
+    """
+    return conn.execute("INSERT INTO alunos (nome, turma_id) VALUES (?, ?)", (nome, turma_id)).lastrowid
+
+def renomear_aluno(conn, aluno_id, nome):
+    """Altera o nome de um aluno."""
+    conn.execute("UPDATE alunos SET nome = ? WHERE id = ?", (nome, aluno_id))
+
+def deletar_aluno(conn, aluno_id):
+    """Apaga um aluno (as presenças dele saem pelo ON DELETE CASCADE)."""
+    conn.execute("DELETE FROM alunos WHERE id = ?", (aluno_id,))
+
+def buscar_resumo_alunos(conn, turma_id):
+    """
+    Busca os alunos da turma com os totais de presença já calculados
+    (uma linha por aluno, sem ler o histórico de presenças).
+
+    Returns:
+        list: ResumoAluno em ordem alfabética (alunos sem aulas têm 0 e ultima_aula None).
+    """
+    return list(map(ResumoAluno._make, conn.execute(SQL_RESUMO_ALUNOS, (turma_id,))))
+
+def buscar_historico_aluno(conn, aluno_id):
+    """
+    Busca o histórico de presença de UM aluno (carregado só quando o card é expandido).
+
+    Returns:
+        list: RegistroHistorico, da aula mais recente para a mais antiga.
+    """
+    return list(map(RegistroHistorico._make, conn.execute(SQL_HISTORICO_ALUNO, (aluno_id,))))
@@ -0,0 +1,43 @@
+"""
+Atividades das turmas (repositorio/atividades.py).
+"""
+
+from repositorio.modelos import Atividade
+
+SQL_LISTAR_ATIVIDADES = """
+    SELECT id, nome, data_entrega, descricao
+    FROM atividades
+    WHERE turma_id = ?
+    ORDER BY data_entrega DESC
+"""
+
+def listar_atividades(conn, turma_id):
+    """
+    Returns:
+        list: Atividade da turma, da entrega mais distante para a mais antiga.
+    """
+    return list(map(Atividade._make, conn.execute(SQL_LISTAR_ATIVIDADES, (turma_id,))))
+
+def inserir_atividade(conn, turma_id, nome, data_entrega, descricao):
+    """
+    Cadastra uma atividade (data de entrega em ISO).
+
+    Returns:
+        int: O ID da atividade criada.
+    """
+    return conn.execute("""
+        INSERT INTO atividades (turma_id, nome, data_entrega, descricao)
+        VALUES (?, ?, ?, ?)
+    """, (turma_id, nome, data_entrega, descricao)).lastrowid
+
+def atualizar_atividade(conn, atividade_id, nome, data_entrega, descricao):
+    """Altera nome, data de entrega (ISO) e descrição de uma atividade."""
+    conn.execute("""
+        UPDATE atividades
+        SET nome = ?, data_entrega = ?, descricao = ?
+        WHERE id = ?
+    """, (nome, data_entrega, descricao, atividade_id))
+
+def deletar_atividade(conn, atividade_id):
+    """Apaga uma atividade."""
+    conn.execute("DELETE FROM atividades WHERE id = ?", (atividade_id,))
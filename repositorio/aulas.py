@@ -0,0 +1,125 @@
+"""
+Aulas e presenças (repositorio/aulas.py).
+
+As presenças são passadas e devolvidas como pares (aluno_id, presente),
+com presente = 1 ou 0.
+"""
+
+from repositorio.modelos import AulaResumo, PresencaAula, PresencaEdicao
+
+# Quantidade de aulas carregadas por página no relatório
+TAMANHO_PAGINA = 20
+
+# Consultas das telas (também verificadas por 'database.verificar_planos_consulta').
+# A primeira página usa SQL_PAGINA_AULAS com filtro vazio; as seguintes, com FILTRO_DEPOIS_DE.
+SQL_PAGINA_AULAS = """
+    SELECT au.id, au.data, au.tema, au.descricao,
+           (SELECT TOTAL(p.presente) FROM presencas p WHERE p.aula_id = au.id),
+           (SELECT COUNT(*) FROM presencas p WHERE p.aula_id = au.id)
+    FROM aulas au
+    WHERE au.turma_id = ? {filtro}
+    ORDER BY au.data DESC, au.id DESC
+    LIMIT ?
+"""
+FILTRO_DEPOIS_DE = "AND (au.data, au.id) < (?, ?)"
+
+SQL_PRESENCAS_AULA = """
+    SELECT al.nome, p.presente
+    FROM presencas p
+    JOIN alunos al ON al.id = p.aluno_id
+    WHERE p.aula_id = ?
+    ORDER BY al.nome
+"""
+
+SQL_PRESENCAS_EDICAO = """
+    SELECT a.id, a.nome, p.presente
+    FROM alunos a
+    JOIN presencas p ON a.id = p.aluno_id
+    WHERE p.aula_id = ?
+    ORDER BY a.nome
+"""
+
+def buscar_pagina_aulas(conn, turma_id, tamanho=TAMANHO_PAGINA, depois_de=None):
+    """
+    Busca uma página de aulas da turma, da mais recente para a mais antiga,
+    usando paginação por chave (keyset) em (data, id): o custo de cada página
+    não depende de quantas aulas já foram carregadas, ao contrário do OFFSET.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco.
+        turma_id (int): ID da turma.
+        tamanho (int): Número máximo de aulas da página.
+        depois_de (tuple): (data, id) da última aula da página anterior,
+            ou None para a primeira página.
+
+    Returns:
+        list: AulaResumo (id, data, tema, descricao, presentes, total).
+    """
+    if depois_de is None:
+        cursor = conn.execute(SQL_PAGINA_AULAS.format(filtro=""), (turma_id, tamanho))
+    else:
+        cursor = conn.execute(SQL_PAGINA_AULAS.format(filtro=FILTRO_DEPOIS_DE),
+                              (turma_id, depois_de[0], depois_de[1], tamanho))
+    return [AulaResumo(aula_id, data, tema, descricao, int(presentes), total)
+            for aula_id, data, tema, descricao, presentes, total in cursor]
+
+def buscar_presencas_aula(conn, aula_id):
+    """
+    Busca a lista de presença de UMA aula (carregada só quando o card é expandido).
+
+    Returns:
+        list: PresencaAula (nome, presente) em ordem alfabética.
+    """
+    return list(map(PresencaAula._make, conn.execute(SQL_PRESENCAS_AULA, (aula_id,))))
+
+def buscar_presencas_edicao(conn, aula_id):
+    """
+    Busca as presenças da aula com o id de cada aluno, para a janela de edição.
+
+    Returns:
+        list: PresencaEdicao (aluno_id, nome, presente) em ordem alfabética.
+    """
+    return list(map(PresencaEdicao._make, conn.execute(SQL_PRESENCAS_EDICAO, (aula_id,))))
+
+def registrar_aula(conn, turma_id, data, tema, descricao, presencas):
+    """
+    Grava uma aula nova e a chamada dela.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco.
+        turma_id (int): ID da turma.
+        data (str): Data da aula em ISO (AAAA-MM-DD).
+        tema (str): Tema da aula.
+        descricao (str): Descrição (pode ser vazia).
+        presencas (list): Pares (aluno_id, presente).
+
+    Returns:
+        int: O ID da aula criada.
+    """
+    aula_id = conn.execute("INSERT INTO aulas (turma_id, data, tema, descricao) VALUES (?, ?, ?, ?)",
+                           (turma_id, data, tema, descricao)).lastrowid
+    # Todas as presenças de uma vez (muito mais eficiente que um INSERT por aluno)
+    conn.executemany("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (?, ?, ?)",
+                     [(aula_id, aluno_id, presente) for aluno_id, presente in presencas])
+    return aula_id
+
+def atualizar_aula(conn, aula_id, data, tema, descricao, presencas):
+    """
+    Altera os dados de uma aula e as presenças já lançadas nela.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco.
+        aula_id (int): ID da aula.
+        data (str): Nova data em ISO.
+        tema (str): Novo tema.
+        descricao (str): Nova descrição.
+        presencas (list): Pares (aluno_id, presente).
+    """
+    conn.execute("UPDATE aulas SET data = ?, tema = ?, descricao = ? WHERE id = ?",
+                 (data, tema, descricao, aula_id))
+    conn.executemany("UPDATE presencas SET presente = ? WHERE aula_id = ? AND aluno_id = ?",
+                     [(presente, aula_id, aluno_id) for aluno_id, presente in presencas])
+
+def deletar_aula(conn, aula_id):
+    """Apaga uma aula (as presenças dela saem pelo ON DELETE CASCADE)."""
+    conn.execute("DELETE FROM aulas WHERE id = ?", (aula_id,))
@@ -0,0 +1,183 @@
+"""
+Exportação da frequência para CSV (repositorio/exportacao.py).
+
+Os exportadores são geradores que gravam um lote de linhas por passo, para
+a tela poder intercalar os lotes com a interface (via .after).
+
+Cada lote é lido por uma consulta própria, paginada por chave (keyset) e
+lida até o fim: nenhum cursor fica aberto entre um passo e o próximo. Um
+cursor aberto seguraria o lock SHARED do arquivo durante a exportação
+inteira e, no journal clássico (o padrão), as gravações das outras telas
+esperariam até o timeout e falhariam com "database is locked".
+"""
+
+import csv
+from datas import para_exibicao
+
+# Linhas lidas (uma consulta) e gravadas no CSV por passo da exportação
+TAMANHO_LOTE_CSV = 500
+
+# Cabeçalho da exportação em lista
+CABECALHO_CSV = ("data", "tema", "nome", "status")
+
+# Query da exportação (as datas ficam em ISO no banco e são exportadas como DD/MM/AAAA).
+# As 3 últimas colunas são a chave do lote (não vão para o CSV). O primeiro lote
+# usa filtro vazio; os seguintes, FILTRO_CSV_DEPOIS_DE com a chave da última linha.
+SQL_EXPORTAR_CSV = """
+    SELECT COALESCE(strftime('%d/%m/%Y', aulas.data), aulas.data) AS data,
+           aulas.tema, alunos.nome,
+           CASE presencas.presente WHEN 1 THEN 'Presente' ELSE 'Ausente' END AS status,
+           aulas.data, aulas.id, alunos.id
+    FROM aulas
+    JOIN presencas ON aulas.id = presencas.aula_id
+    JOIN alunos ON presencas.aluno_id = alunos.id
+    WHERE aulas.turma_id = ? {filtro}
+    ORDER BY aulas.data DESC, aulas.id DESC, alunos.nome, alunos.id
+    LIMIT ?
+"""
+# Aulas em ordem decrescente e, dentro da aula, alunos em ordem crescente:
+# continua na mesma aula (alunos depois do último) ou nas aulas anteriores
+FILTRO_CSV_DEPOIS_DE = """
+    AND (aulas.data, aulas.id) <= (?, ?)
+    AND ((aulas.data, aulas.id) < (?, ?) OR (alunos.nome, alunos.id) > (?, ?))
+"""
+
+def contar_linhas_csv(conn, turma_id):
+    """Retorna quantas linhas (presenças) a exportação da turma terá."""
+    return conn.execute("""
+        SELECT COUNT(*)
+        FROM aulas
+        JOIN presencas ON aulas.id = presencas.aula_id
+        WHERE aulas.turma_id = ?
+    """, (turma_id,)).fetchone()[0]
+
+def _ler_lote(conn, sql, params):
+    """Executa a consulta de um lote e a lê até o fim, fechando o cursor (e o lock de leitura)."""
+    cursor = conn.execute(sql, params)
+    try:
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+def exportar_csv_em_lotes(conn, turma_id, arquivo, tamanho_lote=TAMANHO_LOTE_CSV):
+    """
+    Grava a frequência da turma em 'arquivo', um lote (uma consulta com
+    LIMIT) por vez, sem montar o resultado inteiro na memória.
+
+    É um gerador: cada passo grava UM lote e devolve o total de linhas gravadas
+    até então. Assim a tela pode gravar um lote por vez (com .after) sem
+    travar a interface.
+
+    Args:
+        conn (sqlite3.Connection): Conexão com o banco.
+        turma_id (int): ID da turma.
+        arquivo: Arquivo texto aberto para escrita (com newline="").
+        tamanho_lote (int): Linhas lidas e gravadas por passo.
+
+    Yields:
+        int: Total de linhas de dados gravadas.
+    """
+    escritor = csv.writer(arquivo)
+    escritor.writerow(CABECALHO_CSV)
+    lote = _ler_lote(conn, SQL_EXPORTAR_CSV.format(filtro=""), (turma_id, tamanho_lote))
+    gravadas = 0
+    while lote:
+        escritor.writerows(linha[:4] for linha in lote)
+        gravadas += len(lote)
+        yield gravadas
+        if len(lote) < tamanho_lote:
+            break # Lote incompleto: era o último
+        _, _, nome, _, data, aula_id, aluno_id = lote[-1]
+        lote = _ler_lote(conn, SQL_EXPORTAR_CSV.format(filtro=FILTRO_CSV_DEPOIS_DE),
+                         (turma_id, data, aula_id, data, aula_id, nome, aluno_id, tamanho_lote))
+
+def contar_linhas_matriz(conn, turma_id):
+    """Retorna quantas linhas (alunos) a exportação em matriz da turma terá."""
+    return conn.execute("SELECT COUNT(*) FROM alunos WHERE turma_id = ?", (turma_id,)).fetchone()[0]
+
+# Uma linha por aluno, já com os totais: as presenças entram só se a aula
+# for da turma atual (um aluno transferido não leva as da turma antiga).
+# As células vêm compactadas em 'aula_id:presente,aula_id:presente...'.
+# O GROUP BY segue o índice idx_alunos_turma (turma_id, nome): sem ordenação extra,
+# e cada lote (LIMIT) lê só os seus alunos. Lotes seguintes: FILTRO_MATRIZ_DEPOIS_DE.
+SQL_MATRIZ_FREQUENCIA = """
+    SELECT al.id, al.nome,
+           group_concat(CASE WHEN au.id IS NOT NULL THEN p.aula_id || ':' || p.presente END) AS celulas,
+           COALESCE(SUM(CASE WHEN au.id IS NOT NULL THEN p.presente END), 0) AS presencas,
+           COUNT(au.id) - COALESCE(SUM(CASE WHEN au.id IS NOT NULL THEN p.presente END), 0) AS faltas,
+           ROUND(100.0 * SUM(CASE WHEN au.id IS NOT NULL THEN p.presente END) / COUNT(au.id), 1) AS frequencia_pct
+    FROM alunos al
+    LEFT JOIN presencas p ON p.aluno_id = al.id
+    LEFT JOIN aulas au ON au.id = p.aula_id AND au.turma_id = ?
+    WHERE al.turma_id = ? {filtro}
+    GROUP BY al.nome, al.id
+    ORDER BY al.nome, al.id
+    LIMIT ?
+"""
+FILTRO_MATRIZ_DEPOIS_DE = "AND (al.nome, al.id) > (?, ?)"
+
+def cabecalho_matriz(aulas):
+    """
+    Monta o cabeçalho da matriz: o aluno, uma coluna por aula (a data; duas
+    aulas no mesmo dia viram "dd/mm/aaaa (2)", "dd/mm/aaaa (3)"...) e os totais.
+
+    Args:
+        aulas (list): Tuplas (aula_id, data) das aulas da turma, na ordem das colunas.
+
+    Returns:
+        list: Os nomes das colunas.
+    """
+    colunas = ["aluno"]
+    nomes_usados = {}
+    for _, data in aulas:
+        nome = para_exibicao(data)
+        nomes_usados[nome] = nomes_usados.get(nome, 0) + 1
+        if nomes_usados[nome] > 1:
+            nome = f"{nome} ({nomes_usados[nome]})"
+        colunas.append(nome)
+    return colunas + ["presencas", "faltas", "frequencia_pct"]
+
+def _linha_matriz(linha, colunas_aulas):
+    """
+    Monta a linha do CSV de um aluno a partir de uma linha de SQL_MATRIZ_FREQUENCIA:
+    só distribui as células ('P', 'F' ou vazio, sem chamada); os totais já vêm do SQL.
+
+    Args:
+        linha (tuple): (aluno_id, nome, celulas, presencas, faltas, frequencia_pct).
+        colunas_aulas (dict): 'aula_id' (texto) -> índice da coluna da aula (a partir de 0).
+    """
+    _, nome, celulas_sql, presencas, faltas, frequencia = linha
+    celulas = [""] * len(colunas_aulas)
+    if celulas_sql:
+        for par in celulas_sql.split(","):
+            aula_id, presente = par.split(":")
+            celulas[colunas_aulas[aula_id]] = "P" if presente == "1" else "F"
+    return [nome, *celulas, presencas, faltas, "" if frequencia is None else frequencia]
+
+def exportar_matriz_em_lotes(conn, turma_id, arquivo, tamanho_lote=TAMANHO_LOTE_CSV):
+    """
+    Grava a matriz de frequência (alunos x aulas, com totais) em 'arquivo'.
+    Funciona como 'exportar_csv_em_lotes': é um gerador que grava um lote por passo.
+
+    Os totais de cada aluno são calculados no SQL (SQL_MATRIZ_FREQUENCIA,
+    agrupada por aluno, um lote de alunos por consulta); aqui só as células
+    compactadas de cada aluno são separadas. Não há limite de colunas do SQLite para turmas com muitas aulas.
+
+    Yields:
+        int: Total de alunos (linhas) gravados.
+    """
+    aulas = _ler_lote(conn, "SELECT id, data FROM aulas WHERE turma_id = ? ORDER BY data, id", (turma_id,))
+    colunas_aulas = {str(aula_id): indice for indice, (aula_id, _) in enumerate(aulas)}
+    escritor = csv.writer(arquivo)
+    escritor.writerow(cabecalho_matriz(aulas))
+    lote = _ler_lote(conn, SQL_MATRIZ_FREQUENCIA.format(filtro=""), (turma_id, turma_id, tamanho_lote))
+    gravadas = 0
+    while lote:
+        escritor.writerows(_linha_matriz(linha, colunas_aulas) for linha in lote)
+        gravadas += len(lote)
+        yield gravadas
+        if len(lote) < tamanho_lote:
+            break # Lote incompleto: era o último
+        aluno_id, nome = lote[-1][:2]
+        lote = _ler_lote(conn, SQL_MATRIZ_FREQUENCIA.format(filtro=FILTRO_MATRIZ_DEPOIS_DE),
+                         (turma_id, turma_id, nome, aluno_id, tamanho_lote))
@@ -0,0 +1,45 @@
+"""
+Linhas retornadas pelo repositório (repositorio/modelos.py).
+
+Cada tipo é uma namedtuple: ocupa o mesmo que uma tupla (sem __dict__),
+pode ser desempacotada como tupla e tem os campos com nome.
+"""
+
+from collections import namedtuple
+
+class TurmaRef(namedtuple("TurmaRef", ("id", "nome"))):
+    """
+    Uma turma na memória: tupla imutável e compacta (sem __dict__).
+
+    Attributes:
+        id (int): ID da turma no banco.
+        nome (str): Nome da turma.
+    """
+
+    __slots__ = ()
+
+    @property
+    def rotulo(self):
+        """Texto exibido nos dropdowns (ex: "1 - 3º Ano A")."""
+        return f"{self.id} - {self.nome}"
+
+# Aluno de uma turma (checkboxes da tela de Aula)
+AlunoRef = namedtuple("AlunoRef", ("id", "nome"))
+
+# Card da tela de Visualização: totais vindos de 'resumo_alunos'
+ResumoAluno = namedtuple("ResumoAluno", ("id", "nome", "presencas", "faltas", "ultima_aula"))
+
+# Uma linha do histórico de um aluno (data ISO, 1/0)
+RegistroHistorico = namedtuple("RegistroHistorico", ("data", "presente"))
+
+# Card da tela de Relatório: a aula com os totais de presença
+AulaResumo = namedtuple("AulaResumo", ("id", "data", "tema", "descricao", "presentes", "total"))
+
+# Presença de um aluno em uma aula (lista expandida do Relatório)
+PresencaAula = namedtuple("PresencaAula", ("nome", "presente"))
+
+# Presença com o id do aluno (janela de edição da aula)
+PresencaEdicao = namedtuple("PresencaEdicao", ("aluno_id", "nome", "presente"))
+
+# Atividade (prova, trabalho) de uma turma
+Atividade = namedtuple("Atividade", ("id", "nome", "data_entrega", "descricao"))
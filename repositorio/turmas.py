@@ -0,0 +1,23 @@
+"""
+Turmas (repositorio/turmas.py).
+"""
+
+from repositorio.modelos import TurmaRef
+
+SQL_LISTAR_TURMAS = "SELECT id, nome FROM turmas ORDER BY nome"
+
+def listar_turmas(conn):
+    """
+    Returns:
+        list: TurmaRef de todas as turmas, ordenadas por nome.
+    """
+    return list(map(TurmaRef._make, conn.execute(SQL_LISTAR_TURMAS)))
+
+def inserir_turma(conn, nome):
+    """
+    Cadastra uma turma. Quem chama deve avisar o cache ('cache_turmas.invalidar()').
+
+    Returns:
+        int: O ID da turma criada.
+    """
+    return conn.execute("INSERT INTO turmas (nome) VALUES (?)", (nome,)).lastrowid
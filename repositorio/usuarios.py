@@ -0,0 +1,31 @@
+"""
+Professores (repositorio/usuarios.py).
+
+Aqui ficam só as leituras e gravações: o hash e a verificação bcrypt
+(lentos de propósito) são feitos fora do executor do banco, com
+'database.hash_senha' e 'database.conferir_senha'.
+"""
+
+def buscar_credenciais(conn, email):
+    """
+    Returns:
+        tuple: (usuario_id, hash da senha) do professor, ou None se o e-mail não existir.
+    """
+    return conn.execute("SELECT id, senha FROM usuarios WHERE email = ?", (email,)).fetchone()
+
+def atualizar_hash_senha(conn, usuario_id, senha_hash):
+    """Grava um hash novo para a senha (ex: refeito com outro custo bcrypt)."""
+    conn.execute("UPDATE usuarios SET senha = ? WHERE id = ?", (senha_hash, usuario_id))
+
+def cadastrar_usuario(conn, nome, email, senha_hash):
+    """
+    Cadastra um professor com o hash da senha já calculado ('database.hash_senha').
+
+    Raises:
+        sqlite3.IntegrityError: Se o e-mail já estiver cadastrado.
+
+    Returns:
+        int: O ID do usuário criado.
+    """
+    return conn.execute("INSERT INTO usuarios (nome, email, senha) VALUES (?, ?, ?)",
+                        (nome, email, senha_hash)).lastrowid
@@ -0,0 +1,24 @@
+"""
+Configuração comum dos testes (pytest).
+
+Os testes rodam a partir da pasta raiz do projeto ('python -m pytest') e
+cada um usa um banco temporário próprio: o sistema_escolar.db nunca é tocado.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Os módulos do SAGE ficam na pasta raiz (não é um pacote instalado)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco vazio com o schema completo (tabelas + migrações); devolve a conexão."""
+    database.usar_banco(str(tmp_path / "teste.db"))
+    database.criar_tabelas()
+    yield database.conectar()
+    database.fechar_conexoes()
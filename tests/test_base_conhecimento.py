@@ -0,0 +1,85 @@
+"""
+Busca da FAQ do Chatbot (base_conhecimento.py): normalização dos termos e
+ranqueamento BM25. As bases de teste são gravadas em arquivos temporários.
+"""
+
+import json
+
+import pytest
+
+from base_conhecimento import CAMINHO_FAQ, BaseConhecimento, tokenizar
+
+@pytest.fixture
+def criar_base(tmp_path):
+    """Grava uma lista de entradas em um faq.json temporário e devolve a base carregada."""
+    def criar(entradas):
+        caminho = tmp_path / "faq.json"
+        caminho.write_text(json.dumps(entradas, ensure_ascii=False), encoding="utf-8")
+        base = BaseConhecimento(str(caminho))
+        assert base.carregar()
+        return base
+    return criar
+
+def _perguntas(resultados):
+    return [entrada.pergunta for _, entrada in resultados]
+
+def test_tokenizar_ignora_acentos_palavras_vazias_e_plural():
+    assert tokenizar("Como lançar as Presenças dos alunos?") == ["lancar", "presenca", "aluno"]
+    assert tokenizar("Importações") == ["importacao"]
+
+def test_termo_raro_vale_mais_que_termo_comum(criar_base):
+    base = criar_base([
+        {"pergunta": "Aula de reposição", "resposta": "Aula extra."},
+        {"pergunta": "Aula normal", "resposta": "Aula do dia."},
+        {"pergunta": "Aula cancelada", "resposta": "Aula remarcada."},
+    ])
+    # 'aula' está em todas as entradas; 'reposicao' só em uma
+    assert _perguntas(base.buscar("aula de reposição"))[0] == "Aula de reposição"
+
+def test_texto_curto_ganha_do_longo_com_a_mesma_frequencia(criar_base):
+    base = criar_base([
+        {"pergunta": "Senha", "resposta": "Abra o perfil, clique em trocar, digite a atual, "
+                                          "a nova, confirme e salve as alterações do cadastro."},
+        {"pergunta": "Senha", "resposta": "Peça ao administrador."},
+        {"pergunta": "Outro assunto", "resposta": "Nada a ver."},
+    ])
+    resultados = base.buscar("senha")
+    assert [entrada.resposta for _, entrada in resultados][0] == "Peça ao administrador."
+    assert len(resultados) == 2
+
+def test_pergunta_e_chaves_valem_mais_que_a_resposta(criar_base):
+    base = criar_base([
+        {"pergunta": "Como apagar uma turma?", "resposta": "Use o boletim para conferir antes."},
+        {"pergunta": "Como gerar o boletim?", "resposta": "Menu Relatórios.", "chaves": "notas"},
+    ])
+    assert _perguntas(base.buscar("boletim")) == ["Como gerar o boletim?", "Como apagar uma turma?"]
+    assert _perguntas(base.buscar("notas")) == ["Como gerar o boletim?"]
+
+def test_resultados_em_ordem_decrescente_e_limitados(criar_base):
+    base = criar_base([{"pergunta": f"Pergunta {'chamada ' * vezes}", "resposta": "..."}
+                       for vezes in range(1, 6)])
+    resultados = base.buscar("chamada", limite=3)
+    pontuacoes = [pontuacao for pontuacao, _ in resultados]
+    assert len(resultados) == 3
+    assert pontuacoes == sorted(pontuacoes, reverse=True)
+
+def test_pergunta_sem_termos_conhecidos_nao_retorna_nada(criar_base):
+    base = criar_base([{"pergunta": "Como registrar aula?", "resposta": "..."}])
+    assert base.buscar("como de que?") == [] # Só palavras vazias
+    assert base.buscar("xilofone") == []
+
+def test_arquivo_invalido_deixa_a_base_vazia(tmp_path):
+    caminho = tmp_path / "faq.json"
+    caminho.write_text('[{"resposta": "sem pergunta"}]', encoding="utf-8")
+    base = BaseConhecimento(str(caminho))
+    assert not base.carregar()
+    assert base.erro
+    assert base.buscar("pergunta") == []
+    assert base.destaques() == []
+
+def test_faq_do_projeto():
+    base = BaseConhecimento(CAMINHO_FAQ)
+    assert base.carregar()
+    assert _perguntas(base.buscar("como exportar a frequência?"))[0] == "Como exportar a frequência para o Excel?"
+    assert _perguntas(base.buscar("Matricular estudantes"))[0] == "Como cadastrar aluno?"
+    assert "Como cadastrar aluno?" in base.destaques()
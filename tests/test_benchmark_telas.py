@@ -0,0 +1,51 @@
+"""
+Número de instruções SQL de cada caminho das telas (ferramentas/benchmark_telas.py).
+
+Ao contrário dos tempos, as contagens não dependem da máquina: servem de
+referência fixa. Uma contagem maior que a esperada é uma regressão (ex: uma
+consulta por linha voltou); se a mudança for intencional, ou se o caminho
+ficou mais barato, atualize INSTRUCOES_ESPERADAS.
+"""
+
+import pytest
+
+import database
+from ferramentas.gerar_dados import gerar_banco
+from ferramentas.benchmark_telas import medir
+
+# Turmas no formato da escala padrão de 'gerar_dados' (40 alunos e 200 aulas
+# por turma). As gravações contam também as instruções dos triggers de
+# 'resumo_alunos', que o trace do SQLite registra: crescem com os alunos.
+INSTRUCOES_ESPERADAS = {
+    "cache_turmas.obter": 1,
+    "Relatorio.carregar_aulas": 1,
+    "Relatorio.carregar_mais": 1,
+    "Relatorio.alternar_frequencia": 1,
+    # Contagem + uma consulta por lote de TAMANHO_LOTE_CSV (8000 presenças: 16 lotes
+    # cheios e o último, vazio): nenhum cursor fica aberto entre os lotes
+    "Relatorio.exportar_csv (lista)": 18,
+    "Relatorio.exportar_csv (matriz)": 3,
+    "Visualizacao.carregar_alunos_otimizado": 1,
+    "Visualizacao.alternar_historico": 1,
+    "Aula.carregar_alunos": 1,
+    "Aula.salvar_aula": 123,
+    "JanelaEditarAula.carregar_presencas": 1,
+    "JanelaEditarAula.salvar_alteracoes": 164, # O trigger da data não roda se a data não mudou
+}
+
+@pytest.fixture(scope="module")
+def medidas(tmp_path_factory):
+    """Mede todos os caminhos uma vez em um banco com duas turmas da escala padrão."""
+    caminho = tmp_path_factory.mktemp("benchmark") / "telas.db"
+    gerar_banco(str(caminho), turmas=2, alunos=80, aulas=400, atividades=40, criar_login=False)
+    try:
+        return medir(database.conectar(), repeticoes=3)
+    finally:
+        database.fechar_conexoes()
+
+def test_todos_os_caminhos_tem_referencia(medidas):
+    assert set(medidas) == set(INSTRUCOES_ESPERADAS)
+
+@pytest.mark.parametrize("caminho", sorted(INSTRUCOES_ESPERADAS))
+def test_instrucoes_nao_aumentaram(medidas, caminho):
+    assert medidas[caminho]["instrucoes"] <= INSTRUCOES_ESPERADAS[caminho]
@@ -0,0 +1,69 @@
+"""
+Exportação em lotes (repositorio/exportacao.py): cada lote é uma consulta
+própria, então outra conexão consegue gravar entre um lote e o próximo
+(com um cursor aberto, o lock SHARED barrava as gravações das telas).
+"""
+
+import csv
+import io
+import sqlite3
+
+import pytest
+
+import database
+from ferramentas.gerar_dados import gerar_banco
+from repositorio.exportacao import (SQL_EXPORTAR_CSV, contar_linhas_csv, contar_linhas_matriz,
+                                    exportar_csv_em_lotes, exportar_matriz_em_lotes)
+
+LOTE = 100
+
+@pytest.fixture
+def turma(tmp_path):
+    """Banco com duas turmas; devolve (caminho, conexão, id da primeira turma)."""
+    caminho = str(tmp_path / "exportacao.db")
+    gerar_banco(caminho, turmas=2, alunos=2 * 250, aulas=2 * 12, atividades=2, criar_login=False)
+    conn = database.conectar()
+    yield caminho, conn, conn.execute("SELECT MIN(id) FROM turmas").fetchone()[0]
+    database.fechar_conexoes()
+
+@pytest.mark.parametrize("exportar", [exportar_csv_em_lotes, exportar_matriz_em_lotes])
+def test_outra_conexao_grava_entre_os_lotes(turma, exportar):
+    caminho, conn, turma_id = turma
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete" # O modo em que o lock aparecia
+    lotes = exportar(conn, turma_id, io.StringIO(), tamanho_lote=LOTE)
+    assert next(lotes) == LOTE
+
+    # Como a gravação de uma tela na thread do Tk, enquanto a exportação está no meio
+    outra = sqlite3.connect(caminho, timeout=0.1)
+    try:
+        with outra:
+            outra.execute("INSERT INTO turmas (nome) VALUES ('Gravada durante a exportação')")
+    finally:
+        outra.close()
+
+    assert list(lotes)[-1] > LOTE
+
+def test_lista_em_lotes_igual_a_consulta_unica(turma):
+    _, conn, turma_id = turma
+    arquivo = io.StringIO()
+    totais = list(exportar_csv_em_lotes(conn, turma_id, arquivo, tamanho_lote=7))
+
+    arquivo.seek(0)
+    cabecalho, *linhas = csv.reader(arquivo)
+    consulta_unica = SQL_EXPORTAR_CSV.format(filtro="").replace("LIMIT ?", "")
+    esperadas = [[str(campo) for campo in linha[:4]] for linha in conn.execute(consulta_unica, (turma_id,))]
+    assert cabecalho == ["data", "tema", "nome", "status"]
+    assert linhas == esperadas
+    assert totais[-1] == len(esperadas) == contar_linhas_csv(conn, turma_id)
+
+def test_matriz_em_lotes_tem_todos_os_alunos_em_ordem(turma):
+    _, conn, turma_id = turma
+    arquivo = io.StringIO()
+    totais = list(exportar_matriz_em_lotes(conn, turma_id, arquivo, tamanho_lote=7))
+
+    arquivo.seek(0)
+    _, *linhas = csv.reader(arquivo)
+    nomes = [nome for nome, in conn.execute("SELECT nome FROM alunos WHERE turma_id = ? ORDER BY nome, id",
+                                            (turma_id,))]
+    assert [linha[0] for linha in linhas] == nomes
+    assert totais[-1] == len(nomes) == contar_linhas_matriz(conn, turma_id)
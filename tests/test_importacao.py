@@ -0,0 +1,68 @@
+"""
+Importação de alunos por CSV (importacao.py): alunos já existentes na turma
+e linhas repetidas no próprio arquivo são ignorados, inclusive entre lotes.
+"""
+
+import io
+
+from importacao import importar_alunos, importar_arquivo
+from repositorio.alunos import inserir_aluno
+from repositorio.turmas import inserir_turma
+
+def _alunos(conn):
+    """Pares (turma, aluno) gravados, em ordem."""
+    return conn.execute("""
+        SELECT t.nome, a.nome FROM alunos a JOIN turmas t ON t.id = a.turma_id ORDER BY t.nome, a.nome
+    """).fetchall()
+
+def test_ignora_alunos_ja_cadastrados_e_repetidos_no_arquivo(banco):
+    with banco:
+        inserir_aluno(banco, "Ana", inserir_turma(banco, "3º Ano A"))
+    arquivo = io.StringIO("nome,turma\n"
+                          "Ana,3º Ano A\n"     # Já cadastrada
+                          "Bruno,3º Ano A\n"
+                          "Bruno,3º Ano A\n"   # Repetido no arquivo (mesmo lote)
+                          "Ana,3º Ano B\n"     # Mesmo nome em outra turma: é outro aluno
+                          "Carla,3º Ano B\n"
+                          "Bruno,3º Ano A\n")  # Repetido em outro lote
+
+    resultado = importar_alunos(banco, arquivo, tamanho_lote=2)
+
+    assert (resultado.lidas, resultado.inseridas, resultado.duplicadas) == (6, 3, 3)
+    assert resultado.turmas_criadas == ["3º Ano B"]
+    assert _alunos(banco) == [("3º Ano A", "Ana"), ("3º Ano A", "Bruno"),
+                              ("3º Ano B", "Ana"), ("3º Ano B", "Carla")]
+
+def test_importar_de_novo_nao_duplica(banco):
+    conteudo = "nome,turma\nAna,3º Ano A\nBruno,3º Ano A\n"
+    importar_alunos(banco, io.StringIO(conteudo))
+
+    resultado = importar_alunos(banco, io.StringIO(conteudo))
+
+    assert (resultado.inseridas, resultado.duplicadas) == (0, 2)
+    assert resultado.turmas_criadas == []
+    assert len(_alunos(banco)) == 2
+
+def test_linhas_invalidas_sao_contadas_com_o_numero_da_linha(banco):
+    arquivo = io.StringIO("turma;nome\n" # Cabeçalho em outra ordem, separado por ';'
+                          "3º Ano A;Ana\n"
+                          ";Bruno\n"
+                          "3º Ano A;\n"
+                          "\n"
+                          "3º Ano A;Carla\n")
+
+    resultado = importar_alunos(banco, arquivo)
+
+    assert resultado.inseridas == 2
+    assert resultado.total_erros == 2
+    assert resultado.erros == [(3, "turma vazia para 'Bruno'"), (4, "nome do aluno vazio")]
+    assert _alunos(banco) == [("3º Ano A", "Ana"), ("3º Ano A", "Carla")]
+
+def test_arquivo_com_bom_e_sem_cabecalho(banco, tmp_path):
+    caminho = tmp_path / "alunos.csv"
+    caminho.write_text("Ana,3º Ano A\nAna,3º Ano A\n", encoding="utf-8-sig")
+
+    resultado = importar_arquivo(str(caminho), banco)
+
+    assert (resultado.lidas, resultado.inseridas, resultado.duplicadas) == (2, 1, 1)
+    assert _alunos(banco) == [("3º Ano A", "Ana")] # Sem o BOM no nome
@@ -0,0 +1,131 @@
+"""
+Executor de migrações (database.executar_migracoes): ordem das migrações,
+PRAGMA user_version, dry-run e rollback de uma migração que falha.
+
+O banco "antigo" é criado à mão, como as primeiras versões do SAGE criavam:
+'presencas' sem ON DELETE CASCADE, datas em DD/MM/AAAA, presenças órfãs e
+duplicadas, e user_version = 0.
+"""
+
+import sqlite3
+
+import pytest
+
+import database
+
+SCHEMA_ANTIGO = """
+    CREATE TABLE usuarios (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL,
+                           email TEXT UNIQUE NOT NULL, senha TEXT NOT NULL);
+    CREATE TABLE turmas (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL);
+    CREATE TABLE alunos (id INTEGER PRIMARY KEY AUTOINCREMENT, nome TEXT NOT NULL, turma_id INTEGER,
+                         FOREIGN KEY(turma_id) REFERENCES turmas(id));
+    CREATE TABLE aulas (id INTEGER PRIMARY KEY AUTOINCREMENT, turma_id INTEGER, data TEXT,
+                        tema TEXT, descricao TEXT, FOREIGN KEY(turma_id) REFERENCES turmas(id));
+    CREATE TABLE presencas (id INTEGER PRIMARY KEY AUTOINCREMENT, aula_id INTEGER, aluno_id INTEGER,
+                            presente INTEGER, FOREIGN KEY(aula_id) REFERENCES aulas(id),
+                            FOREIGN KEY(aluno_id) REFERENCES alunos(id));
+    CREATE TABLE atividades (id INTEGER PRIMARY KEY AUTOINCREMENT, turma_id INTEGER, nome TEXT NOT NULL,
+                             data_entrega TEXT, descricao TEXT,
+                             FOREIGN KEY(turma_id) REFERENCES turmas(id) ON DELETE CASCADE);
+
+    INSERT INTO turmas (id, nome) VALUES (1, '3º Ano A');
+    INSERT INTO alunos (id, nome, turma_id) VALUES (1, 'Ana', 1), (2, 'Bruno', 1);
+    INSERT INTO aulas (id, turma_id, data, tema) VALUES (1, 1, '05/03/2024', 'Frações'),
+                                                         (2, 1, '2024-03-12', 'Decimais');
+    INSERT INTO presencas (aula_id, aluno_id, presente) VALUES
+        (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 1),
+        (1, 2, 1),   -- duplicada: fica a mais recente (presente)
+        (99, 1, 1);  -- órfã: a aula 99 não existe
+    INSERT INTO atividades (turma_id, nome, data_entrega) VALUES (1, 'Lista 1', '20/03/2024');
+"""
+
+@pytest.fixture
+def banco_antigo(tmp_path):
+    """Banco no formato anterior às migrações (user_version = 0); devolve a conexão."""
+    database.usar_banco(str(tmp_path / "antigo.db"))
+    conn = database.conectar()
+    conn.execute("PRAGMA foreign_keys = OFF") # As órfãs só entram com as chaves desligadas
+    conn.executescript(SCHEMA_ANTIGO)
+    conn.execute(f"PRAGMA foreign_keys = {database.PRAGMAS.get('foreign_keys', 'OFF')}")
+    yield conn
+    database.fechar_conexoes()
+
+def _conteudo(conn):
+    """Todas as linhas das tabelas de dados (para comparar antes/depois)."""
+    return {tabela: conn.execute(f"SELECT * FROM {tabela} ORDER BY id").fetchall()
+            for tabela in ("alunos", "aulas", "presencas", "atividades")}
+
+def _registrando(funcao, versao, versoes_vistas):
+    """Envolve uma migração para anotar (versão, user_version no início dela)."""
+    def migracao(conn):
+        versoes_vistas.append((versao, database.versao_schema(conn)))
+        funcao(conn)
+    return migracao
+
+def test_versoes_das_migracoes_sao_sequenciais():
+    versoes = [versao for versao, _, _ in database.MIGRACOES]
+    assert versoes == list(range(1, len(versoes) + 1))
+
+def test_banco_novo_fica_na_ultima_versao(banco):
+    assert database.versao_schema(banco) == database.MIGRACOES[-1][0]
+    assert database.executar_migracoes(conn=banco) == []
+
+def test_migracoes_rodam_em_ordem_e_atualizam_user_version(banco_antigo, monkeypatch):
+    versoes_vistas = []
+    migracoes = [(versao, descricao, _registrando(funcao, versao, versoes_vistas))
+                 for versao, descricao, funcao in database.MIGRACOES]
+    monkeypatch.setattr(database, "MIGRACOES", migracoes)
+
+    executadas = database.executar_migracoes(conn=banco_antigo)
+
+    assert [versao for versao, _ in executadas] == [versao for versao, _, _ in migracoes]
+    # Cada migração enxerga o user_version da anterior já gravado
+    assert versoes_vistas == [(versao, versao - 1) for versao, _, _ in migracoes]
+    assert database.versao_schema(banco_antigo) == migracoes[-1][0]
+    assert database.executar_migracoes(conn=banco_antigo) == []
+
+def test_migracoes_corrigem_os_dados_antigos(banco_antigo):
+    database.executar_migracoes(conn=banco_antigo)
+
+    presencas = banco_antigo.execute("SELECT aula_id, aluno_id, presente FROM presencas ORDER BY aula_id, aluno_id").fetchall()
+    assert presencas == [(1, 1, 1), (1, 2, 1), (2, 1, 1), (2, 2, 1)] # Sem órfã e sem duplicada
+    assert banco_antigo.execute("SELECT data FROM aulas ORDER BY id").fetchall() == [("2024-03-05",), ("2024-03-12",)]
+    assert banco_antigo.execute("SELECT data_entrega FROM atividades").fetchone() == ("2024-03-20",)
+    assert database._presencas_tem_cascade(banco_antigo)
+    assert database.verificar_resumo_alunos(banco_antigo) == []
+
+    with pytest.raises(sqlite3.IntegrityError):
+        banco_antigo.execute("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (1, 1, 0)")
+
+def test_dry_run_lista_as_pendentes_sem_gravar_nada(banco_antigo):
+    antes = _conteudo(banco_antigo)
+
+    executadas = database.executar_migracoes(dry_run=True, conn=banco_antigo)
+
+    assert executadas == [(versao, descricao) for versao, descricao, _ in database.MIGRACOES]
+    assert database.versao_schema(banco_antigo) == 0
+    assert _conteudo(banco_antigo) == antes
+    assert not banco_antigo.execute(
+        "SELECT 1 FROM sqlite_master WHERE name IN ('resumo_alunos', 'idx_presencas_aula_aluno')").fetchall()
+    # Depois do dry-run, a execução real encontra as mesmas pendentes
+    assert database.executar_migracoes(conn=banco_antigo) == executadas
+
+def test_dry_run_em_banco_atualizado_nao_faz_nada(banco):
+    assert database.executar_migracoes(dry_run=True, conn=banco) == []
+
+def test_migracao_com_erro_mantem_a_versao_anterior(banco, monkeypatch):
+    ultima = database.MIGRACOES[-1][0]
+
+    def migracao_com_erro(conn):
+        conn.execute("INSERT INTO turmas (nome) VALUES ('Gravada antes do erro')")
+        conn.execute("SELECT * FROM tabela_que_nao_existe")
+
+    monkeypatch.setattr(database, "MIGRACOES",
+                        database.MIGRACOES + [(ultima + 1, "Migração com erro", migracao_com_erro)])
+
+    with pytest.raises(sqlite3.OperationalError):
+        database.executar_migracoes(conn=banco)
+
+    assert database.versao_schema(banco) == ultima
+    assert banco.execute("SELECT COUNT(*) FROM turmas").fetchone()[0] == 0
+    assert banco.execute("PRAGMA foreign_keys").fetchone()[0] == 1 # Religado no 'finally'
@@ -0,0 +1,23 @@
+"""
+Orçamento de import da abertura do app (ferramentas/orcamento_imports.py):
+o import de 'main' cabe em ORCAMENTO_MS e não carrega os módulos pesados
+que só são usados sob demanda (tkcalendar, pandas).
+"""
+
+import pytest
+
+from ferramentas.orcamento_imports import IMPORTS_ADIADOS, ORCAMENTO_MS, REPETICOES, medir_imports
+
+@pytest.fixture(scope="module")
+def tempos():
+    """Medição do import de 'main' (a menor de REPETICOES, como na ferramenta)."""
+    medicoes = [medir_imports() for _ in range(REPETICOES)]
+    return min(medicoes, key=lambda t: t.get("main", 0))
+
+def test_import_de_main_cabe_no_orcamento(tempos):
+    assert "main" in tempos
+    assert tempos["main"] <= ORCAMENTO_MS
+
+@pytest.mark.parametrize("modulo", IMPORTS_ADIADOS)
+def test_modulo_pesado_nao_e_importado_na_abertura(tempos, modulo):
+    assert modulo not in tempos
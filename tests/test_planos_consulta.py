@@ -0,0 +1,18 @@
+"""
+Planos das consultas das telas (database.verificar_planos_consulta) no
+schema completo: sem varredura de tabela e com 'presencas' lida só pelos
+índices de cobertura.
+"""
+
+import database
+
+def test_planos_das_telas_usam_indices(banco):
+    resultados = database.verificar_planos_consulta(banco)
+    assert resultados
+    assert [(nome, plano) for nome, ok, plano in resultados if not ok] == []
+
+def test_verificacao_recusa_busca_sem_cobertura_em_presencas(banco):
+    # Sem o índice de cobertura, as buscas por aula vão até a tabela
+    banco.execute("DROP INDEX idx_presencas_aula")
+    reprovadas = [nome for nome, ok, _ in database.verificar_planos_consulta(banco) if not ok]
+    assert "JanelaEditarAula.carregar_presencas" in reprovadas
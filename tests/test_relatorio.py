@@ -0,0 +1,65 @@
+"""
+Consultas do Relatório (repositorio/aulas.py): número fixo de instruções SQL
+por página e por aula expandida, qualquer que seja o tamanho da turma (o N+1
+antigo fazia uma consulta de presenças por aula).
+"""
+
+import pytest
+
+import database
+from ferramentas.gerar_dados import gerar_banco
+from repositorio.aulas import TAMANHO_PAGINA, buscar_pagina_aulas, buscar_presencas_aula
+
+AULAS = 95 # Não é múltiplo de TAMANHO_PAGINA: a última página vem incompleta
+ALUNOS = 30
+
+@pytest.fixture
+def turma(tmp_path):
+    """Banco com duas turmas; devolve (conexão, id da primeira turma)."""
+    gerar_banco(str(tmp_path / "relatorio.db"), turmas=2, alunos=2 * ALUNOS, aulas=2 * AULAS,
+                atividades=2, criar_login=False)
+    conn = database.conectar()
+    yield conn, conn.execute("SELECT MIN(id) FROM turmas").fetchone()[0]
+    database.fechar_conexoes()
+
+def test_primeira_pagina_usa_uma_instrucao(turma):
+    conn, turma_id = turma
+    with database.contar_instrucoes(conn) as instrucoes:
+        pagina = buscar_pagina_aulas(conn, turma_id)
+    assert len(instrucoes) == 1
+    assert len(pagina) == TAMANHO_PAGINA
+    assert all(aula.total == ALUNOS for aula in pagina)
+
+def test_expandir_aula_usa_uma_instrucao(turma):
+    conn, turma_id = turma
+    aula = buscar_pagina_aulas(conn, turma_id)[0]
+    with database.contar_instrucoes(conn) as instrucoes:
+        presencas = buscar_presencas_aula(conn, aula.id)
+    assert len(instrucoes) == 1
+    assert len(presencas) == aula.total
+    assert sum(presente for _, presente in presencas) == aula.presentes
+
+def test_paginacao_por_chave_percorre_todas_as_aulas_em_ordem(turma):
+    conn, turma_id = turma
+    aulas, depois_de, paginas = [], None, 0
+    while True:
+        with database.contar_instrucoes(conn) as instrucoes:
+            pagina = buscar_pagina_aulas(conn, turma_id, TAMANHO_PAGINA, depois_de)
+        assert len(instrucoes) == 1 # Cada página custa uma consulta, mesmo as do fim
+        aulas.extend(pagina)
+        paginas += 1
+        if len(pagina) < TAMANHO_PAGINA:
+            break
+        depois_de = (pagina[-1].data, pagina[-1].id)
+
+    esperadas = conn.execute("SELECT id FROM aulas WHERE turma_id = ? ORDER BY data DESC, id DESC",
+                             (turma_id,)).fetchall()
+    assert [aula.id for aula in aulas] == [linha[0] for linha in esperadas]
+    assert paginas == AULAS // TAMANHO_PAGINA + 1
+
+def test_totais_da_pagina_batem_com_as_presencas(turma):
+    conn, turma_id = turma
+    for aula in buscar_pagina_aulas(conn, turma_id):
+        presentes, total = conn.execute("SELECT SUM(presente), COUNT(*) FROM presencas WHERE aula_id = ?",
+                                        (aula.id,)).fetchone()
+        assert (aula.presentes, aula.total) == (presentes, total)
@@ -0,0 +1,119 @@
+"""
+Tabela 'resumo_alunos' (mantida por triggers, ver database.py): depois de
+qualquer escrita feita pelas telas, 'verificar_resumo_alunos' não pode
+encontrar diferenças em relação ao recálculo a partir de 'presencas'.
+"""
+
+import pytest
+
+import database
+from repositorio.alunos import buscar_resumo_alunos, deletar_aluno, inserir_aluno
+from repositorio.aulas import atualizar_aula, deletar_aula, registrar_aula
+from repositorio.turmas import inserir_turma
+
+@pytest.fixture
+def turma(banco):
+    """Turma com três alunos e duas aulas; devolve (conexão, turma_id, ids dos alunos, ids das aulas)."""
+    with banco:
+        turma_id = inserir_turma(banco, "3º Ano A")
+        alunos = [inserir_aluno(banco, nome, turma_id) for nome in ("Ana", "Bruno", "Carla")]
+        aulas = [registrar_aula(banco, turma_id, "2024-03-05", "Frações", "",
+                                [(alunos[0], 1), (alunos[1], 0), (alunos[2], 1)]),
+                 registrar_aula(banco, turma_id, "2024-03-12", "Decimais", "",
+                                [(alunos[0], 1), (alunos[1], 1)])]
+    return banco, turma_id, alunos, aulas
+
+def _totais(conn, turma_id):
+    """{nome: (presencas, faltas, ultima_aula)} lidos do resumo."""
+    return {r.nome: (r.presencas, r.faltas, r.ultima_aula) for r in buscar_resumo_alunos(conn, turma_id)}
+
+def test_resumo_acompanha_o_registro_de_aulas(turma):
+    conn, turma_id, _, _ = turma
+    assert database.verificar_resumo_alunos(conn) == []
+    assert _totais(conn, turma_id) == {"Ana": (2, 0, "2024-03-12"),
+                                       "Bruno": (1, 1, "2024-03-12"),
+                                       "Carla": (1, 0, "2024-03-05")}
+
+def test_resumo_acompanha_a_edicao_de_aula(turma):
+    conn, turma_id, alunos, aulas = turma
+    with conn:
+        # Muda a data (ultima_aula de todos) e troca presença por falta
+        atualizar_aula(conn, aulas[1], "2024-02-27", "Decimais", "", [(alunos[0], 0), (alunos[1], 1)])
+    assert database.verificar_resumo_alunos(conn) == []
+    assert _totais(conn, turma_id)["Ana"] == (1, 1, "2024-03-05")
+
+def test_edicao_sem_mudancas_nao_dispara_os_triggers(turma):
+    conn, _, alunos, aulas = turma
+    # Um valor que qualquer recálculo dos triggers sobrescreveria
+    with conn:
+        conn.execute("UPDATE resumo_alunos SET ultima_aula = 'marcador' WHERE aluno_id = ?", (alunos[0],))
+        # A tela regrava data e presenças de todos, mesmo sem alteração
+        atualizar_aula(conn, aulas[1], "2024-03-12", "Decimais (revisão)", "", [(alunos[0], 1), (alunos[1], 1)])
+    assert conn.execute("SELECT ultima_aula FROM resumo_alunos WHERE aluno_id = ?", (alunos[0],)).fetchone() == ("marcador",)
+
+def test_ultima_aula_volta_ao_apagar_a_mais_recente(turma):
+    conn, turma_id, _, aulas = turma
+    with conn:
+        deletar_aula(conn, aulas[1]) # Presenças saem pelo CASCADE, com a aula já apagada
+    assert database.verificar_resumo_alunos(conn) == []
+    assert _totais(conn, turma_id)["Ana"] == (1, 0, "2024-03-05")
+
+def test_resumo_acompanha_as_exclusoes(turma):
+    conn, turma_id, alunos, aulas = turma
+    with conn:
+        deletar_aula(conn, aulas[0])
+    assert database.verificar_resumo_alunos(conn) == []
+    assert _totais(conn, turma_id)["Carla"] == (0, 0, None)
+
+    with conn:
+        deletar_aluno(conn, alunos[1])
+    assert database.verificar_resumo_alunos(conn) == []
+    assert conn.execute("SELECT COUNT(*) FROM resumo_alunos WHERE aluno_id = ?", (alunos[1],)).fetchone()[0] == 0
+
+def test_diferenca_e_detectada_e_corrigida(turma):
+    conn, _, alunos, _ = turma
+    with conn:
+        conn.execute("UPDATE resumo_alunos SET presencas = 99 WHERE aluno_id = ?", (alunos[0],))
+        conn.execute("DELETE FROM resumo_alunos WHERE aluno_id = ?", (alunos[2],))
+        conn.execute("INSERT INTO resumo_alunos (aluno_id) VALUES (12345)") # Aluno inexistente
+
+    diferencas = database.verificar_resumo_alunos(conn)
+    assert sorted(diferencas, key=lambda d: d[0]) == [
+        (alunos[0], (2, 2, 0, "2024-03-12"), (2, 99, 0, "2024-03-12")),
+        (alunos[2], (1, 1, 0, "2024-03-05"), None),
+        (12345, None, (0, 0, 0, None)),
+    ]
+
+    assert database.verificar_resumo_alunos(conn, corrigir=True) == diferencas
+    assert database.verificar_resumo_alunos(conn) == []
+
+def test_carga_em_massa_recalcula_o_resumo_e_recria_os_triggers(turma):
+    conn, turma_id, alunos, _ = turma
+    triggers = "SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+    antes = conn.execute(triggers).fetchall()
+
+    with database.carga_em_massa(conn):
+        assert conn.execute(triggers).fetchall() == [] # Suspensos durante a carga
+        aulas = [conn.execute("INSERT INTO aulas (turma_id, data, tema) VALUES (?, ?, 'Carga')",
+                              (turma_id, f"2024-04-{dia:02d}")).lastrowid for dia in range(1, 21)]
+        conn.executemany("INSERT INTO presencas (aula_id, aluno_id, presente) VALUES (?, ?, ?)",
+                         [(aula_id, aluno_id, (aula_id + aluno_id) % 2)
+                          for aula_id in aulas for aluno_id in alunos])
+
+    assert conn.execute(triggers).fetchall() == antes
+    assert database.verificar_resumo_alunos(conn) == []
+    assert _totais(conn, turma_id)["Ana"][2] == "2024-04-20"
+
+def test_carga_em_massa_com_erro_desfaz_tudo(turma):
+    conn, _, alunos, aulas = turma
+    triggers = "SELECT name FROM sqlite_master WHERE type = 'trigger' ORDER BY name"
+    antes = conn.execute(triggers).fetchall()
+
+    with pytest.raises(RuntimeError):
+        with database.carga_em_massa(conn):
+            conn.execute("DELETE FROM presencas WHERE aula_id = ?", (aulas[0],))
+            raise RuntimeError("falha no meio da carga")
+
+    assert conn.execute(triggers).fetchall() == antes
+    assert conn.execute("SELECT COUNT(*) FROM presencas").fetchone()[0] == 5
+    assert database.verificar_resumo_alunos(conn) == []
@@ -7,6 +7,8 @@ cadastrar novas turmas (ex: "3º Ano A", "2º Ano B").
 
 import customtkinter as ctk
 from database import conectar
+from cache_turmas import cache_turmas
+from repositorio.turmas import inserir_turma
 import sqlite3
 
 class Turma(ctk.CTkFrame):
@@ -93,9 +95,10 @@ class Turma(ctk.CTkFrame):
 
         try:
             with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO turmas (nome) VALUES (?)", (nome,))
+                inserir_turma(conn, nome)
             
+            # Avisa as telas com dropdown de turma (o cache será recarregado)
+            cache_turmas.invalidar()
             self.status.configure(text="Turma cadastrada com sucesso!", text_color="green")
             self.nome.delete(0, 'end') # Limpa o campo
         except sqlite3.Error as e:
@@ -9,10 +9,14 @@ Este módulo define a classe 'Visualizacao', que permite:
 """
 
 import customtkinter as ctk
-from database import conectar
+from cache_turmas import cache_turmas
+from executor_banco import executar, executor
+from datas import para_exibicao
+from repositorio.alunos import (buscar_resumo_alunos, buscar_historico_aluno, renomear_aluno,
+                                deletar_aluno as deletar_aluno_no_banco)
 import sqlite3
-from collections import defaultdict # Usado para agrupar dados de alunos
 from dialogos import JanelaConfirmacao # Importa o pop-up de confirmação
+from lista_virtual import ListaVirtual
 
 class Visualizacao(ctk.CTkFrame):
     """
@@ -62,15 +66,21 @@ class Visualizacao(ctk.CTkFrame):
         self.dropdown_turma = ctk.CTkOptionMenu(self.painel_direito,
                                                 values=self.turmas, 
                                                 variable=self.turma_selecionada, 
-                                                command=self.carregar_alunos_otimizado, 
+                                                command=cache_turmas.com_id(self.carregar_alunos_otimizado), 
                                                 width=300, height=40,
                                                 fg_color="white", button_color="#E0E0E0",
                                                 text_color="#24232F", dropdown_fg_color="white",
                                                 dropdown_text_color="#24232F")
         self.dropdown_turma.pack(pady=10)
 
-        # Frame de Rolagem para os cards dos alunos
-        self.frame_alunos = ctk.CTkScrollableFrame(self.painel_direito, fg_color="#EAEAEA", corner_radius=10)
+        # Lista virtual: só os cards/registros visíveis viram widgets
+        self.frame_alunos = ListaVirtual(self.painel_direito,
+                                         tipos={
+                                             "aluno": (58, self._criar_linha_aluno, self._preencher_linha_aluno),
+                                             "registro": (24, self._criar_linha_registro, self._preencher_linha_registro),
+                                         },
+                                         chave=lambda tipo, dados: dados[0] if tipo == "aluno" else None,
+                                         fg_color="#EAEAEA", corner_radius=10)
         self.frame_alunos.pack(pady=10, fill="both", expand=True)
         
         self.status = ctk.CTkLabel(self.painel_direito, text="", text_color="green")
@@ -82,8 +92,12 @@ class Visualizacao(ctk.CTkFrame):
         self.btn_voltar.pack(pady=10)
         # --- Fim do Painel Direito ---
 
-        # Gatilho para atualizar a tela quando ela fica visível
-        self.bind("<Visibility>", self.atualizar_visualizacao)
+        # Atualiza o dropdown quando uma turma for criada/alterada
+        cache_turmas.assinar(self.atualizar_dropdown)
+
+    def ao_mostrar(self):
+        """Gancho de ativação (ver Aplicativo.mostrar_tela): recarrega turmas e alunos da turma."""
+        self.atualizar_visualizacao()
 
     def atualizar_visualizacao(self, event=None):
         """
@@ -91,123 +105,150 @@ class Visualizacao(ctk.CTkFrame):
         """
         print("Atualizando visualização...")
         self.status.configure(text="") 
-        turma_anterior = self.turma_selecionada.get()
+        self.carregar_alunos_otimizado(self.atualizar_dropdown())
+
+    def atualizar_dropdown(self):
+        """
+        Atualiza o dropdown de turmas e devolve o id da turma selecionada
+        (igual ao aula.py). Os alunos são recarregados só em 'ao_mostrar'.
+        """
         self.turmas = self.carregar_turmas()
-        default_value = self.turmas[0] if self.turmas else "Nenhuma turma cadastrada"
-        
-        if self.turmas:
-            self.dropdown_turma.configure(values=self.turmas)
-            if turma_anterior in self.turmas:
-                self.dropdown_turma.set(turma_anterior)
-            else:
-                self.dropdown_turma.set(default_value)
-            # Recarrega os alunos da turma que está selecionada
-            self.carregar_alunos_otimizado(self.dropdown_turma.get())
-        else:
+        if not self.turmas:
             self.dropdown_turma.configure(values=["Nenhuma turma cadastrada"])
             self.dropdown_turma.set("Nenhuma turma cadastrada")
-            self.carregar_alunos_otimizado("Nenhuma turma cadastrada")
+            return None
+        self.dropdown_turma.configure(values=self.turmas)
+        turma = cache_turmas.turma(self.turma_selecionada.get()) or cache_turmas.turma(self.turmas[0])
+        self.dropdown_turma.set(turma.rotulo)
+        return turma.id
 
     def carregar_turmas(self):
         """
-        Busca a lista de turmas no banco de dados. (Igual ao aluno.py)
+        Retorna a lista de turmas do cache compartilhado em memória (igual ao aluno.py).
         
         Returns:
             list: Lista de strings formatadas "ID - Nome" ou lista vazia.
         """
         try:
-            with conectar() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT id, nome FROM turmas ORDER BY nome")
-                turmas = cursor.fetchall()
-                return [f"{id} - {nome}" for id, nome in turmas]
+            # Lista compartilhada em memória: só consulta o banco se as turmas mudaram
+            return cache_turmas.rotulos()
         except sqlite3.Error as e:
             self.status.configure(text=f"Erro ao carregar turmas: {e}", text_color="red")
             return []
 
-    def carregar_alunos_otimizado(self, turma_str):
+    def carregar_alunos_otimizado(self, turma_id):
         """
-        Carrega todos os alunos e seus dados de presença com UMA ÚNICA query (JOIN).
-        Isso evita o problema de "N+1 queries" (fazer uma query por aluno).
+        Carrega os alunos da turma com os seus totais de presença, lidos da
+        tabela 'resumo_alunos' (uma linha por aluno). O histórico de cada
+        aluno só é buscado quando o card é expandido.
+        A query roda no executor do banco; ao trocar de turma rapidamente,
+        o pedido da turma anterior é cancelado.
 
         Args:
-            turma_str (str): A string da turma selecionada (ex: "1 - 3º Ano A").
+            turma_id (int): ID da turma selecionada, ou None se não houver turmas.
         """
-        for widget in self.frame_alunos.winfo_children():
-            widget.destroy()
         self.status.configure(text="") 
 
-        if not turma_str or turma_str == "Nenhuma turma cadastrada":
-            if turma_str == "Nenhuma turma cadastrada":
-                ctk.CTkLabel(self.frame_alunos, text="Cadastre uma turma primeiro.", text_color="#555555").pack(pady=10)
+        if turma_id is None:
+            executor.cancelar("Visualizacao.alunos")
+            self.frame_alunos.limpar("Cadastre uma turma primeiro.")
             return
 
-        try:
-            turma_id = turma_str.split(" - ")[0]
-            
-            # defaultdict cria um dicionário onde cada novo item é inicializado
-            # com um dicionário padrão. Usamos para agrupar presenças por aluno.
-            alunos_dados = defaultdict(lambda: {"nome": "", "registros": [], "id": 0})
-
-            with conectar() as conn:
-                cursor = conn.cursor()
-                # Query OTIMIZADA: Busca todos os alunos da turma e, via LEFT JOIN,
-                # todos os seus registros de presença e datas de aula de uma vez.
-                sql = """
-                    SELECT a.id, a.nome, au.data, p.presente
-                    FROM alunos a
-                    LEFT JOIN presencas p ON a.id = p.aluno_id
-                    LEFT JOIN aulas au ON p.aula_id = au.id
-                    WHERE a.turma_id = ?
-                    ORDER BY a.nome, au.data DESC
-                """
-                cursor.execute(sql, (turma_id,))
-                registros = cursor.fetchall()
-
-            if not registros:
-                ctk.CTkLabel(self.frame_alunos, text="Nenhum aluno cadastrado nesta turma.", text_color="#555555").pack(pady=10)
+        self.frame_alunos.limpar("Carregando alunos...")
+        executar(lambda conn: buscar_resumo_alunos(conn, turma_id),
+                 ao_concluir=self._alunos_carregados,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar alunos: {e}", text_color="red"),
+                 chave="Visualizacao.alunos", dono=self)
+
+    def _alunos_carregados(self, alunos):
+        """
+        Monta a lista com um card (recolhido) por aluno.
+        """
+        itens = [("aluno", (aluno_id, nome, presentes, faltas, ultima_aula, False))
+                 for aluno_id, nome, presentes, faltas, ultima_aula in alunos]
+        self.frame_alunos.definir_itens(itens, "Nenhum aluno cadastrado nesta turma.")
+
+    def alternar_historico(self, aluno_id):
+        """
+        Expande (buscando no banco) ou recolhe o histórico de presença de um aluno.
+        """
+        bloco = self.frame_alunos.bloco(aluno_id, ("registro",))
+        if bloco is None:
+            return
+        inicio, fim = bloco
+        dados = self.frame_alunos.itens()[inicio][1]
+        if dados[5]: # Já expandido: recolhe
+            self.frame_alunos.atualizar_item(inicio, ("aluno", dados[:5] + (False,)))
+            self.frame_alunos.remover_itens(inicio + 1, fim)
+            return
+
+        def expandir(registros):
+            # A lista pode ter mudado enquanto o histórico era buscado
+            indice = self.frame_alunos.indice(aluno_id)
+            if indice is None or self.frame_alunos.itens()[indice][1][5]:
                 return
+            atual = self.frame_alunos.itens()[indice][1]
+            self.frame_alunos.atualizar_item(indice, ("aluno", atual[:5] + (True,)))
+            self.frame_alunos.inserir_itens(indice + 1, [("registro", r) for r in registros])
 
-            # Agrupa os resultados em Python (muito mais rápido que N+1 queries)
-            for aluno_id, nome, data, presente in registros:
-                alunos_dados[aluno_id]["nome"] = nome
-                alunos_dados[aluno_id]["id"] = aluno_id
-                if data is not None: # Adiciona o registro apenas se houver um
-                    alunos_dados[aluno_id]["registros"].append((data, presente))
-
-            # Agora, constrói a UI iterando sobre os dados agrupados
-            for aluno_id, dados in alunos_dados.items():
-                nome = dados["nome"]
-                registros_presenca = dados["registros"]
-                
-                total = len(registros_presenca)
-                presentes = sum(1 for _, p in registros_presenca if p)
-                faltas = total - presentes
-                
-                # Card individual para cada aluno
-                frame_aluno = ctk.CTkFrame(self.frame_alunos, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
-                frame_aluno.pack(fill="x", padx=10, pady=5)
-                
-                ctk.CTkLabel(frame_aluno, text=f"👤 {nome} — Presenças: {presentes} | Faltas: {faltas}", font=("Segoe UI", 15, "bold"), text_color="#24232F").pack(anchor="w", padx=10, pady=5)
-
-                # Lista de presenças do aluno
-                for data, presente in registros_presenca:
-                    status = "✅ Presente" if presente else "❌ Ausente"
-                    ctk.CTkLabel(frame_aluno, text=f"{data}: {status}", font=("Segoe UI", 13), text_color="#444444").pack(anchor="w", padx=40)
-
-                # Botões de Ação (Editar/Deletar)
-                btn_frame = ctk.CTkFrame(frame_aluno, fg_color="transparent")
-                btn_frame.pack(anchor="e", padx=10, pady=5)
-                
-                ctk.CTkButton(btn_frame, text="Editar", command=lambda id=aluno_id, n=nome: self.editar_aluno(id, n), 
-                              fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9", width=80, height=30, corner_radius=8).pack(side="left", padx=5)
-                ctk.CTkButton(btn_frame, text="Deletar", command=lambda id=aluno_id: self.deletar_aluno(id), 
-                              fg_color="#FF6B6B", text_color="white", hover_color="#FF5252", width=80, height=30, corner_radius=8).pack(side="left", padx=5)
+        executar(lambda conn: buscar_historico_aluno(conn, aluno_id),
+                 ao_concluir=expandir,
+                 ao_falhar=lambda e: self.status.configure(text=f"Erro ao carregar histórico: {e}", text_color="red"),
+                 chave=f"Visualizacao.historico.{aluno_id}", dono=self)
 
-        except sqlite3.Error as e:
-            self.status.configure(text=f"Erro ao carregar alunos: {e}", text_color="red")
-        except IndexError:
-             self.status.configure(text=f"Erro ao processar o nome da turma.", text_color="red")
+    # --- Linhas da lista virtual ---
+
+    def _criar_linha_aluno(self, parent):
+        """Cria o widget (reutilizável) do card de resumo de um aluno."""
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
+        linha.pack_propagate(False)
+
+        frame_aluno = ctk.CTkFrame(linha, fg_color="white", corner_radius=10, border_width=1, border_color="#E0E0E0")
+        frame_aluno.pack(fill="both", expand=True, padx=10, pady=(8, 0))
+
+        # Botões de Ação (Editar/Deletar) à direita do resumo
+        btn_frame = ctk.CTkFrame(frame_aluno, fg_color="transparent")
+        btn_frame.pack(side="right", padx=10, pady=5)
+        ctk.CTkButton(btn_frame, text="Editar", command=lambda: self.editar_aluno(linha.dados[0], linha.dados[1]), 
+                      fg_color="#A9A9A9", text_color="#24232F", hover_color="#B9B9B9", width=80, height=30, corner_radius=8).pack(side="left", padx=5)
+        ctk.CTkButton(btn_frame, text="Deletar", command=lambda: self.deletar_aluno(linha.dados[0]), 
+                      fg_color="#FF6B6B", text_color="white", hover_color="#FF5252", width=80, height=30, corner_radius=8).pack(side="left", padx=5)
+
+        text_frame = ctk.CTkFrame(frame_aluno, fg_color="transparent")
+        text_frame.pack(side="left", fill="x", expand=True, padx=10)
+        linha.resumo = ctk.CTkLabel(text_frame, text="", font=("Segoe UI", 15, "bold"), text_color="#24232F", height=22)
+        linha.resumo.pack(anchor="w")
+        # Botão que expande/recolhe o histórico (recolhido por padrão)
+        linha.historico = ctk.CTkButton(text_frame, text="", font=("Segoe UI", 12, "italic"), height=18,
+                                        fg_color="transparent", hover_color="#F0F0F0", text_color="#555555",
+                                        anchor="w", command=lambda: self.alternar_historico(linha.dados[0]))
+        linha.historico.pack(anchor="w")
+        return linha
+
+    def _preencher_linha_aluno(self, linha, dados):
+        """Mostra nome e totais de um aluno no card de resumo."""
+        aluno_id, nome, presentes, faltas, ultima_aula, expandido = dados
+        linha.dados = dados
+        linha.resumo.configure(text=f"👤 {nome} — Presenças: {presentes} | Faltas: {faltas}")
+        if presentes + faltas:
+            seta = "▼" if expandido else "▶"
+            linha.historico.configure(text=f"{seta} Histórico (última aula: {para_exibicao(ultima_aula)})", state="normal")
+        else:
+            linha.historico.configure(text="Nenhum registro de presença.", state="disabled")
+
+    def _criar_linha_registro(self, parent):
+        """Cria o widget (reutilizável) de um registro de presença."""
+        linha = ctk.CTkFrame(parent, fg_color="transparent")
+        linha.pack_propagate(False)
+        linha.texto = ctk.CTkLabel(linha, text="", font=("Segoe UI", 13), text_color="#444444", height=22)
+        linha.texto.pack(anchor="w", padx=50)
+        return linha
+
+    def _preencher_linha_registro(self, linha, dados):
+        """Mostra 'Data: Presente/Ausente' em uma linha de registro."""
+        data, presente = dados
+        status = "✅ Presente" if presente else "❌ Ausente"
+        linha.texto.configure(text=f"{para_exibicao(data)}: {status}")
 
     def editar_aluno(self, aluno_id, nome_atual):
         """
@@ -239,15 +280,50 @@ class Visualizacao(ctk.CTkFrame):
         novo_nome = dialog.get_input() # Captura o texto digitado
         
         if novo_nome and novo_nome.strip():
-            try:
-                with conectar() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE alunos SET nome = ? WHERE id = ?", (novo_nome.strip(), aluno_id))
-                self.status.configure(text="Aluno editado com sucesso!", text_color="green")
-                # Recarrega a lista para mostrar a mudança
-                self.carregar_alunos_otimizado(self.turma_selecionada.get()) 
-            except sqlite3.Error as e:
-                self.status.configure(text=f"Erro ao editar: {str(e)}", text_color="red")
+            nome = novo_nome.strip()
+            # O diálogo já fechou: o resultado é entregue a este frame ('dono=self'),
+            # para o card ser atualizado sempre que a gravação terminar
+            executar(lambda conn: renomear_aluno(conn, aluno_id, nome),
+                     ao_concluir=lambda _: self._edicao_salva(aluno_id, nome),
+                     ao_falhar=lambda e: self.status.configure(text=f"Erro ao editar: {e}", text_color="red"),
+                     dono=self)
+
+    def _edicao_salva(self, aluno_id, nome):
+        """Chamado (na thread do Tk) quando o novo nome foi gravado."""
+        self.status.configure(text="Aluno editado com sucesso!", text_color="green")
+        # Atualiza só o card do aluno (sem recarregar a lista)
+        self._aluno_renomeado(aluno_id, nome)
+
+    def _aluno_renomeado(self, aluno_id, nome):
+        """
+        Atualiza o card de um aluno renomeado. Como a lista é ordenada por
+        nome, o card (com o seu histórico) é movido se a posição mudar.
+        """
+        bloco = self.frame_alunos.bloco(aluno_id, ("registro",))
+        if bloco is None:
+            return
+        inicio, fim = bloco
+        itens = self.frame_alunos.itens()
+        cabecalho = ("aluno", (aluno_id, nome) + itens[inicio][1][2:])
+
+        # Posição do card na ordem alfabética, sem contar ele mesmo
+        posicao = None
+        for indice, (tipo, dados) in enumerate(itens):
+            if tipo == "aluno" and indice != inicio and dados[1] > nome:
+                posicao = indice
+                break
+        if posicao is None:
+            posicao = len(itens)
+
+        if posicao in (inicio, fim):
+            # Continua no mesmo lugar: só o card muda
+            self.frame_alunos.atualizar_item(inicio, cabecalho)
+            return
+        registros = itens[inicio + 1:fim]
+        if posicao > inicio:
+            posicao -= fim - inicio # Índices depois do bloco andam para trás ao removê-lo
+        self.frame_alunos.remover_itens(inicio, fim)
+        self.frame_alunos.inserir_itens(posicao, [cabecalho] + registros)
 
     def deletar_aluno(self, aluno_id):
         """
@@ -260,20 +336,25 @@ class Visualizacao(ctk.CTkFrame):
         self.wait_window(dialog) # Espera a janela do diálogo fechar
         
         if dialog.obter_resposta(): # Se o usuário clicou "Sim"
-            try:
-                with conectar() as conn:
-                    cursor = conn.cursor()
-                    # Graças ao "ON DELETE CASCADE" no DB, só precisamos deletar o aluno.
-                    # As presenças são deletadas automaticamente.
-                    cursor.execute("DELETE FROM alunos WHERE id = ?", (aluno_id,))
-                
-                self.status.configure(text="Aluno deletado com sucesso!", text_color="green")
-                self.carregar_alunos_otimizado(self.turma_selecionada.get()) # Recarrega a lista
-            except sqlite3.Error as e:
-                self.status.configure(text=f"Erro ao deletar: {str(e)}", text_color="red")
+            # Graças ao "ON DELETE CASCADE" no DB, só precisamos deletar o aluno.
+            # As presenças são deletadas automaticamente.
+            executar(lambda conn: deletar_aluno_no_banco(conn, aluno_id),
+                     ao_concluir=lambda _: self._aluno_deletado(aluno_id),
+                     ao_falhar=lambda e: self.status.configure(text=f"Erro ao deletar: {e}", text_color="red"),
+                     dono=self)
         else:
             self.status.configure(text="Deleção cancelada.", text_color="#A9A9A9")
 
+    def _aluno_deletado(self, aluno_id):
+        """Chamado (na thread do Tk) quando o aluno foi deletado do banco."""
+        self.status.configure(text="Aluno deletado com sucesso!", text_color="green")
+        # Remove só o card do aluno e o seu histórico
+        bloco = self.frame_alunos.bloco(aluno_id, ("registro",))
+        if bloco is not None:
+            self.frame_alunos.remover_itens(*bloco)
+        if not self.frame_alunos.itens():
+            self.frame_alunos.limpar("Nenhum aluno cadastrado nesta turma.")
+
 
     def voltar(self):
         """